@@ -0,0 +1,113 @@
+#  Copyright 2020-2025 SkyTemple Contributors
+#
+#  This file is part of SkyTemple.
+#
+#  SkyTemple is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  SkyTemple is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with SkyTemple.  If not, see <https://www.gnu.org/licenses/>.
+"""
+Measures the time-to-interactive of the GTK frontend on a cold start.
+Every round starts the GUI in a fresh process and reports:
+
+- "import": time to import the frontend, including loading all UI templates.
+- "interactive": time from process start until the window has drawn its first frame and the main loop is idle.
+
+If a ROM is given, the GUI opens it directly. "interactive" then covers loading the ROM and showing the main
+settings stack. In that mode, "pages" is the time it takes to show every settings page once after that.
+
+Needs a display (eg. run under `xvfb-run` on headless machines).
+
+Usage: python benchmarks/gui_startup.py [ROUNDS] [ROM]
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+CHILD_ARG = "--child"
+
+
+def child(rom: str | None):
+    start = time.perf_counter()
+    from skytemple_randomizer.frontend.gtk import main as gui
+
+    imported = time.perf_counter()
+    from gi.repository import GLib
+
+    from skytemple_randomizer.frontend.gtk.frontend import GtkFrontend
+
+    result = {"import": imported - start}
+
+    class BenchmarkApp(gui.MainApp):
+        def do_activate(self, file: str | None = None) -> None:
+            super().do_activate(file)
+            GtkFrontend.instance().window.add_tick_callback(self._on_first_frame)
+
+        def _on_first_frame(self, *args):
+            GLib.idle_add(self._on_interactive, priority=GLib.PRIORITY_LOW)
+            return GLib.SOURCE_REMOVE
+
+        def _on_interactive(self):
+            window = GtkFrontend.instance().window
+            if rom is not None and window.content_stack.get_visible_child() != window.stack_item_main:
+                # The ROM is opened in the background, check again in a bit.
+                GLib.timeout_add(5, self._on_first_frame)
+                return GLib.SOURCE_REMOVE
+            result["interactive"] = time.perf_counter() - start
+            if rom is not None:
+                pages_start = time.perf_counter()
+                stack = window.stack_item_main.stack
+                for page in stack.get_pages():  # type: ignore
+                    stack.set_visible_child(page.get_child())
+                    while GLib.MainContext.default().iteration(False):
+                        pass
+                result["pages"] = time.perf_counter() - pages_start
+            print(json.dumps(result), flush=True)
+            self.quit()
+            return GLib.SOURCE_REMOVE
+
+    gui.MainApp = BenchmarkApp  # type: ignore
+    try:
+        gui.main([sys.argv[0]] + ([rom] if rom is not None else []))
+    except SystemExit:
+        pass
+
+
+def main():
+    if CHILD_ARG in sys.argv:
+        args = sys.argv[sys.argv.index(CHILD_ARG) + 1 :]
+        child(args[0] if len(args) > 0 else None)
+        return
+
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    rom = os.path.abspath(sys.argv[2]) if len(sys.argv) > 2 else None
+
+    results: dict[str, list[float]] = {}
+    for __ in range(rounds):
+        cmd = [sys.executable, __file__, CHILD_ARG] + ([rom] if rom is not None else [])
+        out = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+        line = [x for x in out.splitlines() if x.startswith("{")][-1]
+        for key, value in json.loads(line).items():
+            results.setdefault(key, []).append(value)
+
+    for key, values in results.items():
+        print(
+            f"{key:>12}: {statistics.median(values) * 1000:8.1f} ms median, "
+            f"{min(values) * 1000:8.1f} ms min ({len(values)} rounds)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+#  Copyright 2020-2025 SkyTemple Contributors
+#
+#  This file is part of SkyTemple.
+#
+#  SkyTemple is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  SkyTemple is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with SkyTemple.  If not, see <https://www.gnu.org/licenses/>.
+"""
+Micro-benchmark for the dungeon item list generators.
+Does not need a ROM, the static data of the NA version is used.
+
+Usage: python benchmarks/item_lists.py [ROUNDS]
+"""
+
+import os
+import sys
+import timeit
+from random import Random
+
+from skytemple_files.common.ppmdu_config.xml_reader import Pmd2XmlReader
+
+from skytemple_randomizer.config import ConfigFileLoader, ItemAlgorithm
+from skytemple_randomizer.data_dir import data_dir
+from skytemple_randomizer.randomizer.common.items import randomize_items
+from skytemple_randomizer.randomizer.dungeon import MAX_ITEM_LISTS
+from skytemple_randomizer.randomizer.global_items import ITEM_LIST_COUNT
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    static_data = Pmd2XmlReader.load_default("EoS_NA")
+    config = ConfigFileLoader.load(os.path.join(data_dir(), "default.json"))
+    lists_per_run = MAX_ITEM_LISTS + ITEM_LIST_COUNT
+
+    for algorithm in ItemAlgorithm:
+        config["item"]["algorithm"] = algorithm
+        rng = Random(0)
+        total = timeit.timeit(
+            lambda: [randomize_items(rng, config, static_data) for __ in range(lists_per_run)],
+            number=rounds,
+        )
+        print(
+            f"{algorithm.name:>8}: {total / rounds * 1000:8.2f} ms per run "
+            f"({total / rounds / lists_per_run * 1_000_000:7.1f} µs per item list)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -20,18 +20,25 @@
 # NOT SUPPORTED: DO NOT!
 # from __future__ import annotations
 
+import hashlib
 import json
 import os
 import time
 from enum import Enum
 from numbers import Number
-from typing import TypedDict
+from typing import TypedDict, Any
+from collections.abc import Callable
 
 from range_typed_integers import u16, u8, u32
 from skytemple_files.common.util import open_utf8
 
 from skytemple_randomizer.data_dir import data_dir
-from skytemple_randomizer.lists import DEFAULTMONSTERPOOL
+from skytemple_randomizer.lists import (
+    DEFAULTMONSTERPOOL,
+    DEFAULTMOVEPOOL,
+    DEFAULTITEMPOOL,
+    DEFAULITEMCATWEIGHTPOOL,
+)
 
 import importlib.metadata as importlib_metadata
 
@@ -66,6 +73,12 @@ class DungeonModeConfig(Enum):
     GROUPED_BY_DUNGEON = 1
 
 
+class DungeonLayoutGeneration(Enum):
+    CLASSIC = 0
+    # Versioned: A released version must always generate the same layouts for the same seed.
+    BULK_V1 = 1
+
+
 class DungeonSettingsConfig(TypedDict):
     randomize: bool
     unlock: bool
@@ -77,6 +90,7 @@ class DungeonSettingsConfig(TypedDict):
 class DungeonsConfig(TypedDict):
     mode: DungeonModeConfig
     layouts: bool
+    layout_generation: DungeonLayoutGeneration
     weather: bool
     items: bool
     pokemon: bool
@@ -223,9 +237,87 @@ def is_int(typ):
     return typ is int or typ == u8 or typ == u16 or typ == u32
 
 
+def _is_typeddict(typ) -> bool:
+    return hasattr(typ, "__bases__") and dict in typ.__bases__ and len(typ.__annotations__) > 0
+
+
+def _is_enum(typ) -> bool:
+    return hasattr(typ, "__bases__") and Enum in typ.__bases__
+
+
+# Values for fields missing in config JSONs of previous versions, by field name. These are factories,
+# so every loaded config gets its own copy of mutable values. Object values are loaded recursively, so
+# they may themselves be missing fields.
+_FIELD_DEFAULTS: dict[str, Callable[[], Any]] = {
+    "overworld_music": lambda: True,
+    "patch_disarm_monster_houses": lambda: True,
+    "patch_totalteamcontrol": lambda: False,
+    "explorer_rank_unlocks": lambda: False,
+    "explorer_rank_rewards": lambda: True,
+    "randomize_tactics": lambda: False,
+    "randomize_iq_gain": lambda: False,
+    "randomize_iq_skills": lambda: False,
+    "randomize_iq_groups": lambda: False,
+    "patch_fixmemorysoftlock": lambda: True,
+    "patch_sametypepartner": lambda: False,
+    "tm_hm_movesets": lambda: True,
+    "tms_hms": lambda: True,
+    "max_sticky_chance": lambda: 10,
+    "max_mh_chance": lambda: 6,
+    "max_hs_chance": lambda: 10,
+    "max_ks_chance": lambda: 10,
+    "random_weather_chance": lambda: 33,
+    "min_floor_change_percent": lambda: 0,
+    "max_floor_change_percent": lambda: 0,
+    "layout_generation": lambda: 0,
+    "instant": lambda: False,
+    "topmenu_music": lambda: True,
+    "items_enabled": lambda: list(DEFAULTITEMPOOL),
+    "moves_enabled": lambda: list(DEFAULTMOVEPOOL),
+    "monsters_enabled": lambda: list(DEFAULTMONSTERPOOL),
+    "starters_enabled": lambda: list(DEFAULTMONSTERPOOL),
+    "quiz": lambda: {"mode": 1, "randomize": False, "questions": []},
+    "native_file_handlers": lambda: 1,
+    "iq": lambda: {
+        "randomize_tactics": False,
+        "randomize_iq_gain": False,
+        "randomize_iq_skills": False,
+        "randomize_iq_groups": False,
+        "keep_universal_skills": False,
+    },
+    "item": lambda: {
+        "algorithm": 0,
+        "global_items": True,
+        "weights": dict(DEFAULITEMCATWEIGHTPOOL),
+        "blind_items": {"enable": False, "names": ""},
+    },
+    "blind_items": lambda: {"enable": False, "names": ""},
+    "blind_moves": lambda: {"enable": False, "names": ""},
+    "include_vanilla_questions": lambda: False,
+    "npcs_use_smart_replace": lambda: False,
+}
+
+# Conversions of values of previous versions that are applied before loading a field, by field name.
+_FIELD_COMPAT: dict[str, Callable[[Any], Any]] = {
+    "weather": lambda v: bool(v) if type(v) is int else v,
+}
+
+# Loads a JSON value at the given path (used in error messages) into the config value.
+_Loader = Callable[[Any, str], Any]
+
+
+def _join_path(path: str, key) -> str:
+    return f"{path}.{key}" if path else str(key)
+
+
 class ConfigFileLoader:
     """Loads configuration from JSON files. The JSON should have a structure equivalent of RandomizerConfig.
-    Unknown fields are ignored, numbers converted into Enums."""
+    Unknown fields are ignored, numbers converted into Enums.
+
+    The schema is compiled into a tree of loader functions once per type, so loading a config does not
+    need to inspect the type annotations again."""
+
+    _compiled: dict[Any, _Loader] = {}
 
     @classmethod
     def load(cls, fn: str) -> RandomizerConfig:
@@ -234,211 +326,136 @@ class ConfigFileLoader:
 
     @classmethod
     def load_from_dict(cls, config: dict) -> RandomizerConfig:
-        return cls._handle(config, RandomizerConfig)
+        return cls._loader(RandomizerConfig)(config, "")
 
     @classmethod
-    def _handle(cls, target, typ: type):
-        if hasattr(typ, "__bases__") and dict in typ.__bases__ and len(typ.__annotations__) > 0:
-            if not isinstance(target, dict):
-                raise ValueError(f"Value in JSON must be an object for {typ}.")
-            kwargs = {}
-            for field, field_type in typ.__annotations__.items():
-                # Compatibility:
-                if field in target:
-                    if field == "weather" and type(target[field]) == int:  # noqa: E721
-                        target[field] = bool(target[field])
-                else:
-                    if field == "overworld_music" and field_type is bool:
-                        target[field] = True
-                    elif field == "patch_disarm_monster_houses" and field_type is bool:
-                        target[field] = True
-                    elif field == "patch_totalteamcontrol" and field_type is bool:
-                        target[field] = False
-                    elif field == "explorer_rank_unlocks" and field_type is bool:
-                        target[field] = False
-                    elif field == "explorer_rank_rewards" and field_type is bool:
-                        target[field] = True
-                    elif field == "randomize_tactics" and field_type is bool:
-                        target[field] = False
-                    elif field == "randomize_iq_gain" and field_type is bool:
-                        target[field] = False
-                    elif field == "randomize_iq_skills" and field_type is bool:
-                        target[field] = False
-                    elif field == "randomize_iq_groups" and field_type is bool:
-                        target[field] = False
-                    elif field == "patch_fixmemorysoftlock" and field_type is bool:
-                        target[field] = True
-                    elif field == "patch_sametypepartner" and field_type is bool:
-                        target[field] = False
-                    elif field == "tm_hm_movesets" and field_type is bool:
-                        target[field] = True
-                    elif field == "tms_hms" and field_type is bool:
-                        target[field] = True
-                    elif field == "max_sticky_chance":
-                        target[field] = 10
-                    elif field == "max_mh_chance":
-                        target[field] = 6
-                    elif field == "max_hs_chance":
-                        target[field] = 10
-                    elif field == "max_ks_chance":
-                        target[field] = 10
-                    elif field == "random_weather_chance":
-                        target[field] = 33
-                    elif field == "min_floor_change_percent":
-                        target[field] = 0
-                    elif field == "max_floor_change_percent":
-                        target[field] = 0
-                    elif field == "instant":
-                        target[field] = False
-                    elif field == "topmenu_music":
-                        target[field] = True
-                    elif field == "items_enabled":
-                        target[field] = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 13, 14, 15, 16, 17, 18, 19, 20, 21, 22, 23, 24,
-                                         25, 26, 27, 28, 29, 30, 31, 32, 33, 34, 35, 36, 37, 38, 39, 40, 41, 42, 43, 44,
-                                         45, 46, 47, 48, 49, 50, 51, 52, 53, 54, 55, 56, 57, 58, 59, 60, 61, 62, 63, 64,
-                                         65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 77, 78, 79, 80, 81, 82, 83, 84,
-                                         85, 86, 87, 88, 89, 90, 91, 92, 93, 94, 95, 96, 97, 99, 100, 101, 102, 103,
-                                         104, 105, 106, 107, 108, 109, 110, 111, 112, 115, 116, 117, 118, 119, 120, 121,
-                                         122, 123, 124, 125, 126, 127, 128, 129, 130, 131, 132, 133, 134, 135, 136, 137,
-                                         139, 140, 141, 142, 143, 144, 145, 146, 147, 148, 149, 150, 151, 152, 153, 154,
-                                         155, 156, 157, 158, 159, 160, 161, 162, 163, 164, 165, 167, 168, 169, 170, 171,
-                                         172, 173, 174, 178, 179, 180, 182, 183, 186, 187, 188, 189, 190, 191, 192, 193,
-                                         194, 195, 196, 197, 199, 200, 201, 202, 203, 204, 206, 207, 208, 209, 210, 211,
-                                         212, 213, 214, 215, 216, 217, 218, 220, 221, 222, 223, 225, 227, 228, 229, 230,
-                                         231, 232, 233, 234, 235, 237, 238, 239, 240, 241, 242, 243, 244, 245, 246, 247,
-                                         248, 249, 250, 251, 252, 253, 254, 255, 256, 257, 260, 261, 262, 263, 264, 265,
-                                         266, 267, 268, 269, 270, 271, 272, 273, 274, 275, 276, 277, 278, 279, 280, 281,
-                                         282, 283, 284, 285, 286, 287, 288, 289, 290, 291, 292, 301, 302, 303, 304, 305,
-                                         306, 307, 308, 309, 310, 311, 312, 313, 314, 315, 316, 317, 318, 319, 320, 321,
-                                         322, 323, 325, 326, 327, 328, 329, 330, 331, 332, 333, 334, 335, 336, 337, 338,
-                                         340, 341, 342, 343, 344, 346, 347, 348, 350, 351, 352, 354, 355, 356, 357, 358,
-                                         359, 362, 363]  # fmt: skip
-                    elif field == "moves_enabled":
-                        target[field] = [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20, 21,
-                                         22, 23, 24, 25, 26, 27, 28, 29, 30, 31, 32, 33, 34, 35, 36, 37, 38, 39, 40, 41,
-                                         42, 43, 44, 45, 46, 47, 48, 49, 50, 51, 52, 53, 54, 55, 56, 57, 58, 59, 60, 61,
-                                         62, 63, 64, 65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 77, 78, 79, 80, 81,
-                                         82, 83, 84, 85, 86, 87, 88, 89, 90, 91, 92, 93, 94, 95, 96, 97, 98, 99, 100,
-                                         101, 102, 103, 104, 105, 106, 107, 108, 109, 110, 111, 112, 113, 114, 115, 116,
-                                         117, 118, 119, 120, 121, 122, 123, 124, 125, 126, 127, 128, 129, 130, 131, 132,
-                                         133, 134, 135, 136, 137, 138, 139, 140, 141, 142, 143, 144, 145, 146, 147, 148,
-                                         149, 150, 151, 152, 153, 154, 155, 156, 157, 158, 159, 160, 161, 162, 163, 164,
-                                         165, 166, 167, 168, 169, 170, 171, 172, 173, 174, 175, 176, 177, 178, 179, 180,
-                                         181, 182, 183, 184, 185, 186, 187, 188, 189, 190, 191, 192, 193, 194, 195, 196,
-                                         197, 198, 199, 200, 201, 202, 203, 204, 205, 206, 207, 208, 209, 210, 211, 212,
-                                         213, 214, 215, 216, 217, 218, 219, 220, 221, 222, 223, 224, 225, 226, 227, 228,
-                                         229, 230, 231, 232, 233, 234, 235, 236, 237, 238, 239, 240, 241, 242, 243, 244,
-                                         245, 246, 247, 248, 249, 250, 251, 252, 253, 254, 255, 256, 257, 258, 259, 260,
-                                         261, 262, 263, 264, 265, 266, 267, 268, 269, 270, 271, 272, 273, 274, 275, 276,
-                                         277, 278, 279, 280, 281, 282, 283, 284, 285, 286, 287, 288, 289, 290, 291, 292,
-                                         293, 294, 295, 296, 297, 298, 299, 300, 301, 302, 303, 304, 305, 306, 307, 308,
-                                         309, 310, 311, 312, 313, 314, 315, 316, 317, 318, 319, 320, 321, 322, 323, 324,
-                                         325, 326, 327, 328, 329, 330, 331, 332, 333, 334, 335, 336, 337, 338, 339, 340,
-                                         341, 342, 343, 344, 345, 346, 347, 348, 349, 350, 351, 352, 353, 354, 360, 394,
-                                         430, 431, 432, 433, 434, 435, 436, 437, 438, 439, 440, 441, 442, 443, 444, 445,
-                                         446, 447, 448, 449, 450, 451, 452, 453, 454, 455, 456, 457, 458, 459, 460, 461,
-                                         462, 463, 464, 465, 466, 468, 469, 470, 471, 472, 473, 474, 475, 476, 477, 478,
-                                         479, 480, 481, 482, 483, 484, 485, 486, 487, 488, 489, 490, 491, 492, 493, 494,
-                                         495, 496, 497, 498, 499, 500, 501, 502, 503, 504, 505, 506, 507, 508, 509, 510,
-                                         511, 512, 513, 514, 515, 516, 517, 518, 519, 520, 521, 522, 523, 524, 525, 526,
-                                         527, 528, 529, 530, 531, 532, 533, 534, 535, 536, 537, 538, 539, 540,
-                                         541]  # fmt: skip
-                    elif field == "monsters_enabled":
-                        target[field] = DEFAULTMONSTERPOOL
-                    elif field == "starters_enabled":
-                        target[field] = DEFAULTMONSTERPOOL
-                    elif field == "quiz" and field_type == QuizConfig:
-                        target[field] = {"mode": 1, "randomize": False, "questions": []}
-                    elif field == "native_file_handlers":
-                        target[field] = 1
-                    elif field == "iq" and field_type == IqConfig:
-                        target[field] = {
-                            "randomize_tactics": False,
-                            "randomize_iq_gain": False,
-                            "randomize_iq_skills": False,
-                            "randomize_iq_groups": False,
-                            "keep_universal_skills": False,
-                        }
-                    elif field == "item" and field_type == ItemConfig:
-                        target[field] = {
-                            "algorithm": 0,
-                            "global_items": True,
-                            "weights": {
-                                "0": 1,
-                                "1": 1,
-                                "2": 1,
-                                "3": 2,
-                                "4": 1,
-                                "5": 0.3,
-                                "6": 3,
-                                "8": 1,
-                                "9": 1,
-                                "10": 1,
-                            },
-                            "blind_items": {"enable": False, "names": ""},
-                        }
-                    elif field == "blind_items" and field_type == BlindItemsConfig:
-                        target[field] = {"enable": False, "names": ""}
-                    elif field == "blind_moves" and field_type == BlindMovesConfig:
-                        target[field] = {"enable": False, "names": ""}
-                    elif field == "include_vanilla_questions":
-                        target[field] = False
-                    elif field == "npcs_use_smart_replace":
-                        target[field] = False
-                    else:
-                        raise KeyError(f"Configuration '{field_type}' missing for {typ} ({field})).")
-                kwargs[field] = cls._handle(target[field], field_type)
-            v = typ(**kwargs)
-            v[CLASSREF] = typ
-            return v
-        elif hasattr(typ, "__bases__") and Enum in typ.__bases__:
-            if isinstance(target, str):
-                try:
-                    target = int(target)
-                except ValueError:
-                    pass
-            if not isinstance(target, int):
-                raise ValueError(f"Value in JSON must be an integer for {typ}.")
-            return typ(target)
+    def _loader(cls, typ) -> _Loader:
+        if typ not in cls._compiled:
+            cls._compiled[typ] = cls._compile(typ)
+        return cls._compiled[typ]
+
+    @classmethod
+    def _compile(cls, typ) -> _Loader:
+        if _is_typeddict(typ):
+            return cls._compile_typeddict(typ)
+        elif _is_enum(typ):
+            return _compile_enum(typ)
         elif typ is bool:
-            if not isinstance(target, bool):
-                raise ValueError(f"Expected a boolean for a field, but got {target.__class__.__name__}")
-            return target
+            return _load_bool
         elif is_int(typ):
-            if not isinstance(target, int):
-                raise ValueError(f"Expected an integer for a field, but got {target.__class__.__name__}")
-            return target
+            return _load_int
         elif typ == IntRange:
-            if not isinstance(target, int):
-                raise ValueError(f"Expected an IntRange for a field, but got {target.__class__.__name__}")
-            return typ(target)
+            return _load_int_range
         elif typ is str:
-            if not isinstance(target, str):
-                raise ValueError(f"Expected a string for a field, but got {target.__class__.__name__}")
-            return target
+            return _load_str
         elif typ == dict[int, DungeonSettingsConfig]:
-            if not isinstance(target, dict):
-                raise ValueError(f"Value in JSON must be an object for {typ}.")
-            d = {}
-            for idx, conf in target.items():
-                d[int(idx)] = cls._handle(conf, DungeonSettingsConfig)
-            return d
+            return _compile_int_dict(cls._loader(DungeonSettingsConfig))
         elif typ == dict[int, Number]:
-            if not isinstance(target, dict):
-                raise ValueError(f"Value in JSON must be an object for {typ}.")
-            d = {}
-            for idx, conf in target.items():
-                d[int(idx)] = conf
-            return d
+            return _compile_int_dict(lambda v, __: v)
         elif typ.__name__.lower() == "list" and is_int(typ.__args__[0]):  # type: ignore
-            if not isinstance(target, list) or not all(isinstance(x, int) for x in target):
-                raise ValueError(f"Value in JSON must be a list of integers for {typ}.")
-            return target
+            return _load_int_list
         elif typ == list[QuizQuestion]:
-            return target
+            return lambda v, __: v
         else:
             raise TypeError(f"Unknown type for {cls.__name__}: {typ}")
 
+    @classmethod
+    def _compile_typeddict(cls, typ) -> _Loader:
+        fields = [
+            (field, cls._loader(field_type), _FIELD_COMPAT.get(field))
+            for field, field_type in typ.__annotations__.items()
+        ]
+        field_names = frozenset(typ.__annotations__.keys())
+
+        def load(target, path: str):
+            if not isinstance(target, dict):
+                raise ValueError(f"Value in JSON must be an object for '{path or '.'}' ({typ.__name__}).")
+            v = typ()
+            has_all_fields = field_names <= target.keys()
+            for field, loader, compat in fields:
+                # Fast path: Nothing is missing, which is the case for all configs of the current version.
+                if has_all_fields or field in target:
+                    value = target[field]
+                    if compat is not None:
+                        value = compat(value)
+                elif field in _FIELD_DEFAULTS:
+                    value = _FIELD_DEFAULTS[field]()
+                else:
+                    raise KeyError(f"Configuration '{_join_path(path, field)}' missing for {typ.__name__}.")
+                v[field] = loader(value, _join_path(path, field))
+            v[CLASSREF] = typ
+            return v
+
+        return load
+
+
+def _compile_enum(typ) -> _Loader:
+    members = {member.value: member for member in typ}
+
+    def load(target, path: str):
+        if isinstance(target, str):
+            try:
+                target = int(target)
+            except ValueError:
+                pass
+        if not isinstance(target, int):
+            raise ValueError(f"Value in JSON must be an integer for '{path}' ({typ.__name__}).")
+        try:
+            return members[target]
+        except KeyError:
+            raise ValueError(f"{target} is not a valid value for '{path}' ({typ.__name__}).") from None
+
+    return load
+
+
+def _compile_int_dict(value_loader: _Loader) -> _Loader:
+    def load(target, path: str):
+        if not isinstance(target, dict):
+            raise ValueError(f"Value in JSON must be an object for '{path}'.")
+        d = {}
+        for idx, conf in target.items():
+            try:
+                key = int(idx)
+            except ValueError:
+                raise ValueError(f"Expected an integer key for '{path}', but got '{idx}'.") from None
+            d[key] = value_loader(conf, _join_path(path, idx))
+        return d
+
+    return load
+
+
+def _load_bool(target, path: str):
+    if not isinstance(target, bool):
+        raise ValueError(f"Expected a boolean for '{path}', but got {target.__class__.__name__}")
+    return target
+
+
+def _load_int(target, path: str):
+    if not isinstance(target, int):
+        raise ValueError(f"Expected an integer for '{path}', but got {target.__class__.__name__}")
+    return target
+
+
+def _load_int_range(target, path: str):
+    if not isinstance(target, int):
+        raise ValueError(f"Expected an IntRange for '{path}', but got {target.__class__.__name__}")
+    return IntRange(target)
+
+
+def _load_str(target, path: str):
+    if not isinstance(target, str):
+        raise ValueError(f"Expected a string for '{path}', but got {target.__class__.__name__}")
+    return target
+
+
+def _load_int_list(target, path: str):
+    if not isinstance(target, list):
+        raise ValueError(f"Value in JSON must be a list of integers for '{path}'.")
+    for i, x in enumerate(target):
+        if not isinstance(x, int):
+            raise ValueError(f"Expected an integer for '{path}[{i}]', but got {x.__class__.__name__}")
+    return target
+
 
 class EnumJsonEncoder(json.JSONEncoder):
     def default(self, obj):
@@ -478,3 +495,104 @@ def deep_typeddict_to_dict(o):
         o = n
 
     return o
+
+
+def canonical_config(o) -> Any:
+    """
+    Returns a canonical, JSON compatible form of a config or a part of it: Enums and IntRanges are replaced by
+    their values, all object keys are strings and the class references are removed. Fields typed as Number (eg. the
+    monster spawn weights) may be loaded as int or float, so floats without a fractional part are replaced by ints.
+    Two configs that load into the same config have the same canonical form. The order of lists is kept,
+    since it can influence the randomization.
+    """
+    if isinstance(o, dict):
+        return {str(k): canonical_config(v) for k, v in o.items() if k != CLASSREF}
+    if isinstance(o, (list, tuple)):
+        return [canonical_config(c) for c in o]
+    if isinstance(o, (Enum, IntRange)):
+        return o.value
+    if isinstance(o, float) and o.is_integer():
+        return int(o)
+    return o
+
+
+def _canonical_json(canonical) -> bytes:
+    return json.dumps(canonical, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _config_path_parts(path: str) -> list[str]:
+    return [part for part in path.split(".") if part != ""]
+
+
+def get_config_subtree(config, path: str):
+    """Returns the part of the config at path, e.g. 'dungeons' or 'pokemon.moves_enabled'. '' is the whole config."""
+    o = config
+    for part in _config_path_parts(path):
+        if isinstance(o, list):
+            try:
+                o = o[int(part)]
+                continue
+            except (ValueError, IndexError):
+                pass
+        elif isinstance(o, dict):
+            if part in o:
+                o = o[part]
+                continue
+            try:
+                if int(part) in o:
+                    o = o[int(part)]
+                    continue
+            except ValueError:
+                pass
+        raise KeyError(f"No value at '{path}' in the config.")
+    return o
+
+
+def config_fingerprint(config, path: str = "") -> str:
+    """
+    Returns a stable fingerprint (SHA-256, hex) of the config or of the part of it at path.
+    It only depends on the config values, not on the Randomizer version, so include the version in cache keys
+    for generated ROMs.
+    """
+    return hashlib.sha256(_canonical_json(canonical_config(get_config_subtree(config, path)))).hexdigest()
+
+
+def config_fingerprints(config) -> dict[str, str]:
+    """
+    Returns the fingerprints of the whole config (key '') and of every object and list in it, by path.
+    List elements are addressed by their index, e.g. 'quiz.questions.0'.
+    """
+    fingerprints = {}
+
+    def collect(canonical, path: str):
+        fingerprints[path] = hashlib.sha256(_canonical_json(canonical)).hexdigest()
+        children = canonical.items() if isinstance(canonical, dict) else enumerate(canonical)
+        for k, v in children:
+            if isinstance(v, (dict, list)):
+                collect(v, f"{path}.{k}" if path else str(k))
+
+    collect(canonical_config(config), "")
+    return fingerprints
+
+
+def diff_configs(a, b) -> list[str]:
+    """
+    Returns the paths of all values that differ between the configs a and b, sorted.
+    Objects are compared field by field, so only the most specific paths are reported, e.g.
+    'dungeons.settings.3.unlock' and 'pokemon.moves_enabled'. Fields that only exist in one of them are reported too.
+    """
+    changed: list[str] = []
+
+    def compare(x, y, path: str):
+        if isinstance(x, dict) and isinstance(y, dict):
+            for k in x.keys() | y.keys():
+                sub_path = f"{path}.{k}" if path else k
+                if k not in x or k not in y:
+                    changed.append(sub_path)
+                else:
+                    compare(x[k], y[k], sub_path)
+        elif x != y or type(x) is not type(y):
+            changed.append(path)
+
+    compare(canonical_config(a), canonical_config(b), "")
+    return sorted(changed)
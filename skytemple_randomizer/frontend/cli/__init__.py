@@ -19,6 +19,7 @@ from __future__ import annotations
 import base64
 import json
 import os
+import sys
 
 import click
 
@@ -31,14 +32,29 @@ from skytemple_randomizer.config import (
 from skytemple_randomizer.data_dir import data_dir
 from skytemple_randomizer.frontend.cli.config_argument import ConfigArgument
 from skytemple_randomizer.frontend.cli.error import Error
-from skytemple_randomizer.frontend.cli.randomize import run_randomization
+from skytemple_randomizer.frontend.cli.randomize import run_randomization, print_result_chunked
 from skytemple_randomizer.frontend.cli.rom_argument import RomArgument, LoadedRom
 from skytemple_randomizer.frontend.cli import info
+from skytemple_randomizer.randomizer.util import file_handlers
+from skytemple_randomizer.randomizer.util.rng_diff import diff_rng_traces
+from skytemple_randomizer.rom_io import iter_rom, save_rom_to_file
+from skytemple_randomizer.rom_patch import create_rom_patch, apply_rom_patch, RomPatchError
 
 
 def init(cli: click.Group):
     @cli.command(help="Runs the Randomization.")
     @click.option("--print-result/--no-print-result", default=False)
+    @click.option(
+        "--chunked-result/--no-chunked-result",
+        default=False,
+        help="With --print-result, print the result in chunks instead of one single JSON line.",
+    )
+    @click.option(
+        "--output-format",
+        type=click.Choice(["rom", "patch"]),
+        default="rom",
+        help="Output the full ROM or only a patch against INPUT_ROM.",
+    )
     @click.argument("input_rom", cls=RomArgument)
     @click.argument("config", cls=ConfigArgument)
     @click.argument("output_rom", required=False)
@@ -46,6 +62,8 @@ def init(cli: click.Group):
         input_rom: LoadedRom,
         config: RandomizerConfig,
         print_result: bool,
+        chunked_result: bool,
+        output_format: str,
         output_rom: str | None,
     ):
         if print_result is False and output_rom is None:
@@ -56,15 +74,79 @@ def init(cli: click.Group):
         try:
             rom = run_randomization(input_rom, config)
 
-            if output_rom:
-                rom.saveToFile(output_rom, updateDeviceCapacity=True)
+            if output_format == "patch":
+                with open(input_rom.path, "rb") as f:
+                    data = create_rom_patch(f.read(), rom.save(updateDeviceCapacity=True))
+                if output_rom:
+                    with open(output_rom, "wb") as f:
+                        f.write(data)
+                    return
+            elif output_rom:
+                save_rom_to_file(rom, output_rom)
+                return
+            elif chunked_result:
+                # Printed while the ROM is saved, it's never in memory as a whole.
+                size, parts = iter_rom(rom)
+                print_result_chunked(parts, size, output_format)
+                return
             else:
                 data = rom.save(updateDeviceCapacity=True)
+            del rom  # not needed anymore, free it before encoding the result.
+            if chunked_result:
+                print_result_chunked([data], len(data), output_format)
+            else:
                 click.echo(json.dumps({"data": base64.b64encode(data).decode("ascii")}))
 
         except Exception:
             Error.from_current_exception().print_and_exit()
 
+    @cli.command(help="Applies a patch created with 'randomize --output-format patch' to the input ROM.")
+    @click.argument("input_rom", type=click.Path(exists=True, dir_okay=False))
+    @click.argument("patch", type=click.Path(exists=True, dir_okay=False))
+    @click.argument("output_rom")
+    def apply_patch(input_rom: str, patch: str, output_rom: str):
+        try:
+            with open(input_rom, "rb") as f:
+                source = f.read()
+            with open(patch, "rb") as f:
+                data = apply_rom_patch(source, f.read())
+            with open(output_rom, "wb") as f:
+                f.write(data)
+        except RomPatchError as e:
+            Error(str(e), internal_error=False).print_and_exit()
+        except Exception:
+            Error.from_current_exception().print_and_exit()
+
+    @cli.command(
+        help="Benchmarks the native and Python file handlers with the files of the ROM "
+        "and uses the fastest for each file type from now on."
+    )
+    @click.argument("rom", cls=RomArgument)
+    def calibrate_file_handlers(rom: LoadedRom):
+        try:
+            calibration = file_handlers.calibrate_file_handlers(rom.rom, rom.static_data)
+            click.echo(json.dumps(calibration.to_json()), nl=False)
+        except Exception:
+            Error.from_current_exception().print_and_exit()
+
+    @cli.command(
+        help="Compares two RNG traces (see SKYTEMPLE_RANDOMIZER_DEBUG_DIR_RNG) and reports where they diverge. "
+        "Exits with code 3 if they differ."
+    )
+    @click.option("--ignore-lines/--no-ignore-lines", default=False)
+    @click.argument("trace_a", type=click.Path(exists=True, dir_okay=False))
+    @click.argument("trace_b", type=click.Path(exists=True, dir_okay=False))
+    def rng_diff(trace_a: str, trace_b: str, ignore_lines: bool):
+        try:
+            diff = diff_rng_traces(trace_a, trace_b, ignore_lines)
+        except ValueError as e:
+            Error(str(e), internal_error=False).print_and_exit()
+        except Exception:
+            Error.from_current_exception().print_and_exit()
+        click.echo(json.dumps(diff.to_json()), nl=False)
+        if not diff.identical:
+            sys.exit(3)
+
     @cli.command(help="Prints the default config for the given ROM as JSON.")
     @click.argument("rom", cls=RomArgument)
     def default_config(rom: LoadedRom):
@@ -16,20 +16,22 @@
 #  along with SkyTemple.  If not, see <https://www.gnu.org/licenses/>.
 from __future__ import annotations
 
+import base64
+import hashlib
 import json
-import random
 from functools import partial
 from time import sleep
 from typing import TYPE_CHECKING, TypedDict
-from collections.abc import Callable
+from collections.abc import Callable, Iterable
 
 import click
 import sys
 from ndspy.rom import NintendoDSRom
 
 from skytemple_randomizer.frontend.abstract import AbstractFrontend, PortraitDebugLine
+from skytemple_randomizer.randomizer.util.debug import create_rng
 from skytemple_randomizer.randomizer_thread import RandomizerThread
-from skytemple_randomizer.status import Status
+from skytemple_randomizer.status import Status, StatusEvent
 from skytemple_randomizer.config import RandomizerConfig, get_effective_seed
 
 if TYPE_CHECKING:
@@ -54,25 +56,56 @@ class Progress(TypedDict):
     current_step: int
     total_steps: int
     current_step_description: str
+    fraction: float
+    eta: float | None
 
 
 class Done(TypedDict):
     done: bool
 
 
+class ResultHeader(TypedDict):
+    format: str
+    size: int
+    chunk_size: int
+    chunks: int
+
+
+class Result(TypedDict):
+    result: ResultHeader
+
+
+class ResultChunk(TypedDict):
+    chunk: int
+    data: str
+
+
+class ResultEndInfo(TypedDict):
+    sha256: str
+
+
+class ResultEnd(TypedDict):
+    result_end: ResultEndInfo
+
+
+# Raw bytes per chunk line. A multiple of 3, so the chunks can be base64 decoded independently.
+RESULT_CHUNK_SIZE = 3 * 16 * 1024
+# Maximum number of "Progress JSON" lines printed per second. Steps in between are skipped.
+PROGRESS_MAX_RATE = 10
+
+
 def run_randomization(rom: LoadedRom, config: RandomizerConfig) -> NintendoDSRom:
     status = Status()
     seed = get_effective_seed(config["seed"])
-    rng = random.Random(seed)
     randomizer = RandomizerThread(
         status,
         rom.rom,
         config,
-        rng,
+        create_rng(seed),
         str(seed),
         CliFrontend(),
     )
-    status.subscribe(partial(status_update, randomizer))
+    status.subscribe_async(partial(status_update, randomizer), max_rate=PROGRESS_MAX_RATE)
     randomizer.start()
 
     while True:
@@ -83,23 +116,79 @@ def run_randomization(rom: LoadedRom, config: RandomizerConfig) -> NintendoDSRom
     return randomizer.rom
 
 
-def status_update(randomizer: RandomizerThread, progress: int, description: str):
-    if description == Status.DONE_SPECIAL_STR:
+def status_update(randomizer: RandomizerThread, event: StatusEvent):
+    if event.description == Status.DONE_SPECIAL_STR:
         return
+    estimate = randomizer.progress.estimate()
     click.echo(
         json.dumps(
             Progress(
-                current_step=progress,
+                current_step=event.step,
                 total_steps=randomizer.total_steps,
-                current_step_description=description,
+                current_step_description=event.description,
+                fraction=round(estimate.fraction, 4),
+                eta=None if estimate.eta is None else round(estimate.eta, 1),
+            )
+        )
+    )
+
+
+def print_result_chunked(data: Iterable[bytes], size: int, output_format: str):
+    """
+    Prints the result as a "Result JSON" header line, "Result Chunk JSON" lines and a "Result End JSON" line, see
+    CLI_API.md. data are the parts of the result, in order, they are printed as they come in (see iter_rom).
+    Only one chunk is base64 encoded at a time.
+    """
+    chunks = (size + RESULT_CHUNK_SIZE - 1) // RESULT_CHUNK_SIZE
+    click.echo(
+        json.dumps(
+            Result(
+                result=ResultHeader(
+                    format=output_format,
+                    size=size,
+                    chunk_size=RESULT_CHUNK_SIZE,
+                    chunks=chunks,
+                )
             )
         )
     )
+    sha256 = hashlib.sha256()
+    index = 0
+
+    def print_chunk(chunk: bytes | bytearray | memoryview):
+        nonlocal index
+        click.echo(json.dumps(ResultChunk(chunk=index, data=base64.b64encode(chunk).decode("ascii"))))
+        index += 1
+
+    # The start of the next chunk, if the previous part ended in the middle of it.
+    pending = bytearray()
+    for part in data:
+        sha256.update(part)
+        view = memoryview(part)
+        if len(pending) > 0:
+            missing = RESULT_CHUNK_SIZE - len(pending)
+            pending += view[:missing]
+            view = view[missing:]
+            if len(pending) < RESULT_CHUNK_SIZE:
+                continue
+            print_chunk(pending)
+            pending = bytearray()
+        while len(view) >= RESULT_CHUNK_SIZE:
+            print_chunk(view[:RESULT_CHUNK_SIZE])
+            view = view[RESULT_CHUNK_SIZE:]
+        pending += view
+    if len(pending) > 0:
+        print_chunk(pending)
+    if index != chunks:
+        raise ValueError(f"The result has {index} chunks instead of {chunks}.")
+    click.echo(json.dumps(ResultEnd(result_end=ResultEndInfo(sha256=sha256.hexdigest()))))
 
 
 def check_done(randomizer: RandomizerThread) -> bool:
     if not randomizer.is_done():
         return False
+    # The last status updates may still be printed, wait for them.
+    randomizer.join()
 
     if randomizer.error:
         from skytemple_randomizer.frontend.cli import Error
@@ -26,16 +26,19 @@ from skytemple_files.common.ppmdu_config.data import Pmd2Data
 from skytemple_files.common.util import get_ppmdu_config_for_rom
 
 from skytemple_randomizer.frontend.cli.error import Error
+from skytemple_randomizer.rom_io import load_rom
 
 
 class LoadedRom:
-    __slots__ = ["rom", "static_data"]
+    __slots__ = ["rom", "static_data", "path"]
     rom: NintendoDSRom
     static_data: Pmd2Data
+    path: str
 
-    def __init__(self, rom: NintendoDSRom, static_data: Pmd2Data):
+    def __init__(self, rom: NintendoDSRom, static_data: Pmd2Data, path: str):
         self.rom = rom
         self.static_data = static_data
+        self.path = path
 
 
 class RomArgument(click.Argument):
@@ -50,9 +53,9 @@ class RomArgument(click.Argument):
     @staticmethod
     def read_rom(_ctx: click.Context, _slf: click.Parameter, val: Any) -> LoadedRom:
         try:
-            rom = NintendoDSRom.fromFile(val)
+            rom = load_rom(val)
             static_data = get_ppmdu_config_for_rom(rom)
-            return LoadedRom(rom=rom, static_data=static_data)
+            return LoadedRom(rom=rom, static_data=static_data, path=val)
         except struct.error:
             Error("Failed to open ROM. Not a valid ROM file.", internal_error=False).print_and_exit()
         except Exception as e:
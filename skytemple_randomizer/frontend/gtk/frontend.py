@@ -28,6 +28,7 @@ from skytemple_files.common.ppmdu_config.data import Pmd2Data
 from skytemple_randomizer.config import RandomizerConfig, ConfigFileLoader
 from skytemple_randomizer.data_dir import data_dir
 from skytemple_randomizer.frontend.abstract import AbstractFrontend, PortraitDebugLine
+from skytemple_randomizer.frontend.gtk.rom_catalogue import RomCatalogue, RomCatalogueService
 from skytemple_randomizer.frontend.gtk.settings import (
     SkyTempleRandomizerSettingsStoreGtk,
 )
@@ -50,6 +51,7 @@ class GtkFrontend(AbstractFrontend):
     __portrait_debug_window: PortraitDebugWindow | None
     __input_rom: NintendoDSRom | None
     __input_rom_static_data: Pmd2Data | None
+    __rom_catalogue: RomCatalogueService
 
     def __init__(self):
         self.__settings = None
@@ -59,6 +61,7 @@ class GtkFrontend(AbstractFrontend):
         self.__application = None
         self.__input_rom = None
         self.__input_rom_static_data = None
+        self.__rom_catalogue = RomCatalogueService()
 
     @classmethod
     def instance(cls) -> GtkFrontend:
@@ -72,10 +75,17 @@ class GtkFrontend(AbstractFrontend):
             self.__settings = SkyTempleRandomizerSettingsStoreGtk()
         return self.__settings
 
-    def init_rom(self, rom: NintendoDSRom, rom_static_data: Pmd2Data | None = None):
+    def init_rom(
+        self,
+        rom: NintendoDSRom,
+        rom_static_data: Pmd2Data | None = None,
+        rom_catalogue: RomCatalogue | None = None,
+    ):
         # TODO: Support different default configs based on region?
         self.__input_rom = rom
         self.__input_rom_static_data = rom_static_data
+        if rom_static_data is not None:
+            self.__rom_catalogue.load(rom, rom_static_data, rom_catalogue)
         self.__randomization_settings = ConfigFileLoader.load(os.path.join(data_dir(), "default.json"))
 
     @property
@@ -124,6 +134,11 @@ class GtkFrontend(AbstractFrontend):
         assert self.__input_rom_static_data is not None
         return self.__input_rom_static_data
 
+    @property
+    def rom_catalogue(self) -> RomCatalogueService:
+        """Names and IDs of the input ROM, for the settings pages."""
+        return self.__rom_catalogue
+
     def display_error(self, error: str, parent: Gtk.Window):
         d = Adw.AlertDialog(
             body=error,
@@ -77,6 +77,7 @@ from skytemple_randomizer.frontend.gtk.widgets.window_portrait_debug import (
     PortraitDebugWindow,
 )
 from skytemple_randomizer.frontend.gtk.frontend import GtkFrontend
+from skytemple_randomizer.frontend.gtk.rom_catalogue import RomCatalogue
 from skytemple_randomizer.frontend.gtk.widgets import AppWindow
 
 SKYTEMPLE_DEV = "SKYTEMPLE_DEV" in os.environ
@@ -129,9 +130,10 @@ class MainApp(Adw.Application):
         rom_path: str,
         rom: NintendoDSRom,
         rom_static_data: Pmd2Data,
+        rom_catalogue: RomCatalogue | None = None,
     ):
         frontend = GtkFrontend.instance()
-        frontend.window.stack_item_main.init_rom(rom_path, rom, rom_static_data)
+        frontend.window.stack_item_main.init_rom(rom_path, rom, rom_static_data, rom_catalogue)
         frontend.window.content_stack.set_visible_child(frontend.window.stack_item_main)
 
 
@@ -0,0 +1,314 @@
+#  Copyright 2020-2025 SkyTemple Contributors
+#
+#  This file is part of SkyTemple.
+#
+#  SkyTemple is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  SkyTemple is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with SkyTemple.  If not, see <https://www.gnu.org/licenses/>.
+from __future__ import annotations
+
+import re
+import unicodedata
+from bisect import bisect_left, bisect_right
+from collections.abc import Callable, Iterable, Sequence
+from typing import cast
+
+from gi.repository import Gtk, Gdk, Gio, GLib, GObject, Pango
+from skytemple_files.common.i18n_util import _
+
+from skytemple_randomizer.frontend.gtk.frontend import GtkFrontend
+
+# Time after the last change of the search query before the list is filtered.
+SEARCH_DEBOUNCE_MS = 150
+
+
+def parse_pool_list(text: str) -> set[int]:
+    """Parses a pasted list of entry IDs. IDs may be separated by anything that is not a digit (eg. "#001, #002")."""
+    return {int(x) for x in re.findall(r"\d+", text)}
+
+
+def read_pool_list_from_clipboard(widget: Gtk.Widget, callback: Callable[[set[int]], None]):
+    """Reads a list of entry IDs from the clipboard (see parse_pool_list) and passes it to the callback."""
+
+    def on_read(clipboard: Gdk.Clipboard, result: Gio.AsyncResult):
+        try:
+            text = clipboard.read_text_finish(result)
+        except GLib.GError as e:
+            GtkFrontend.instance().display_error(
+                _("Failed to paste: Error while reading the clipboard ({}).").format(e),
+                cast(Gtk.Window, widget.get_root()),
+            )
+            return
+        if text:
+            callback(parse_pool_list(text))
+
+    widget.get_clipboard().read_text_async(None, on_read)
+
+
+def normalize_search_text(text: str) -> str:
+    """Case- and accent-folds text for searching, so that eg. "flabebe" finds "Flabébé"."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+class PoolSearchIndex:
+    """
+    Search index over the entries of a pool page, built once when the page is filled.
+
+    Each entry is indexed by its normalized name and its ID (with and without the "#000" formatting).
+    Lookups return a bitset (as int) with the bit for each matching entry ID set.
+    """
+
+    _haystack: str
+    _starts: list[int]
+    _ids: list[int]
+    _words: list[str]
+    _word_ids: list[int]
+    _cache: dict[str, int]
+
+    def __init__(self, entries: Sequence[tuple[int, str]]):
+        keys = [normalize_search_text(f"{' '.join(name.split())} #{idx:03} {idx}") for idx, name in entries]
+        self._ids = [idx for idx, __ in entries]
+        self._starts = []
+        offset = 0
+        for key in keys:
+            self._starts.append(offset)
+            offset += len(key) + 1
+        # All keys in one string, so substring lookups are a few str.find calls instead of one check per entry.
+        self._haystack = "\n".join(keys)
+        words = sorted((word, idx) for idx, key in zip(self._ids, keys) for word in key.split())
+        self._words = [word for word, __ in words]
+        self._word_ids = [idx for __, idx in words]
+        self._cache = {}
+
+    def prefix(self, token: str) -> int:
+        """Entries with a word starting with token."""
+        bits = 0
+        for i in range(bisect_left(self._words, token), len(self._words)):
+            if not self._words[i].startswith(token):
+                break
+            bits |= 1 << self._word_ids[i]
+        return bits
+
+    def substring(self, token: str) -> int:
+        """Entries containing token anywhere."""
+        bits = 0
+        find = self._haystack.find
+        pos = find(token)
+        while pos != -1:
+            i = bisect_right(self._starts, pos) - 1
+            bits |= 1 << self._ids[i]
+            if i + 1 >= len(self._starts):
+                break
+            pos = find(token, self._starts[i + 1])
+        return bits
+
+    def search(self, query: str) -> int | None:
+        """
+        Entries matching every word of the query. Single characters only match word prefixes, longer words match
+        anywhere. Returns None if the query is empty, meaning everything matches.
+        """
+        tokens = normalize_search_text(query).split()
+        if len(tokens) < 1:
+            return None
+        result = -1
+        for token in tokens:
+            bits = self._cache.get(token)
+            if bits is None:
+                bits = self.prefix(token) if len(token) < 2 else self.substring(token)
+                if len(self._cache) > 256:
+                    self._cache.clear()
+                self._cache[token] = bits
+            result &= bits
+        return result
+
+
+class PoolModelRow(GObject.Object):
+    """A single entry of a pool page. Only these lightweight objects exist per pool entry, row widgets are recycled."""
+
+    def __init__(self, idx: int, name: str):
+        super().__init__()
+        self.idx = idx
+        self.name = name
+        self.subtitle = f"#{idx:03}"
+
+    name = GObject.Property(type=str)
+    subtitle = GObject.Property(type=str)
+
+
+class PoolRowWidget(Gtk.Box):
+    """The widget shown for one visible pool entry. Re-bound to other entries while scrolling."""
+
+    __gtype_name__ = "StPoolRowWidget"
+
+    title_label: Gtk.Label
+    subtitle_label: Gtk.Label
+    switch: Gtk.Switch
+    switch_handler: int
+    row: PoolModelRow | None
+
+    def __init__(self):
+        super().__init__(spacing=12, margin_start=12, margin_end=12, margin_top=8, margin_bottom=8)
+        labels = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, valign=Gtk.Align.CENTER, hexpand=True)
+        self.title_label = Gtk.Label(xalign=0, ellipsize=Pango.EllipsizeMode.END)
+        self.subtitle_label = Gtk.Label(xalign=0, css_classes=["dim-label", "caption"])
+        labels.append(self.title_label)
+        labels.append(self.subtitle_label)
+        self.switch = Gtk.Switch(valign=Gtk.Align.CENTER)
+        self.append(labels)
+        self.append(self.switch)
+        self.switch_handler = 0
+        self.row = None
+
+
+class PoolListModel:
+    """
+    Model for the pool pages, backing a Gtk.ListView that has a SignalListItemFactory.
+
+    Holds one PoolModelRow per pool entry in a Gio.ListStore, which is filtered using a PoolSearchIndex. Changes to the
+    search query are debounced, so typing only triggers one refilter.
+    Which entries are enabled is tracked in a set. Every change, whether a single row toggled by the user or one of
+    the bulk operations, updates that set in one step, calls on_changed once with it and then refreshes only the rows
+    that are currently bound to a widget.
+    """
+
+    store: Gio.ListStore
+    filter: Gtk.CustomFilter
+    entries: dict[int, PoolModelRow]
+    selection: set[int]
+    search_index: PoolSearchIndex
+    _search_query: str
+    _search_matches: int | None
+    _search_timeout: int | None
+    _bound: set[PoolRowWidget]
+    _on_changed: Callable[[set[int]], None]
+
+    def __init__(
+        self,
+        list_view: Gtk.ListView,
+        on_changed: Callable[[set[int]], None],
+    ):
+        self.store = Gio.ListStore(item_type=PoolModelRow)
+        self.filter = Gtk.CustomFilter.new(self._filter)
+        self.entries = {}
+        self.selection = set()
+        self.search_index = PoolSearchIndex(())
+        self._search_query = ""
+        self._search_matches = None
+        self._search_timeout = None
+        self._bound = set()
+        self._on_changed = on_changed
+
+        f = list_view.get_factory()
+        assert f is not None
+        f.connect("setup", self._on_factory_setup)
+        f.connect("bind", self._on_factory_bind)
+        f.connect("unbind", self._on_factory_unbind)
+
+        list_view.set_model(Gtk.NoSelection(model=Gtk.FilterListModel(model=self.store, filter=self.filter)))
+        list_view.connect("activate", self._on_list_view_activate)
+
+    def fill(self, entries: Sequence[tuple[int, str]], pool: Iterable[int]):
+        self.selection = set(pool)
+        self.search_index = PoolSearchIndex(entries)
+        self._search_matches = self.search_index.search(self._search_query)
+        rows = [PoolModelRow(idx, name) for idx, name in entries]
+        self.entries = {row.idx: row for row in rows}
+        self.store.splice(0, self.store.get_n_items(), rows)
+
+    def set_active(self, idx: int, active: bool):
+        if active == (idx in self.selection):
+            return
+        if active:
+            self.selection.add(idx)
+        else:
+            self.selection.discard(idx)
+        self._changed()
+
+    def set_selection(self, pool: Iterable[int]):
+        """Replace the enabled entries."""
+        self.selection = set(pool)
+        self._changed()
+
+    def select_all(self):
+        self.set_selection(self.entries.keys())
+
+    def select_none(self):
+        self.set_selection(())
+
+    def search(self, query: str):
+        """Filter the list by the query, once it didn't change for SEARCH_DEBOUNCE_MS."""
+        if self._search_timeout is not None:
+            GLib.source_remove(self._search_timeout)
+        self._search_timeout = GLib.timeout_add(SEARCH_DEBOUNCE_MS, self._apply_search, query)
+
+    def _apply_search(self, query: str):
+        self._search_timeout = None
+        old_matches = self._search_matches
+        self._search_query = query
+        self._search_matches = self.search_index.search(query)
+        if self._search_matches != old_matches:
+            if old_matches is None or (self._search_matches is not None and self._search_matches & ~old_matches == 0):
+                change = Gtk.FilterChange.MORE_STRICT
+            elif self._search_matches is None or old_matches & ~self._search_matches == 0:
+                change = Gtk.FilterChange.LESS_STRICT
+            else:
+                change = Gtk.FilterChange.DIFFERENT
+            self.filter.changed(change)
+        return False
+
+    def _filter(self, row: GObject.Object) -> bool:
+        assert isinstance(row, PoolModelRow)
+        return self._search_matches is None or bool(self._search_matches >> row.idx & 1)
+
+    def _changed(self):
+        self._on_changed(self.selection)
+        for widget in self._bound:
+            self._refresh(widget)
+
+    def _refresh(self, widget: PoolRowWidget):
+        assert widget.row is not None
+        with widget.switch.handler_block(widget.switch_handler):
+            widget.switch.set_active(widget.row.idx in self.selection)
+
+    def _on_switch_notify_active(self, switch: Gtk.Switch, _pspec, widget: PoolRowWidget):
+        if widget.row is not None:
+            self.set_active(widget.row.idx, switch.get_active())
+
+    def _on_list_view_activate(self, list_view: Gtk.ListView, position: int):
+        # The selection model is a Gio.ListModel, the type stubs don't know that.
+        model = cast(Gio.ListModel, list_view.get_model())
+        assert model is not None
+        row = model.get_item(position)
+        if isinstance(row, PoolModelRow):
+            self.set_active(row.idx, row.idx not in self.selection)
+
+    def _on_factory_setup(self, _factory, list_item: Gtk.ListItem):
+        widget = PoolRowWidget()
+        widget.switch_handler = widget.switch.connect("notify::active", self._on_switch_notify_active, widget)
+        list_item.set_child(widget)
+
+    def _on_factory_bind(self, _factory, list_item: Gtk.ListItem):
+        widget = list_item.get_child()
+        row = list_item.get_item()
+        assert isinstance(widget, PoolRowWidget) and isinstance(row, PoolModelRow)
+        widget.row = row
+        widget.title_label.set_label(row.name)
+        widget.subtitle_label.set_label(row.subtitle)
+        self._refresh(widget)
+        self._bound.add(widget)
+
+    def _on_factory_unbind(self, _factory, list_item: Gtk.ListItem):
+        widget = list_item.get_child()
+        assert isinstance(widget, PoolRowWidget)
+        self._bound.discard(widget)
+        widget.row = None
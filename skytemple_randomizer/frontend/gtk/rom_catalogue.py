@@ -0,0 +1,250 @@
+#  Copyright 2020-2025 SkyTemple Contributors
+#
+#  This file is part of SkyTemple.
+#
+#  SkyTemple is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  SkyTemple is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with SkyTemple.  If not, see <https://www.gnu.org/licenses/>.
+from __future__ import annotations
+
+import json
+import locale
+import logging
+from collections.abc import Callable
+from threading import Thread
+from typing import NamedTuple, Any
+
+from gi.repository import GLib
+from ndspy.rom import NintendoDSRom
+from skytemple_files.common.i18n_util import _
+from skytemple_files.common.ppmdu_config.data import Pmd2Data
+from skytemple_files.common.types.file_types import FileType
+from skytemple_files.common.util import MONSTER_MD, get_binary_from_rom
+from skytemple_files.data.md.protocol import Ability
+from skytemple_files.hardcoded.dungeons import HardcodedDungeons
+from skytemple_files.patch.patches import Patcher
+
+from skytemple_randomizer.randomizer.util.disk_cache import cache_key, cache_read, cache_write, package_version
+from skytemple_randomizer.string_provider import StringProvider, StringType
+
+logger = logging.getLogger(__name__)
+
+ITEM_FILE = "BALANCE/item_p.bin"
+WAZA_P = "BALANCE/waza_p.bin"
+# Abilities with a higher ID don't have names.
+NAMED_ABILITIES = 124
+# Bump when the catalogue contents change, to invalidate cached catalogues.
+CATALOGUE_VERSION = 1
+
+
+class CatalogueEntry(NamedTuple):
+    id: int
+    name: str
+
+
+class DungeonCatalogueEntry(NamedTuple):
+    id: int
+    name: str
+    selection_name: str
+
+
+class RomCatalogue:
+    """
+    Immutable snapshot of the names and IDs of the things in a ROM that the settings pages list.
+    Decoded once per loaded ROM, see RomCatalogueService.
+    """
+
+    __slots__ = ["monsters", "moves", "items", "abilities", "dungeons", "expand_poke_list_applied"]
+
+    monsters: tuple[CatalogueEntry, ...]
+    moves: tuple[CatalogueEntry, ...]
+    items: tuple[CatalogueEntry, ...]
+    abilities: tuple[CatalogueEntry, ...]
+    dungeons: tuple[DungeonCatalogueEntry, ...]
+    expand_poke_list_applied: bool
+
+    def __init__(
+        self,
+        monsters: tuple[CatalogueEntry, ...],
+        moves: tuple[CatalogueEntry, ...],
+        items: tuple[CatalogueEntry, ...],
+        abilities: tuple[CatalogueEntry, ...],
+        dungeons: tuple[DungeonCatalogueEntry, ...],
+        expand_poke_list_applied: bool,
+    ):
+        self.monsters = monsters
+        self.moves = moves
+        self.items = items
+        self.abilities = abilities
+        self.dungeons = dungeons
+        self.expand_poke_list_applied = expand_poke_list_applied
+
+    @classmethod
+    def load(cls, rom: NintendoDSRom, static_data: Pmd2Data) -> RomCatalogue:
+        strings = StringProvider(rom, static_data)
+
+        expand_poke_list_applied = _is_applied(Patcher(rom, static_data), "ExpandPokeList")
+        b_attr = "entid" if expand_poke_list_applied else "md_index_base"
+        monster_md = FileType.MD.deserialize(rom.getFileByName(MONSTER_MD))
+        monster_names: dict[int, str] = {}
+        for entry in monster_md.entries:
+            baseid = getattr(entry, b_attr)
+            monster_names[baseid] = strings.get_value(StringType.POKEMON_NAMES, baseid)
+
+        waza_p = FileType.WAZA_P.deserialize(rom.getFileByName(WAZA_P))
+        item_p = FileType.ITEM_P.deserialize(rom.getFileByName(ITEM_FILE))
+
+        abilities = []
+        for ability in Ability:
+            name = _("Unused") + f" 0x{ability.value:0x}"
+            if ability.value < NAMED_ABILITIES:
+                name = strings.get_value(StringType.ABILITY_NAMES, ability.value)
+            abilities.append(CatalogueEntry(ability.value, name))
+
+        dungeon_list = HardcodedDungeons.get_dungeon_list(
+            get_binary_from_rom(rom, static_data.bin_sections.arm9),
+            static_data,
+        )
+
+        return cls(
+            monsters=tuple(CatalogueEntry(i, name) for i, name in monster_names.items()),
+            moves=tuple(
+                CatalogueEntry(i, strings.get_value(StringType.MOVE_NAMES, i)) for i in range(len(waza_p.moves))
+            ),
+            items=tuple(
+                CatalogueEntry(i, strings.get_value(StringType.ITEM_NAMES, i)) for i in range(len(item_p.item_list))
+            ),
+            abilities=tuple(abilities),
+            dungeons=tuple(
+                DungeonCatalogueEntry(
+                    i,
+                    strings.get_value(StringType.DUNGEON_NAMES_MAIN, i),
+                    strings.get_value(StringType.DUNGEON_NAMES_SELECTION, i),
+                )
+                for i in range(len(dungeon_list))
+            ),
+            expand_poke_list_applied=expand_poke_list_applied,
+        )
+
+    @classmethod
+    def load_cached(cls, rom: NintendoDSRom, static_data: Pmd2Data, rom_fingerprint: str) -> RomCatalogue:
+        """Like load, but re-uses the catalogue from the on-disk cache if the same ROM was opened before."""
+        key = cache_key(
+            str(CATALOGUE_VERSION),
+            rom_fingerprint,
+            package_version("skytemple-files"),
+            # The language of the names depends on the locale, see StringProvider.
+            str(locale.getlocale()),
+            _("Unused"),
+        )
+        data = cache_read("rom_catalogue", key)
+        if data is not None:
+            try:
+                return cls.from_json(json.loads(data))
+            except (ValueError, KeyError, TypeError):
+                pass
+        catalogue = cls.load(rom, static_data)
+        cache_write("rom_catalogue", key, json.dumps(catalogue.to_json()).encode("utf-8"))
+        return catalogue
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> RomCatalogue:
+        return cls(
+            monsters=tuple(CatalogueEntry(*entry) for entry in data["monsters"]),
+            moves=tuple(CatalogueEntry(*entry) for entry in data["moves"]),
+            items=tuple(CatalogueEntry(*entry) for entry in data["items"]),
+            abilities=tuple(CatalogueEntry(*entry) for entry in data["abilities"]),
+            dungeons=tuple(DungeonCatalogueEntry(*entry) for entry in data["dungeons"]),
+            expand_poke_list_applied=data["expand_poke_list_applied"],
+        )
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "monsters": self.monsters,
+            "moves": self.moves,
+            "items": self.items,
+            "abilities": self.abilities,
+            "dungeons": self.dungeons,
+            "expand_poke_list_applied": self.expand_poke_list_applied,
+        }
+
+
+class RomCatalogueService:
+    """
+    Provides the RomCatalogue of the current input ROM. It is loaded on a background thread when the ROM is loaded,
+    pages that ask for it before that are called back once it's done. Only used from the GTK main thread.
+    """
+
+    _catalogue: RomCatalogue | None
+    _waiting: list[Callable[[RomCatalogue], None]]
+    _generation: int
+
+    def __init__(self):
+        self._catalogue = None
+        self._waiting = []
+        self._generation = 0
+
+    def load(self, rom: NintendoDSRom, static_data: Pmd2Data, catalogue: RomCatalogue | None = None):
+        """
+        Starts loading the catalogue of a newly loaded ROM. Replaces the catalogue of the previous ROM.
+        If the catalogue was already loaded (see rom_open), it is used as is.
+        """
+        self._generation += 1
+        self._catalogue = catalogue
+        # Pages still waiting for the previous ROM are populated with the catalogue of this one instead.
+        generation = self._generation
+        if catalogue is not None:
+            self._loaded(generation, catalogue)
+            return
+
+        def load_thread():
+            try:
+                catalogue = RomCatalogue.load(rom, static_data)
+            except Exception as e:
+                logger.error("Failed to load the ROM catalogue.", exc_info=e)
+                GLib.idle_add(self._failed, generation, e)
+                return
+            GLib.idle_add(self._loaded, generation, catalogue)
+
+        Thread(target=load_thread, daemon=True).start()
+
+    def get(self, callback: Callable[[RomCatalogue], None]):
+        """Calls callback with the catalogue of the current ROM, right away if it's loaded already."""
+        if self._catalogue is not None:
+            callback(self._catalogue)
+        else:
+            self._waiting.append(callback)
+
+    def _loaded(self, generation: int, catalogue: RomCatalogue):
+        # A ROM that was loaded after this one replaced it.
+        if generation == self._generation:
+            self._catalogue = catalogue
+            waiting = self._waiting
+            self._waiting = []
+            for callback in waiting:
+                callback(catalogue)
+        return False
+
+    def _failed(self, generation: int, error: Exception):
+        from skytemple_randomizer.frontend.gtk.frontend import GtkFrontend
+
+        if generation == self._generation:
+            frontend = GtkFrontend.instance()
+            frontend.display_error(_("Failed to load the data of the ROM:") + " " + str(error), frontend.window)
+        return False
+
+
+def _is_applied(patcher: Patcher, patch: str) -> bool:
+    try:
+        return patcher.is_applied(patch)
+    except NotImplementedError:
+        return False
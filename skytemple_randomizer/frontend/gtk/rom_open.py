@@ -0,0 +1,96 @@
+#  Copyright 2020-2025 SkyTemple Contributors
+#
+#  This file is part of SkyTemple.
+#
+#  SkyTemple is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  SkyTemple is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with SkyTemple.  If not, see <https://www.gnu.org/licenses/>.
+from __future__ import annotations
+
+import os
+from collections import OrderedDict
+from collections.abc import Callable
+from threading import Lock, Thread
+
+from gi.repository import GLib
+from ndspy.rom import NintendoDSRom
+from skytemple_files.common.i18n_util import _
+from skytemple_files.common.ppmdu_config.data import Pmd2Data
+from skytemple_files.common.util import get_ppmdu_config_for_rom
+
+from skytemple_randomizer.frontend.gtk.rom_catalogue import RomCatalogue
+from skytemple_randomizer.randomizer.util.disk_cache import cache_key
+from skytemple_randomizer.rom_io import load_rom
+
+# Number of progress steps reported by open_rom_async.
+OPEN_ROM_STEPS = 3
+# Static data of the most recently opened ROMs, by ROM fingerprint.
+STATIC_DATA_CACHE_SIZE = 4
+
+_static_data_cache: OrderedDict[str, Pmd2Data] = OrderedDict()
+_static_data_cache_lock = Lock()
+
+
+def rom_fingerprint(path: str, rom: NintendoDSRom) -> str:
+    """Identifies the ROM file at path for as long as it isn't modified, without reading all of it."""
+    st = os.stat(path)
+    return cache_key(
+        os.path.realpath(path),
+        str(st.st_size),
+        str(st.st_mtime_ns),
+        rom.idCode,
+        rom.arm9,
+    )
+
+
+def get_static_data(rom: NintendoDSRom, fingerprint: str) -> Pmd2Data:
+    """get_ppmdu_config_for_rom, re-using the static data if the same ROM was opened before."""
+    with _static_data_cache_lock:
+        static_data = _static_data_cache.get(fingerprint)
+        if static_data is not None:
+            _static_data_cache.move_to_end(fingerprint)
+            return static_data
+    static_data = get_ppmdu_config_for_rom(rom)
+    with _static_data_cache_lock:
+        _static_data_cache[fingerprint] = static_data
+        while len(_static_data_cache) > STATIC_DATA_CACHE_SIZE:
+            _static_data_cache.popitem(last=False)
+    return static_data
+
+
+def open_rom_async(
+    path: str,
+    on_progress: Callable[[int, str], None],
+    on_done: Callable[[NintendoDSRom, Pmd2Data, RomCatalogue], None],
+    on_error: Callable[[Exception], None],
+):
+    """
+    Opens the ROM at path on a worker thread: Reads the ROM, loads its static data and the RomCatalogue the
+    settings pages need. on_progress is called with the index of the step that starts (out of OPEN_ROM_STEPS) and
+    a description. Then either on_done or on_error is called. All callbacks run on the GLib main loop.
+    """
+
+    def open_thread():
+        try:
+            GLib.idle_add(on_progress, 0, _("Reading ROM..."))
+            rom = load_rom(path)
+            fingerprint = rom_fingerprint(path, rom)
+            GLib.idle_add(on_progress, 1, _("Loading game data..."))
+            static_data = get_static_data(rom, fingerprint)
+            GLib.idle_add(on_progress, 2, _("Reading names and dungeons..."))
+            catalogue = RomCatalogue.load_cached(rom, static_data, fingerprint)
+        except Exception as e:
+            GLib.idle_add(on_error, e)
+            return
+        GLib.idle_add(on_done, rom, static_data, catalogue)
+
+    Thread(target=open_thread, daemon=True).start()
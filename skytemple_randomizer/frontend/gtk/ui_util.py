@@ -27,6 +27,7 @@ from skytemple_files.common.i18n_util import _
 
 from skytemple_randomizer.config import version
 from skytemple_randomizer.frontend.gtk.frontend import GtkFrontend
+from skytemple_randomizer.rom_patch import PATCH_EXTENSION
 
 T = TypeVar("T", bound=GObject.Object)
 X = TypeVar("X")
@@ -115,6 +116,13 @@ def nds_filter() -> Gtk.FileFilter:
     return nds_filter
 
 
+def patch_filter() -> Gtk.FileFilter:
+    patch_filter = Gtk.FileFilter()
+    patch_filter.add_suffix(PATCH_EXTENSION[1:])
+    patch_filter.set_name(_("Randomizer Patch (*{})").format(PATCH_EXTENSION))
+    return patch_filter
+
+
 def json_filter() -> Gtk.FileFilter:
     json_filter = Gtk.FileFilter()
     json_filter.add_suffix("json")
@@ -18,7 +18,6 @@ from __future__ import annotations
 
 import ctypes
 import os
-import random
 import sys
 import traceback
 from functools import partial
@@ -35,10 +34,15 @@ from skytemple_randomizer.data_dir import data_dir
 from skytemple_randomizer.frontend.gtk.frontend import GtkFrontend
 from skytemple_randomizer.frontend.gtk.init_locale import LocalePatchedGtkTemplate
 from skytemple_randomizer.frontend.gtk.path import MAIN_PATH
-from skytemple_randomizer.frontend.gtk.ui_util import open_dir, run_file_dialog, nds_filter
-from skytemple_randomizer.randomizer.util.debug import DebugRandom
+from skytemple_randomizer.frontend.gtk.ui_util import open_dir, run_file_dialog, nds_filter, patch_filter
+from skytemple_randomizer.randomizer.util.debug import create_rng
 from skytemple_randomizer.randomizer_thread import RandomizerThread
-from skytemple_randomizer.status import Status
+from skytemple_randomizer.rom_io import save_rom_to_file
+from skytemple_randomizer.rom_patch import PATCH_EXTENSION, create_rom_patch
+from skytemple_randomizer.status import Status, StatusEvent
+
+# Maximum number of progress updates shown per second.
+STATUS_MAX_RATE = 10
 
 
 @LocalePatchedGtkTemplate(filename=os.path.join(MAIN_PATH, "dialog_randomize.ui"))
@@ -69,6 +73,7 @@ class RandomizeDialog(Adw.Dialog):
     output_file: Gio.File | None
     _is_currently_randomizing: bool
     _randomizer: RandomizerThread | None
+    _status_description: str
 
     def __init__(
         self,
@@ -88,6 +93,7 @@ class RandomizeDialog(Adw.Dialog):
         self.output_file = None
         self._is_currently_randomizing = False
         self._randomizer = None
+        self._status_description = ""
 
         self.metadata_source.set_subtitle(self.input_rom_path)
         self.metadata_region_value.set_label(self.rom_static_data.game_edition)
@@ -131,7 +137,7 @@ class RandomizeDialog(Adw.Dialog):
         run_file_dialog(
             GtkFrontend.instance(),
             "output_rom",
-            (nds_filter(),),
+            (nds_filter(), patch_filter()),
             callback_ok=self.do_save,
             callback_error=self.do_save_err,
             initial_name="randomized_rom.nds",
@@ -157,20 +163,20 @@ class RandomizeDialog(Adw.Dialog):
         self.metadata_output.set_sensitive(True)
         self.metadata_output.add_css_class("property")
         self.status_row.set_title(_("Randomizing... ({}%)").format(0))
+        self._status_description = ""
 
         # Configure and start randomizer
         status = Status()
-        status.subscribe(lambda a, b: GLib.idle_add(partial(self.on_update_status, a, b)))
-        rng: random.Random
-        if "SKYTEMPLE_RANDOMIZER_DEBUG_DIR_RNG" in os.environ:
-            rng = DebugRandom(self.seed)
-        else:
-            rng = random.Random(self.seed)
+
+        def on_status_event(event: StatusEvent):
+            GLib.idle_add(partial(self.on_update_status, event.step, event.description))
+
+        status.subscribe_async(on_status_event, max_rate=STATUS_MAX_RATE)
         randomizer = RandomizerThread(
             status,
             self.rom,
             self.randomization_settings,
-            rng,
+            create_rng(self.seed),
             str(self.seed),
             GtkFrontend.instance(),
         )
@@ -188,12 +194,21 @@ class RandomizeDialog(Adw.Dialog):
         open_dir(os.path.dirname(self.metadata_output.get_subtitle()))  # type: ignore
 
     def on_update_status(self, progress: int, description: str):
+        # Updates may still be queued when the randomization is done.
+        if description != Status.DONE_SPECIAL_STR and self._is_currently_randomizing:
+            self._status_description = description
+            self.update_progress()
+
+    def update_progress(self):
+        """Shows the estimated progress. Also called periodically, so it keeps moving during long steps."""
         assert self._randomizer is not None
-        self.progress_bar.set_fraction((progress - 1) / self._randomizer.total_steps)
-        if description != Status.DONE_SPECIAL_STR:
-            abs_progress = floor((progress - 1) / self._randomizer.total_steps * 100)
-            self.status_row.set_title(_("Randomizing... ({}%)").format(abs_progress))
-            self.status_row.set_subtitle(description)
+        estimate = self._randomizer.progress.estimate()
+        self.progress_bar.set_fraction(estimate.fraction)
+        self.status_row.set_title(_("Randomizing... ({}%)").format(floor(estimate.fraction * 100)))
+        if estimate.eta is None:
+            self.status_row.set_subtitle(self._status_description)
+        else:
+            self.status_row.set_subtitle(f"{self._status_description}\n{format_eta(estimate.eta)}")
 
     def force_cancel_randomization(self):
         if self._randomizer is None:
@@ -209,6 +224,8 @@ class RandomizeDialog(Adw.Dialog):
     def check_done(self):
         assert self._randomizer is not None
         if not self._randomizer.is_done():
+            if self._status_description != "":
+                self.update_progress()
             return True
         self._is_currently_randomizing = False
         if self._randomizer.error:
@@ -222,7 +239,14 @@ class RandomizeDialog(Adw.Dialog):
             assert self.output_file is not None
             out_path = self.output_file.get_path()
             assert out_path is not None
-            self._randomizer.rom.saveToFile(out_path, updateDeviceCapacity=True)
+            if out_path.endswith(PATCH_EXTENSION):
+                # Only save the differences to the input ROM.
+                with open(self.input_rom_path, "rb") as f:
+                    patch = create_rom_patch(f.read(), self._randomizer.rom.save(updateDeviceCapacity=True))
+                with open(out_path, "wb") as f:
+                    f.write(patch)
+            else:
+                save_rom_to_file(self._randomizer.rom, out_path)
             status_img_path = os.path.join(data_dir(), "duskako_happy.png")
             self.status_row.set_title(_("Randomizing complete!"))
             self.status_row.set_subtitle("")
@@ -233,3 +257,11 @@ class RandomizeDialog(Adw.Dialog):
         self.status_icon.set_child(image)
 
         return False
+
+
+def format_eta(seconds: float) -> str:
+    if seconds >= 90:
+        return _("About {} minutes remaining").format(round(seconds / 60))
+    if seconds >= 10:
+        return _("About {} seconds remaining").format(round(seconds / 10) * 10)
+    return _("A few seconds remaining")
@@ -19,18 +19,17 @@ from __future__ import annotations
 import csv
 import os
 from functools import partial
-from threading import Thread
 from typing import cast
 
 from gi.repository import Gtk, Adw, GLib, Gio
 from skytemple_files.common.i18n_util import _
-from skytemple_files.common.util import get_binary_from_rom, open_utf8
-from skytemple_files.hardcoded.dungeons import HardcodedDungeons
+from skytemple_files.common.util import open_utf8
 
 from skytemple_randomizer.config import RandomizerConfig, DungeonSettingsConfig
 from skytemple_randomizer.frontend.gtk.frontend import GtkFrontend
 from skytemple_randomizer.frontend.gtk.init_locale import LocalePatchedGtkTemplate
 from skytemple_randomizer.frontend.gtk.path import MAIN_PATH
+from skytemple_randomizer.frontend.gtk.rom_catalogue import RomCatalogue
 from skytemple_randomizer.frontend.gtk.ui_util import run_file_dialog, csv_filter
 from skytemple_randomizer.string_provider import StringProvider, StringType
 
@@ -87,40 +86,18 @@ class DungeonsIndividualSettingsPage(Adw.PreferencesPage):
         self._suppress_signals = True
         self.randomization_settings = config
 
-        frontend = GtkFrontend.instance()
-        rom = frontend.input_rom
-        static_data = frontend.input_rom_static_data
-
-        dungeons: dict[int, tuple[DungeonSettingsConfig, str, str]] = {}
         configs = config["dungeons"]["settings"]
 
-        def load_thread():
-            string_provider = StringProvider(rom, frontend.input_rom_static_data)
-
-            dungeon_list = HardcodedDungeons.get_dungeon_list(
-                get_binary_from_rom(rom, static_data.bin_sections.arm9),
-                static_data,
-            )
-
-            for i, dungeon in enumerate(dungeon_list):
-                dungeons[i] = (
-                    self._get_or_default(configs, i),
-                    string_provider.get_value(StringType.DUNGEON_NAMES_MAIN, i),
-                    string_provider.get_value(StringType.DUNGEON_NAMES_SELECTION, i),
-                )
-
-            GLib.idle_add(finish_load)
-
-        def finish_load():
-            for i, (config, name1, name2) in dungeons.items():
-                row = self._make_row(i, config, name1, name2)
+        def finish_load(catalogue: RomCatalogue):
+            for i, name1, name2 in catalogue.dungeons:
+                row = self._make_row(i, self._get_or_default(configs, i), name1, name2)
                 self.pool_list.append(row)
             self._suppress_signals = False
             self.stack.set_visible_child(self.pool_list)
 
         self.pool_list.set_filter_func(self.pool_filter)
 
-        Thread(target=load_thread).start()
+        GtkFrontend.instance().rom_catalogue.get(finish_load)
 
     def on_search_changed(self, search_entry: Gtk.SearchEntry):
         if self._suppress_signals:
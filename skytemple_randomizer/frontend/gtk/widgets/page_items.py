@@ -17,39 +17,35 @@
 from __future__ import annotations
 
 import os
-from functools import partial
-from threading import Thread
 from typing import cast
 
 from skytemple_files.common.i18n_util import _
-from skytemple_files.common.types.file_types import FileType
 
 from skytemple_randomizer.config import RandomizerConfig
 from skytemple_randomizer.frontend.gtk.frontend import GtkFrontend
 from skytemple_randomizer.frontend.gtk.init_locale import LocalePatchedGtkTemplate
 from skytemple_randomizer.frontend.gtk.path import MAIN_PATH
+from skytemple_randomizer.frontend.gtk.pool_list import PoolListModel, read_pool_list_from_clipboard
+from skytemple_randomizer.frontend.gtk.rom_catalogue import RomCatalogue
 
-from gi.repository import Gtk, Adw, GLib
+from gi.repository import Gtk, Adw
 
 from skytemple_randomizer.frontend.gtk.widgets import RandomizationSettingsWidget
 from skytemple_randomizer.lists import DEFAULTITEMPOOL
-from skytemple_randomizer.string_provider import StringProvider, StringType
-
-ITEM_FILE = "BALANCE/item_p.bin"
 
 
 @LocalePatchedGtkTemplate(filename=os.path.join(MAIN_PATH, "page_items.ui"))
-class ItemsPage(Adw.PreferencesPage):
+class ItemsPage(Adw.Bin):
     __gtype_name__ = "StItemsPage"
 
     stack = cast(Gtk.Stack, Gtk.Template.Child())
     spinner = cast(Gtk.Spinner, Gtk.Template.Child())
-    pool_list = cast(Gtk.ListBox, Gtk.Template.Child())
+    pool_scroll = cast(Gtk.ScrolledWindow, Gtk.Template.Child())
+    pool_list = cast(Gtk.ListView, Gtk.Template.Child())
 
     randomization_settings: RandomizerConfig | None
     parent_page: RandomizationSettingsWidget
-    search_text: str
-    rows: dict[int, Adw.SwitchRow]
+    pool_model: PoolListModel
     _suppress_signals: bool
 
     def __init__(
@@ -61,44 +57,20 @@ class ItemsPage(Adw.PreferencesPage):
         super().__init__(*args, **kwargs)
         self.parent_page = parent_page
         self.randomization_settings = None
-        self.search_text = ""
-        self.rows = {}
+        self.pool_model = PoolListModel(self.pool_list, self.on_pool_changed)
         self._suppress_signals = False
 
     def populate_settings(self, config: RandomizerConfig):
         self._suppress_signals = True
         self.randomization_settings = config
 
-        frontend = GtkFrontend.instance()
-        rom = frontend.input_rom
-
-        items: dict[int, tuple[bool, str]] = {}
-
-        def load_thread():
-            string_provider = StringProvider(rom, frontend.input_rom_static_data)
-
-            item_p = FileType.ITEM_P.deserialize(rom.getFileByName(ITEM_FILE))
+        def finish_load(catalogue: RomCatalogue):
+            self.pool_model.fill(catalogue.items, self.pool())
+            self.stack.set_visible_child(self.pool_scroll)
 
-            for i, entry in enumerate(item_p.item_list):
-                items[i] = (
-                    i in self.pool(),
-                    string_provider.get_value(StringType.ITEM_NAMES, i),
-                )
-
-            GLib.idle_add(finish_load)
-
-        def finish_load():
-            for idx, (activated, name) in items.items():
-                row = Adw.SwitchRow(title=name, subtitle=f"#{idx:03}", active=activated)
-                self.pool_list.append(row)
-                self.rows[idx] = row
-                row.connect("notify::active", partial(self.on_row_notify_active, idx))
-            self.stack.set_visible_child(self.pool_list)
-
-        self.pool_list.set_filter_func(self.pool_filter)
         self._suppress_signals = False
 
-        Thread(target=load_thread).start()
+        GtkFrontend.instance().rom_catalogue.get(finish_load)
 
     def pool(self) -> list[int]:
         assert self.randomization_settings is not None
@@ -108,44 +80,30 @@ class ItemsPage(Adw.PreferencesPage):
         assert self.randomization_settings is not None
         self.randomization_settings["dungeons"]["items_enabled"] = value
 
-    def on_row_notify_active(self, idx: int, switch_row: Adw.SwitchRow, *args):
+    def on_pool_changed(self, selection: set[int]):
         if self._suppress_signals:
             return
-        pool = self.pool()
-        if switch_row.get_active():
-            if idx not in pool:
-                pool.append(idx)
-        else:
-            pool.remove(idx)
+        self.set_pool(sorted(selection))
 
     def on_search_changed(self, search_entry: Gtk.SearchEntry):
         if self._suppress_signals:
             return
-        self.search_text = search_entry.get_text().strip().lower()
-        self.pool_list.invalidate_filter()
+        self.pool_model.search(search_entry.get_text())
 
     def on_button_reset_clicked(self, *args):
-        self._suppress_signals = True
-        assert self.randomization_settings is not None
-        self.set_pool(list(DEFAULTITEMPOOL))
-        pool = self.pool()
-        for baseid, row in self.rows.items():
-            row.set_active(baseid in pool)
-        self._suppress_signals = False
+        self.pool_model.set_selection(DEFAULTITEMPOOL)
+
+    def on_button_all_clicked(self, *args):
+        self.pool_model.select_all()
 
     def on_button_none_clicked(self, *args):
-        self._suppress_signals = True
-        for row in self.rows.values():
-            row.set_active(False)
-        self.pool().clear()
-        self._suppress_signals = False
+        self.pool_model.select_none()
+
+    def on_button_paste_clicked(self, *args):
+        read_pool_list_from_clipboard(self, self.on_pool_list_pasted)
+
+    def on_pool_list_pasted(self, pool: set[int]):
+        self.pool_model.set_selection(pool & self.pool_model.entries.keys())
 
     def help_pool(self, *args) -> str:
         return _("Only these items will spawn on dungeon floors.")
-
-    def pool_filter(self, row: Adw.SwitchRow):
-        if self.search_text == "":
-            match = True
-        else:
-            match = self.search_text in f"{row.get_title()} {row.get_subtitle()}".lower()
-        return match
@@ -79,6 +79,7 @@ class MonstersPage(Adw.PreferencesPage):
                 content=page_mop,
                 search_callback=page_mop.on_search_changed,
                 help_callback=page_mop.help_pool,
+                end_button_factory=page_mop.create_window_end_buttons,
             )
         if w == self.row_allowed_monsters:
             page_am = MonstersPoolPage(type=MonstersPoolType.ALL, parent_page=self)
@@ -18,22 +18,20 @@ from __future__ import annotations
 
 import os
 from functools import partial
-from threading import Thread
 from typing import cast
 
 from skytemple_files.common.i18n_util import _
-from skytemple_files.data.md.protocol import Ability
 
 from skytemple_randomizer.config import RandomizerConfig
 from skytemple_randomizer.frontend.gtk.frontend import GtkFrontend
 from skytemple_randomizer.frontend.gtk.init_locale import LocalePatchedGtkTemplate
 from skytemple_randomizer.frontend.gtk.path import MAIN_PATH
+from skytemple_randomizer.frontend.gtk.rom_catalogue import RomCatalogue
 
-from gi.repository import Gtk, Adw, GLib
+from gi.repository import Gtk, Adw
 
 from skytemple_randomizer.frontend.gtk.widgets import RandomizationSettingsWidget
 from skytemple_randomizer.lists import DEFAULTABILITYPOOL
-from skytemple_randomizer.string_provider import StringProvider, StringType
 
 
 @LocalePatchedGtkTemplate(filename=os.path.join(MAIN_PATH, "page_monsters_abilities.ui"))
@@ -67,28 +65,10 @@ class MonstersAbilitiesPage(Adw.PreferencesPage):
         self._suppress_signals = True
         self.randomization_settings = config
 
-        frontend = GtkFrontend.instance()
-        rom = frontend.input_rom
-
-        abilities: dict[int, tuple[bool, str]] = {}
-
-        def load_thread():
-            string_provider = StringProvider(rom, frontend.input_rom_static_data)
-
-            for ability in Ability:
-                name = _("Unused") + f" 0x{ability.value:0x}"
-                if ability.value < 124:
-                    name = string_provider.get_value(StringType.ABILITY_NAMES, ability.value)
-                abilities[ability.value] = (
-                    ability.value in self.pool(),
-                    name,
-                )
-
-            GLib.idle_add(finish_load)
-
-        def finish_load():
-            for idx, (activated, name) in abilities.items():
-                row = Adw.SwitchRow(title=name, subtitle=f"#{idx:03}", active=activated)
+        def finish_load(catalogue: RomCatalogue):
+            pool = self.pool()
+            for idx, name in catalogue.abilities:
+                row = Adw.SwitchRow(title=name, subtitle=f"#{idx:03}", active=idx in pool)
                 self.pool_list.append(row)
                 self.rows[idx] = row
                 row.connect("notify::active", partial(self.on_row_notify_active, idx))
@@ -97,7 +77,7 @@ class MonstersAbilitiesPage(Adw.PreferencesPage):
         self.pool_list.set_filter_func(self.pool_filter)
         self._suppress_signals = False
 
-        Thread(target=load_thread).start()
+        GtkFrontend.instance().rom_catalogue.get(finish_load)
 
     def pool(self) -> list[int]:
         assert self.randomization_settings is not None
@@ -17,40 +17,36 @@
 from __future__ import annotations
 
 import os
-from functools import partial
-from threading import Thread
 from typing import cast
 
 from range_typed_integers import u16
 from skytemple_files.common.i18n_util import _
-from skytemple_files.common.types.file_types import FileType
 
 from skytemple_randomizer.config import RandomizerConfig
 from skytemple_randomizer.frontend.gtk.frontend import GtkFrontend
 from skytemple_randomizer.frontend.gtk.init_locale import LocalePatchedGtkTemplate
 from skytemple_randomizer.frontend.gtk.path import MAIN_PATH
+from skytemple_randomizer.frontend.gtk.pool_list import PoolListModel, read_pool_list_from_clipboard
+from skytemple_randomizer.frontend.gtk.rom_catalogue import RomCatalogue
 
-from gi.repository import Gtk, Adw, GLib
+from gi.repository import Gtk, Adw
 
 from skytemple_randomizer.frontend.gtk.widgets import RandomizationSettingsWidget
 from skytemple_randomizer.lists import DEFAULTMOVEPOOL
-from skytemple_randomizer.string_provider import StringProvider, StringType
-
-WAZA_P = "BALANCE/waza_p.bin"
 
 
 @LocalePatchedGtkTemplate(filename=os.path.join(MAIN_PATH, "page_moves_pool.ui"))
-class MovesPoolPage(Adw.PreferencesPage):
+class MovesPoolPage(Adw.Bin):
     __gtype_name__ = "StMovesPoolPage"
 
     stack = cast(Gtk.Stack, Gtk.Template.Child())
     spinner = cast(Gtk.Spinner, Gtk.Template.Child())
-    pool_list = cast(Gtk.ListBox, Gtk.Template.Child())
+    pool_scroll = cast(Gtk.ScrolledWindow, Gtk.Template.Child())
+    pool_list = cast(Gtk.ListView, Gtk.Template.Child())
 
     randomization_settings: RandomizerConfig | None
     parent_page: RandomizationSettingsWidget
-    search_text: str
-    rows: dict[u16, Adw.SwitchRow]
+    pool_model: PoolListModel
     _suppress_signals: bool
 
     def __init__(
@@ -62,44 +58,20 @@ class MovesPoolPage(Adw.PreferencesPage):
         super().__init__(*args, **kwargs)
         self.parent_page = parent_page
         self.randomization_settings = None
-        self.search_text = ""
-        self.rows = {}
+        self.pool_model = PoolListModel(self.pool_list, self.on_pool_changed)
         self._suppress_signals = False
 
     def populate_settings(self, config: RandomizerConfig):
         self._suppress_signals = True
         self.randomization_settings = config
 
-        frontend = GtkFrontend.instance()
-        rom = frontend.input_rom
-
-        moves: dict[int, tuple[bool, str]] = {}
-
-        def load_thread():
-            string_provider = StringProvider(rom, frontend.input_rom_static_data)
-
-            waza_p = FileType.WAZA_P.deserialize(rom.getFileByName(WAZA_P))
+        def finish_load(catalogue: RomCatalogue):
+            self.pool_model.fill(catalogue.moves, self.pool())
+            self.stack.set_visible_child(self.pool_scroll)
 
-            for i, entry in enumerate(waza_p.moves):
-                moves[i] = (
-                    i in self.pool(),
-                    string_provider.get_value(StringType.MOVE_NAMES, i),
-                )
-
-            GLib.idle_add(finish_load)
-
-        def finish_load():
-            for idx, (activated, name) in moves.items():
-                row = Adw.SwitchRow(title=name, subtitle=f"#{idx:03}", active=activated)
-                self.pool_list.append(row)
-                self.rows[u16(idx)] = row
-                row.connect("notify::active", partial(self.on_row_notify_active, idx))
-            self.stack.set_visible_child(self.pool_list)
-
-        self.pool_list.set_filter_func(self.pool_filter)
         self._suppress_signals = False
 
-        Thread(target=load_thread).start()
+        GtkFrontend.instance().rom_catalogue.get(finish_load)
 
     def pool(self) -> list[u16]:
         assert self.randomization_settings is not None
@@ -109,38 +81,30 @@ class MovesPoolPage(Adw.PreferencesPage):
         assert self.randomization_settings is not None
         self.randomization_settings["pokemon"]["moves_enabled"] = value
 
-    def on_row_notify_active(self, idx: int, switch_row: Adw.SwitchRow, *args):
+    def on_pool_changed(self, selection: set[int]):
         if self._suppress_signals:
             return
-        v = u16(idx)
-        pool = self.pool()
-        if switch_row.get_active():
-            if v not in pool:
-                pool.append(v)
-        else:
-            pool.remove(v)
+        self.set_pool([u16(idx) for idx in sorted(selection)])
 
     def on_search_changed(self, search_entry: Gtk.SearchEntry):
         if self._suppress_signals:
             return
-        self.search_text = search_entry.get_text().strip().lower()
-        self.pool_list.invalidate_filter()
+        self.pool_model.search(search_entry.get_text())
 
     def on_button_reset_clicked(self, *args):
-        self._suppress_signals = True
-        assert self.randomization_settings is not None
-        self.set_pool(cast(list[u16], list(DEFAULTMOVEPOOL)))
-        pool = self.pool()
-        for baseid, row in self.rows.items():
-            row.set_active(baseid in pool)
-        self._suppress_signals = False
+        self.pool_model.set_selection(DEFAULTMOVEPOOL)
+
+    def on_button_all_clicked(self, *args):
+        self.pool_model.select_all()
 
     def on_button_none_clicked(self, *args):
-        self._suppress_signals = True
-        for row in self.rows.values():
-            row.set_active(False)
-        self.pool().clear()
-        self._suppress_signals = False
+        self.pool_model.select_none()
+
+    def on_button_paste_clicked(self, *args):
+        read_pool_list_from_clipboard(self, self.on_pool_list_pasted)
+
+    def on_pool_list_pasted(self, pool: set[int]):
+        self.pool_model.set_selection(pool & self.pool_model.entries.keys())
 
     def create_window_end_buttons(self) -> Gtk.Widget:
         box = Gtk.Box(spacing=5)
@@ -151,16 +115,15 @@ class MovesPoolPage(Adw.PreferencesPage):
         button_reset.connect("clicked", self.on_button_reset_clicked)
         button_none = Gtk.Button(icon_name="skytemple-edit-delete-symbolic", tooltip_text=_("Select None"))
         button_none.connect("clicked", self.on_button_none_clicked)
+        button_all = Gtk.Button(icon_name="skytemple-list-add-symbolic", tooltip_text=_("Select All"))
+        button_all.connect("clicked", self.on_button_all_clicked)
+        button_paste = Gtk.Button(icon_name="skytemple-document-edit-symbolic", tooltip_text=_("Paste List"))
+        button_paste.connect("clicked", self.on_button_paste_clicked)
         box.append(button_reset)
         box.append(button_none)
+        box.append(button_all)
+        box.append(button_paste)
         return box
 
     def help_pool(self, *args) -> str:
         return _("Only the moves selected will be used for any movesets or TM/HM randomization.")
-
-    def pool_filter(self, row: Adw.SwitchRow):
-        if self.search_text == "":
-            match = True
-        else:
-            match = self.search_text in f"{row.get_title()} {row.get_subtitle()}".lower()
-        return match
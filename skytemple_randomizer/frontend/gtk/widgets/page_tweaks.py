@@ -159,6 +159,18 @@ class TweaksPage(Adw.PreferencesPage):
             active_c = cast(Union[ItemsPage, ItemsCategoriesPage], active)
             active_c.on_button_none_clicked()
 
+        def on_button_all_clicked(*args):
+            assert dialog is not None
+            active = dialog.get_active_page()
+            if isinstance(active, ItemsPage):
+                active.on_button_all_clicked()
+
+        def on_button_paste_clicked(*args):
+            assert dialog is not None
+            active = dialog.get_active_page()
+            if isinstance(active, ItemsPage):
+                active.on_button_paste_clicked()
+
         def on_stack_switch_page(new_page: Gtk.Widget):
             assert dialog is not None
             new_page_c = cast(Union[ItemsPage, ItemsCategoriesPage], new_page)
@@ -176,8 +188,20 @@ class TweaksPage(Adw.PreferencesPage):
                 tooltip_text=_("Select None"),
             )
             button_none.connect("clicked", on_button_none_clicked)
+            button_all = Gtk.Button(
+                icon_name="skytemple-list-add-symbolic",
+                tooltip_text=_("Select All"),
+            )
+            button_all.connect("clicked", on_button_all_clicked)
+            button_paste = Gtk.Button(
+                icon_name="skytemple-document-edit-symbolic",
+                tooltip_text=_("Paste List"),
+            )
+            button_paste.connect("clicked", on_button_paste_clicked)
             box.append(button_reset)
             box.append(button_none)
+            box.append(button_all)
+            box.append(button_paste)
             return box
 
         page_it = ItemsPage(parent_page=self)
@@ -19,7 +19,7 @@ from __future__ import annotations
 import os
 import sys
 import webbrowser
-from typing import cast
+from typing import cast, Callable
 
 from ndspy.rom import NintendoDSRom
 from skytemple_files.common.i18n_util import _
@@ -28,6 +28,7 @@ from skytemple_files.common.ppmdu_config.data import Pmd2Data
 from skytemple_randomizer.frontend.gtk.frontend import GtkFrontend
 from skytemple_randomizer.frontend.gtk.init_locale import LocalePatchedGtkTemplate
 from skytemple_randomizer.frontend.gtk.path import MAIN_PATH
+from skytemple_randomizer.frontend.gtk.rom_catalogue import RomCatalogue
 
 from gi.repository import Gtk, Adw, GObject
 
@@ -37,6 +38,10 @@ from skytemple_randomizer.frontend.gtk.widgets import (
     BaseSettingsDialog,
     SettingsPage,
     WelcomePage,
+    MonstersPage,
+    DungeonsPage,
+    TextPage,
+    TweaksPage,
 )
 
 
@@ -46,6 +51,7 @@ class MainStack(Adw.Bin):
 
     header_bar = cast(Gtk.HeaderBar, Gtk.Template.Child())
     view_switcher = cast(Adw.ViewSwitcher, Gtk.Template.Child())
+    stack = cast(Adw.ViewStack, Gtk.Template.Child())
     switcher_bar = cast(Adw.ViewSwitcherBar, Gtk.Template.Child())
     page_start = cast(Adw.ViewStackPage, Gtk.Template.Child())
     page_monsters = cast(Adw.ViewStackPage, Gtk.Template.Child())
@@ -57,6 +63,10 @@ class MainStack(Adw.Bin):
     input_rom_path: str | None
     rom: NintendoDSRom | None
     rom_static_data: Pmd2Data | None
+    # The settings pages are only built when they are first shown and only re-populated once they are visible again
+    # after the settings changed.
+    _page_factories: dict[str, Callable[[], RandomizationSettingsWidget]]
+    _dirty_pages: set[str]
 
     def __init__(
         self,
@@ -67,12 +77,21 @@ class MainStack(Adw.Bin):
         self.input_rom_path = None
         self.rom = None
         self.rom_static_data = None
+        self._page_factories = {
+            cast(str, self.page_monsters.get_name()): MonstersPage,
+            cast(str, self.page_dungeons.get_name()): DungeonsPage,
+            cast(str, self.page_text.get_name()): TextPage,
+            cast(str, self.page_tweaks.get_name()): TweaksPage,
+        }
+        self._dirty_pages = set()
+        self.stack.connect("notify::visible-child", self.on_stack_notify_visible_child)
 
     def init_rom(
         self,
         rom_path: str,
         rom: NintendoDSRom,
         rom_static_data: Pmd2Data,
+        rom_catalogue: RomCatalogue | None = None,
     ):
         self.input_rom_path = rom_path
         self.rom = rom
@@ -81,7 +100,7 @@ class MainStack(Adw.Bin):
         cast(WelcomePage, self.page_start.get_child()).set_input_rom(self.input_rom_path, self.rom_static_data)
 
         frontend = GtkFrontend.instance()
-        frontend.init_rom(self.rom, self.rom_static_data)
+        frontend.init_rom(self.rom, self.rom_static_data, rom_catalogue)
         self.populate_settings()
 
     @GObject.Property(type=bool, default=False)
@@ -104,6 +123,9 @@ class MainStack(Adw.Bin):
         if sys.platform.startswith("darwin"):
             self.header_bar.set_decoration_layout("close,minimize,maximize:")
 
+    def on_stack_notify_visible_child(self, *args):
+        self._populate_visible_page()
+
     @Gtk.Template.Callback()
     def on_button_randomize_clicked(self, *args):
         frontend = GtkFrontend.instance()
@@ -151,14 +173,17 @@ class MainStack(Adw.Bin):
         d.present(GtkFrontend.instance().window)
 
     def populate_settings(self):
-        frontend = GtkFrontend.instance()
-        cast(RandomizationSettingsWidget, self.page_dungeons.get_child()).populate_settings(
-            frontend.randomization_settings
-        )
-        cast(RandomizationSettingsWidget, self.page_monsters.get_child()).populate_settings(
-            frontend.randomization_settings
-        )
-        cast(RandomizationSettingsWidget, self.page_text.get_child()).populate_settings(frontend.randomization_settings)
-        cast(RandomizationSettingsWidget, self.page_tweaks.get_child()).populate_settings(
-            frontend.randomization_settings
-        )
+        self._dirty_pages = set(self._page_factories.keys())
+        self._populate_visible_page()
+
+    def _populate_visible_page(self):
+        name = self.stack.get_visible_child_name()
+        if name is None or name not in self._dirty_pages:
+            return
+        container = cast(Adw.Bin, self.stack.get_child_by_name(name))
+        page = container.get_child()
+        if page is None:
+            page = cast(Gtk.Widget, self._page_factories[name]())
+            container.set_child(page)
+        cast(RandomizationSettingsWidget, page).populate_settings(GtkFrontend.instance().randomization_settings)
+        self._dirty_pages.discard(name)
@@ -20,17 +20,20 @@ import os
 import struct
 import sys
 import webbrowser
+from functools import partial
 from typing import cast
 
 from gi.repository import Gtk, Gdk, GdkPixbuf, Adw, GLib, Gio
 from ndspy.rom import NintendoDSRom
 from skytemple_files.common.i18n_util import _
-from skytemple_files.common.util import get_ppmdu_config_for_rom
+from skytemple_files.common.ppmdu_config.data import Pmd2Data
 from skytemple_files.common.version_util import get_event_banner
 
 from skytemple_randomizer.frontend.gtk.frontend import GtkFrontend
 from skytemple_randomizer.frontend.gtk.init_locale import LocalePatchedGtkTemplate
 from skytemple_randomizer.frontend.gtk.path import MAIN_PATH
+from skytemple_randomizer.frontend.gtk.rom_catalogue import RomCatalogue
+from skytemple_randomizer.frontend.gtk.rom_open import OPEN_ROM_STEPS, open_rom_async
 from skytemple_randomizer.frontend.gtk.ui_util import run_file_dialog, nds_filter
 
 
@@ -43,6 +46,7 @@ class StartStack(Adw.Bin):
     banner_info = cast(Gtk.Box, Gtk.Template.Child())
     button_load_last_rom = cast(Gtk.Button, Gtk.Template.Child())
     button_load_rom = cast(Gtk.Button, Gtk.Template.Child())
+    progress_open_rom = cast(Gtk.ProgressBar, Gtk.Template.Child())
 
     disable_recent: bool
 
@@ -104,23 +108,46 @@ class StartStack(Adw.Bin):
         self.load_rom(path)
 
     def load_rom(self, path: str):
-        try:
-            rom = NintendoDSRom.fromFile(path)
-            static_data = get_ppmdu_config_for_rom(rom)
-        except struct.error:
+        # The ROM is read on a worker thread, the window stays responsive in the meantime.
+        self.button_load_last_rom.set_sensitive(False)
+        self.button_load_rom.set_sensitive(False)
+        self.progress_open_rom.set_fraction(0)
+        self.progress_open_rom.set_text(None)
+        self.progress_open_rom.show()
+        open_rom_async(
+            path,
+            self.on_open_rom_progress,
+            partial(self.on_open_rom_done, path),
+            self.on_open_rom_error,
+        )
+
+    def on_open_rom_progress(self, step: int, description: str):
+        self.progress_open_rom.set_fraction(step / OPEN_ROM_STEPS)
+        self.progress_open_rom.set_text(description)
+
+    def on_open_rom_done(self, path: str, rom: NintendoDSRom, static_data: Pmd2Data, catalogue: RomCatalogue):
+        self._end_open_rom()
+        GtkFrontend.instance().application.show_main_stack(path, rom, static_data, catalogue)
+
+    def on_open_rom_error(self, e: Exception):
+        self._end_open_rom()
+        if isinstance(e, struct.error):
             GtkFrontend.instance().display_error(
                 _("Failed to load ROM:")
                 + " "
                 + _('Are you sure you provided a ROM? A ROM usually has the file extension ".nds".'),
                 cast(Gtk.Window, self.get_root()),
             )
-        except Exception as e:
+        else:
             GtkFrontend.instance().display_error(
                 _("Failed to load ROM:") + str(e),
                 cast(Gtk.Window, self.get_root()),
             )
-            return
-        GtkFrontend.instance().application.show_main_stack(path, rom, static_data)
+
+    def _end_open_rom(self):
+        self.progress_open_rom.hide()
+        self.button_load_last_rom.set_sensitive(True)
+        self.button_load_rom.set_sensitive(True)
 
     def _check_for_banner(self):
         try:
@@ -22,6 +22,8 @@ from ndspy.rom import NintendoDSRom
 from skytemple_files.common.ppmdu_config.data import Pmd2Data
 from skytemple_randomizer.config import RandomizerConfig
 from skytemple_randomizer.frontend.abstract import AbstractFrontend
+from skytemple_randomizer.randomizer.context import RandomizerContext, current_context
+from skytemple_randomizer.randomizer.util.patcher import RunPatcher
 from skytemple_randomizer.status import Status
 
 
@@ -34,6 +36,7 @@ class AbstractRandomizer(ABC):
         rng: Random,
         seed: str,
         frontend: AbstractFrontend,
+        context: RandomizerContext | None = None,
     ):
         self.config = config
         self.rom = rom
@@ -41,6 +44,10 @@ class AbstractRandomizer(ABC):
         self.rng = rng
         self.seed = seed
         self.frontend = frontend
+        # The state of the run, see RandomizerContext.
+        self.context = context if context is not None else current_context()
+        # Replaced by the patcher shared by the entire run, when run by the RandomizerThread.
+        self.patcher = RunPatcher(rom, static_data)
 
     @abstractmethod
     def step_count(self) -> int:
@@ -23,7 +23,6 @@ from skytemple_files.common.types.file_types import FileType
 from skytemple_files.data.item_p.protocol import ItemPProtocol
 from skytemple_files.data.str.model import Str
 from skytemple_files.data.waza_p.protocol import WazaPProtocol
-from skytemple_files.patch.patches import Patcher
 
 from skytemple_randomizer.randomizer.abstract import AbstractRandomizer
 from skytemple_randomizer.randomizer.util.util import get_all_string_files
@@ -261,12 +260,9 @@ class BlindItemsMovesRandomizer(AbstractRandomizer):
         return steps
 
     def run(self, status: Status):
-        patcher = Patcher(self.rom, self.static_data)
-
         if self.config["item"]["blind_items"]["enable"]:
             status.step(_("Apply 'DisableTips' patch..."))
-            if not patcher.is_applied("DisableTips"):
-                patcher.apply("DisableTips")
+            self.patcher.require("DisableTips")
             self.blind_items(status)
         if self.config["pokemon"]["blind_moves"]["enable"]:
             self.blind_moves(status)
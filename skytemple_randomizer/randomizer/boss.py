@@ -22,7 +22,6 @@ from skytemple_files.common.types.file_types import FileType
 from skytemple_files.common.util import get_binary_from_rom, set_binary_in_rom
 from skytemple_files.hardcoded.fixed_floor import HardcodedFixedFloorTables
 from skytemple_files.list.actor.model import ActorListBin
-from skytemple_files.patch.patches import Patcher
 from skytemple_randomizer.randomizer.abstract import AbstractRandomizer
 from skytemple_randomizer.randomizer.util.util import (
     get_allowed_md_ids,
@@ -206,9 +205,7 @@ class BossRandomizer(AbstractRandomizer):
             return status.done()
 
         status.step(_("Apply 'ActorAndLevelLoader' patch..."))
-        patcher = Patcher(self.rom, self.static_data)
-        if not patcher.is_applied("ActorAndLevelLoader"):
-            patcher.apply("ActorAndLevelLoader")
+        self.patcher.require("ActorAndLevelLoader")
 
         status.step(_("Updating bosses..."))
 
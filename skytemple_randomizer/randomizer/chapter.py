@@ -14,12 +14,10 @@
 #
 #  You should have received a copy of the GNU General Public License
 #  along with SkyTemple.  If not, see <https://www.gnu.org/licenses/>.
-from skytemple_files.script.ssb.model import Ssb
-
 from skytemple_randomizer.randomizer.abstract import AbstractRandomizer
 from skytemple_randomizer.randomizer.util.util import (
     random_txt_line,
-    get_script,
+    get_script_op_index,
     get_all_string_files,
     strlossy,
 )
@@ -59,21 +57,19 @@ class ChapterRandomizer(AbstractRandomizer):
             return
         status.step(_("Randomizing Chapter Names..."))
 
-        for script_name in SCRIPTS_WITH_CHAPTER_NAMES:
-            ssb: Ssb = get_script(script_name, self.rom, self.static_data)
-
-            for rtn in ssb.routine_ops:
-                for op in rtn:
-                    if op.op_code.name == "back_SetBanner2":
-                        chapter_name = random_txt_line(self.rng, self.config["chapters"]["text"])
-                        assert isinstance(op.params[5], int)
-                        string_index = op.params[5] - len(ssb.constants)
-                        if len(ssb.strings) > 0:  # for jp this is empty.
-                            for lang, __ in get_all_string_files(self.rom, self.static_data):
-                                ssb.strings[lang.name.lower()][string_index] = strlossy(
-                                    chapter_name, self.static_data.string_encoding
-                                )
-                        else:  # jp
-                            ssb.constants[op.params[5]] = strlossy(chapter_name, self.static_data.string_encoding)
+        index = get_script_op_index(self.rom, self.static_data)
+        for _name, ssb, op in index.ops(
+            "back_SetBanner2", self.rom, self.static_data, scripts=SCRIPTS_WITH_CHAPTER_NAMES
+        ):
+            chapter_name = random_txt_line(self.rng, self.config["chapters"]["text"])
+            assert isinstance(op.params[5], int)
+            string_index = op.params[5] - len(ssb.constants)
+            if len(ssb.strings) > 0:  # for jp this is empty.
+                for lang, __ in get_all_string_files(self.rom, self.static_data):
+                    ssb.strings[lang.name.lower()][string_index] = strlossy(
+                        chapter_name, self.static_data.string_encoding
+                    )
+            else:  # jp
+                ssb.constants[op.params[5]] = strlossy(chapter_name, self.static_data.string_encoding)
 
         status.done()
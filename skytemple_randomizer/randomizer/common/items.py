@@ -14,6 +14,9 @@
 #
 #  You should have received a copy of the GNU General Public License
 #  along with SkyTemple.  If not, see <https://www.gnu.org/licenses/>.
+from __future__ import annotations
+
+from array import array
 from collections import OrderedDict
 from math import ceil
 from numbers import Number
@@ -26,7 +29,8 @@ from skytemple_files.dungeon_data.mappa_bin.protocol import MappaItemListProtoco
 
 from skytemple_randomizer.config import RandomizerConfig, ItemAlgorithm
 from skytemple_randomizer.randomizer.common.weights import random_weights
-from skytemple_randomizer.randomizer.util.util import get_allowed_item_ids
+from skytemple_randomizer.randomizer.context import current_context
+from skytemple_randomizer.randomizer.util.util import get_pools
 
 CLASSIC_ALLOWED_ITEM_CATS = [0, 1, 2, 3, 4, 5, 8, 9]
 ALLOWED_ITEM_CATS = [0, 1, 2, 3, 4, 5, 6, 8, 9, 10]
@@ -34,6 +38,76 @@ MIN_ITEMS_PER_CAT = 4
 MAX_ITEMS_PER_CAT = 18
 
 
+class ItemUniverse:
+    """
+    All allowed items of a config, indexed by category. Built once per config and static data,
+    after that the item list generators never have to scan the category item lists again.
+    """
+
+    def __init__(self, config: RandomizerConfig, static_data: Pmd2Data):
+        pools = get_pools(config)
+        self.item_id_set = pools.item_id_set
+        self.static_data = static_data
+        # Allowed item ids per category, in the order of the category item lists.
+        self.items_in_cats: dict[int, tuple[int, ...]] = {}
+        # Maps item id -> the first category in ALLOWED_ITEM_CATS that contains the item, -1 otherwise.
+        self.item_cats = array("h")
+        # The item ids of all categories of the balanced algorithm, concatenated.
+        self.balanced_item_ids = array("H")
+        for cat_id in ALLOWED_ITEM_CATS:
+            cat = static_data.dungeon_data.item_categories[cat_id]
+            cat_item_ids = tuple(x for x in cat.item_ids() if x in self.item_id_set)
+            self.items_in_cats[cat_id] = cat_item_ids
+            self.balanced_item_ids.extend(cat_item_ids)
+            for item_id in cat_item_ids:
+                if item_id >= len(self.item_cats):
+                    self.item_cats.extend([-1] * (item_id + 1 - len(self.item_cats)))
+                if self.item_cats[item_id] == -1:
+                    self.item_cats[item_id] = cat_id
+        # The initial state of the Fenwick tree over balanced_item_ids, with every entry still available.
+        n = len(self.balanced_item_ids)
+        self._fenwick_full = array("l", (i & -i for i in range(0, n + 1)))
+        self._fenwick_top = 1 << (n.bit_length() - 1) if n > 0 else 0
+
+    def sample_balanced(self, rng: Random, count: int) -> list[int]:
+        """
+        Draws up to count distinct entries of balanced_item_ids without replacement.
+        This picks the same items with the same RNG calls as repeatedly popping random indices
+        from a list, but finds the remaining entry in O(log n) instead of shifting the list.
+        """
+        n = len(self.balanced_item_ids)
+        tree = array("l", self._fenwick_full)
+        chosen = []
+        for remaining in range(n, max(0, n - count), -1):
+            k = rng.choice(range(0, remaining)) + 1
+            pos = 0
+            step = self._fenwick_top
+            while step > 0:
+                nxt = pos + step
+                if nxt <= n and tree[nxt] < k:
+                    pos = nxt
+                    k -= tree[nxt]
+                step >>= 1
+            chosen.append(self.balanced_item_ids[pos])
+            i = pos + 1
+            while i <= n:
+                tree[i] -= 1
+                i += i & -i
+        return chosen
+
+
+def get_item_universe(config: RandomizerConfig, static_data: Pmd2Data) -> ItemUniverse:
+    """Returns the item universe for config, rebuilding it whenever the pools of the run are rebuilt."""
+    context = current_context()
+    if (
+        context.item_universe is None
+        or context.item_universe.item_id_set is not get_pools(config).item_id_set
+        or context.item_universe.static_data is not static_data
+    ):
+        context.item_universe = ItemUniverse(config, static_data)
+    return context.item_universe
+
+
 def randomize_items(rng: Random, config: RandomizerConfig, static_data: Pmd2Data) -> MappaItemListProtocol:
     if config["item"]["algorithm"] == ItemAlgorithm.BALANCED:
         return balanced_item_randomizer(rng, config, static_data)
@@ -46,6 +120,7 @@ def randomize_items(rng: Random, config: RandomizerConfig, static_data: Pmd2Data
 def classic_item_randomizer(rng: Random, config: RandomizerConfig, static_data: Pmd2Data) -> MappaItemListProtocol:
     categories = {}
     items = OrderedDict()
+    universe = get_item_universe(config, static_data)
     cats_as_list = list(CLASSIC_ALLOWED_ITEM_CATS)
 
     # 1/8 chance for money to get a chance
@@ -64,7 +139,7 @@ def classic_item_randomizer(rng: Random, config: RandomizerConfig, static_data:
 
         cat_item_ids: list[int] = []
         if cat.number_of_items is not None:
-            allowed_cat_item_ids = [x for x in cat.item_ids() if x in get_allowed_item_ids(config)]
+            allowed_cat_item_ids = universe.items_in_cats[cat_id]
             upper_limit = min(MAX_ITEMS_PER_CAT, len(allowed_cat_item_ids))
             if upper_limit <= MIN_ITEMS_PER_CAT:
                 n_items = MIN_ITEMS_PER_CAT
@@ -87,32 +162,15 @@ def balanced_item_randomizer(rng: Random, config: RandomizerConfig, static_data:
     categories = OrderedDict()
     items = OrderedDict()
 
+    universe = get_item_universe(config, static_data)
     min_items = MIN_ITEMS_PER_CAT * len(ALLOWED_ITEM_CATS)
     max_items = MAX_ITEMS_PER_CAT * len(ALLOWED_ITEM_CATS)
-    items_in_cats: dict[int, list[int]] = {}
     chosen_items_per_cat: dict[int, list[int]] = {}
 
-    cats_as_list = list(ALLOWED_ITEM_CATS)
-
-    # Take note of all allowed items and which categories they are in
-    all_allowed_item_ids = []
-    for cat_id in cats_as_list:
-        cat = static_data.dungeon_data.item_categories[cat_id]
-        items_in_cats[cat_id] = [x for x in cat.item_ids() if x in get_allowed_item_ids(config)]
-        all_allowed_item_ids.extend(items_in_cats[cat_id])
-
     # We roll random items and then check their category.
     # We also take note of the items for that category in chosen_items_per_cat.
-    for _ in range(0, rng.randrange(min_items, max_items)):
-        if len(all_allowed_item_ids) < 1:
-            break
-        item_index = rng.choice(range(0, len(all_allowed_item_ids)))
-        item_id = all_allowed_item_ids.pop(item_index)
-        item_cat_id = -1
-        for cat_id, items_in_this_cat in items_in_cats.items():
-            if item_id in items_in_this_cat:
-                item_cat_id = cat_id
-                break
+    for item_id in universe.sample_balanced(rng, rng.randrange(min_items, max_items)):
+        item_cat_id = universe.item_cats[item_id]
         if item_cat_id not in chosen_items_per_cat:
             chosen_items_per_cat[item_cat_id] = []
         chosen_items_per_cat[item_cat_id].append(item_id)
@@ -0,0 +1,241 @@
+#  Copyright 2020-2025 SkyTemple Contributors
+#
+#  This file is part of SkyTemple.
+#
+#  SkyTemple is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  SkyTemple is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with SkyTemple.  If not, see <https://www.gnu.org/licenses/>.
+"""
+Bulk generation of dungeon floor layouts (see DungeonLayoutGeneration).
+
+All floor parameters of a floor list are drawn at once as NumPy columns and only then turned into layout models.
+The parameter ranges are the same as in DungeonRandomizer._randomize_layout, but the results are not, since a
+different RNG is used. The generator of each version MUST NOT change once released, otherwise seeds generated
+with it don't reproduce anymore. Add a new DungeonLayoutGeneration version instead.
+NumPy only guarantees that the raw output of its bit generators stays the same across versions, not the values of
+np.random.Generator's methods, so LayoutRng maps the raw output to the values itself.
+
+This module requires NumPy, which is an optional dependency (the "bulk" extra).
+"""
+
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Sequence
+
+import numpy as np
+from range_typed_integers import u8, i8, u16, i16
+from skytemple_files.common.types.file_types import FileType
+from skytemple_files.dungeon_data.mappa_bin.protocol import (
+    MappaFloorLayoutProtocol,
+    MappaFloorStructureType,
+    MappaFloorWeather,
+    MappaFloorDarknessLevel,
+)
+
+from skytemple_randomizer.config import RandomizerConfig, DungeonLayoutGeneration
+from skytemple_randomizer.randomizer.dungeon import ALLOWED_TILESET_IDS
+
+
+class LayoutRng:
+    """
+    Draws arrays of random values from the raw 64-bit output of a PCG64 bit generator.
+    Integers are mapped with a modulo, the bias of that is negligible for the small ranges used here.
+    """
+
+    def __init__(self, bit_generator: np.random.PCG64):
+        self._bit_generator = bit_generator
+
+    def integers(self, low: int, high: int, n: int) -> np.ndarray:
+        """n integers in [low, high)."""
+        raw = self._bit_generator.random_raw(n)
+        return (raw % np.uint64(high - low)).astype(np.int64) + low
+
+    def flags(self, n: int) -> np.ndarray:
+        return self.integers(0, 2, n).astype(bool)
+
+    def random(self, n: int) -> np.ndarray:
+        """n floats in [0, 1), from the upper 53 bits of the raw output."""
+        raw = self._bit_generator.random_raw(n)
+        return (raw >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53))
+
+    def choice(self, values: Sequence[int], n: int, p: Sequence[float] | None = None) -> np.ndarray:
+        """n of values, uniformly or with the probabilities p."""
+        if p is None:
+            indices = self.integers(0, len(values), n)
+        else:
+            cumulative = np.cumsum(np.asarray(p, dtype=np.float64))
+            indices = np.minimum(np.searchsorted(cumulative, self.random(n), side="right"), len(values) - 1)
+        return np.asarray(values, dtype=np.int64)[indices]
+
+
+def layout_generator(seed: str, floor_list_index: int, version: DungeonLayoutGeneration) -> LayoutRng:
+    """
+    Returns the generator for one floor list. It only depends on the run seed, the generation version and
+    the floor list, so it does not consume the randomizer's main RNG. Note that this means the main RNG calls the
+    classic generation makes are skipped, so everything drawn from the main RNG afterwards differs between the modes.
+    """
+    seed_hash = int.from_bytes(hashlib.sha256(seed.encode("utf-8")).digest()[:8], "little")
+    return LayoutRng(np.random.PCG64(np.random.SeedSequence([seed_hash, version.value, floor_list_index])))
+
+
+def structure_probabilities(allow_monster_houses: bool) -> tuple[list[int], list[float]]:
+    """
+    The probability of each structure type, matching the re-roll rules of the classic generation:
+    Monster Houses are re-rolled over all structures half of the time and never kept if they are not allowed.
+    """
+    all_structures = list(MappaFloorStructureType)
+    possible_structures = list(all_structures)
+    possible_structures.remove(MappaFloorStructureType.TWO_ROOMS_ONE_MH)
+    p = {s: 0.0 for s in all_structures}
+    for s in possible_structures:
+        p[s] += 1 / len(possible_structures)
+    rerolled = p[MappaFloorStructureType.SINGLE_MONSTER_HOUSE] / 2
+    p[MappaFloorStructureType.SINGLE_MONSTER_HOUSE] -= rerolled
+    for s in all_structures:
+        p[s] += rerolled / len(all_structures)
+    if not allow_monster_houses:
+        rerolled = p[MappaFloorStructureType.SINGLE_MONSTER_HOUSE]
+        p[MappaFloorStructureType.SINGLE_MONSTER_HOUSE] = 0.0
+        others = [s for s in possible_structures if s != MappaFloorStructureType.SINGLE_MONSTER_HOUSE]
+        for s in others:
+            p[s] += rerolled / len(others)
+    return [s.value for s in all_structures], [p[s] for s in all_structures]
+
+
+def generate_floor_layout_columns(
+    gen: LayoutRng,
+    config: RandomizerConfig,
+    dungeon_id: int,
+    original_layouts: Sequence[MappaFloorLayoutProtocol],
+) -> dict[str, np.ndarray]:
+    """Draws the parameters of all floors at once. Every column has one entry per original layout."""
+    n = len(original_layouts)
+    dungeons_config = config["dungeons"]
+    dungeon_settings = dungeons_config["settings"][dungeon_id]
+    allow_monster_houses = dungeon_settings["monster_houses"]
+
+    structures, structure_p = structure_probabilities(allow_monster_houses)
+    columns = {
+        "structure": gen.choice(structures, n, p=structure_p),
+        "room_density": gen.integers(3, 21, n),
+        "tileset_id": gen.choice(ALLOWED_TILESET_IDS, n),
+        "music_id": gen.integers(1, 118, n),
+        "floor_connectivity": gen.integers(5, 51, n),
+        "initial_enemy_density": gen.integers(1, 7, n),
+        "kecleon_shop_chance": gen.integers(0, dungeons_config["max_ks_chance"].value + 1, n),
+        "monster_house_chance": (
+            gen.integers(0, dungeons_config["max_mh_chance"].value + 1, n)
+            if allow_monster_houses
+            else np.zeros(n, dtype=np.int64)
+        ),
+        "unused_chance": gen.integers(0, 11, n),
+        "sticky_item_chance": gen.integers(0, dungeons_config["max_sticky_chance"].value + 1, n),
+        "dead_ends": gen.flags(n),
+        "secondary_terrain": gen.integers(0, 30, n),
+        "terrain_settings_0": gen.flags(n),
+        "terrain_settings_2": gen.flags(n),
+        "unk_e": gen.flags(n),
+        "item_density": gen.integers(0, 11, n),
+        "trap_density": gen.integers(0, 16, n),
+        "extra_hallway_density": gen.integers(0, 36, n),
+        "buried_item_density": gen.integers(0, 11, n),
+        "water_density": gen.integers(0, 41, n),
+        "darkness_level": gen.choice([d.value for d in MappaFloorDarknessLevel], n),
+        "max_coin_amount": gen.integers(0, 181, n) * 5,
+        "kecleon_shop_item_positions": gen.integers(0, 14, n),
+        "empty_monster_house_chance": gen.integers(0, 101, n),
+        "unk_hidden_stairs": gen.choice([0, 255], n),
+        "hidden_stairs_spawn_chance": gen.integers(0, dungeons_config["max_hs_chance"].value + 1, n),
+        "iq_booster_boost": gen.integers(0, 2, n),
+    }
+    if dungeon_settings["enemy_iq"]:
+        columns["enemy_iq"] = gen.integers(1, 601, n)
+    else:
+        columns["enemy_iq"] = np.array([layout.enemy_iq for layout in original_layouts], dtype=np.int64)
+    if dungeons_config["weather"] and dungeon_settings["randomize_weather"]:
+        weathers = [w.value for w in MappaFloorWeather if w != MappaFloorWeather.CLEAR]
+        columns["weather"] = np.where(
+            gen.integers(0, 100, n) < dungeons_config["random_weather_chance"].value,
+            gen.choice(weathers, n),
+            MappaFloorWeather.CLEAR.value,
+        )
+    else:
+        columns["weather"] = np.array([layout.weather for layout in original_layouts], dtype=np.int64)
+    return columns
+
+
+def materialize_floor_layouts(
+    columns: dict[str, np.ndarray], original_layouts: Sequence[MappaFloorLayoutProtocol]
+) -> list[MappaFloorLayoutProtocol]:
+    """Turns the columns of generate_floor_layout_columns into layout models."""
+    layout_model = FileType.MAPPA_BIN.get_floor_layout_model()
+    terrain_settings_model = FileType.MAPPA_BIN.get_terrain_settings_model()
+    c = {name: column.tolist() for name, column in columns.items()}
+    layouts = []
+    for i, original_layout in enumerate(original_layouts):
+        layouts.append(
+            layout_model(
+                structure=c["structure"][i],
+                room_density=i8(c["room_density"][i]),
+                tileset_id=u8(c["tileset_id"][i]),
+                music_id=u8(c["music_id"][i]),
+                weather=u8(c["weather"][i]),
+                floor_connectivity=u8(c["floor_connectivity"][i]),
+                initial_enemy_density=i8(c["initial_enemy_density"][i]),
+                kecleon_shop_chance=u8(c["kecleon_shop_chance"][i]),
+                monster_house_chance=u8(c["monster_house_chance"][i]),
+                unused_chance=u8(c["unused_chance"][i]),
+                sticky_item_chance=u8(c["sticky_item_chance"][i]),
+                dead_ends=c["dead_ends"][i],
+                secondary_terrain=u8(c["secondary_terrain"][i]),
+                terrain_settings=terrain_settings_model(
+                    c["terrain_settings_0"][i],
+                    False,
+                    c["terrain_settings_2"][i],
+                    False,
+                    False,
+                    False,
+                    False,
+                    False,
+                ),
+                unk_e=c["unk_e"][i],
+                item_density=u8(c["item_density"][i]),
+                trap_density=u8(c["trap_density"][i]),
+                floor_number=original_layout.floor_number,
+                fixed_floor_id=original_layout.fixed_floor_id,
+                extra_hallway_density=u8(c["extra_hallway_density"][i]),
+                buried_item_density=u8(c["buried_item_density"][i]),
+                water_density=u8(c["water_density"][i]),
+                darkness_level=c["darkness_level"][i],
+                max_coin_amount=c["max_coin_amount"][i],
+                kecleon_shop_item_positions=u8(c["kecleon_shop_item_positions"][i]),
+                empty_monster_house_chance=u8(c["empty_monster_house_chance"][i]),
+                unk_hidden_stairs=u8(c["unk_hidden_stairs"][i]),
+                hidden_stairs_spawn_chance=u8(c["hidden_stairs_spawn_chance"][i]),
+                enemy_iq=u16(c["enemy_iq"][i]),
+                iq_booster_boost=i16(c["iq_booster_boost"][i]),
+            )
+        )
+    return layouts
+
+
+def generate_floor_layouts(
+    gen: LayoutRng,
+    config: RandomizerConfig,
+    dungeon_id: int,
+    original_layouts: Sequence[MappaFloorLayoutProtocol],
+) -> list[MappaFloorLayoutProtocol]:
+    """Generates new layouts for all original_layouts of one dungeon."""
+    return materialize_floor_layouts(
+        generate_floor_layout_columns(gen, config, dungeon_id, original_layouts), original_layouts
+    )
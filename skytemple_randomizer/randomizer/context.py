@@ -0,0 +1,173 @@
+#  Copyright 2020-2025 SkyTemple Contributors
+#
+#  This file is part of SkyTemple.
+#
+#  SkyTemple is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  SkyTemple is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with SkyTemple.  If not, see <https://www.gnu.org/licenses/>.
+from __future__ import annotations
+
+import os
+import platform
+import threading
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING
+
+from skytemple_files.common.impl_cfg import change_implementation_type, ImplementationType
+from skytemple_files.common.types.file_types import FileType
+
+from skytemple_randomizer.config import RandomizerConfig
+from skytemple_randomizer.randomizer.util.file_handlers import apply_file_handler_choices, load_file_handler_calibration
+
+if TYPE_CHECKING:
+    from skytemple_files.common.ppmdu_config.data import Pmd2Language
+    from skytemple_files.common.spritecollab.client import SpriteCollabClient
+    from skytemple_files.common.spritecollab.schema import Credit, MonsterHistory
+    from skytemple_files.data.str.model import Str
+    from skytemple_files.script.ssb.model import Ssb
+
+    from skytemple_randomizer.randomizer.common.items import ItemUniverse
+    from skytemple_randomizer.randomizer.util.util import Pools, ScriptOpIndex
+
+_current: ContextVar[RandomizerContext] = ContextVar("randomizer_context")
+# Used when no randomization is running, eg. by the benchmarks.
+_fallback: RandomizerContext | None = None
+# (num_entities, max_possible) of the MD file type, for ROMs without and with the ExpandPokeList patch.
+MD_PROPERTIES_VANILLA = (600, 554)
+MD_PROPERTIES_EXPAND_POKE_LIST = (2048, 2048)
+# The file handlers and MD properties skytemple_files currently uses (see RandomizerContext.file_handlers) and the
+# number of runs using them.
+_file_handlers_changed = threading.Condition()
+_file_handlers: tuple[ImplementationType, frozenset[tuple[str, ImplementationType]], tuple[int, int]] | None = None
+_file_handlers_users = 0
+_file_handlers_restore: Callable[[], None] | None = None
+
+
+class RandomizerContext:
+    """
+    All state of one randomization run. Each RandomizerThread has its own context and makes it the current context
+    while it runs, so multiple randomizations can run side by side in one process.
+    The randomizers get the context of their run passed in, helper functions find it with current_context.
+    """
+
+    def __init__(self, config: RandomizerConfig | None = None, *, fun_allowed: bool | None = None):
+        self.implementation_type = ImplementationType.PYTHON
+        if config is not None and config["starters_npcs"]["native_file_handlers"]:
+            self.implementation_type = ImplementationType.NATIVE
+        # Implementations to use for specific file types instead, see calibrate_file_handlers.
+        self.file_handler_choices: dict[str, ImplementationType] = {}
+        calibration = load_file_handler_calibration()
+        if calibration is not None:
+            self.file_handler_choices = calibration.choices
+        self.fun_allowed = _fun_allowed_by_env() if fun_allowed is None else fun_allowed
+        # Depends on whether the ROM has the ExpandPokeList patch, set by the RandomizerThread.
+        self.md_properties = MD_PROPERTIES_VANILLA
+        # Cache key of the patched base ROM, if the PatchApplier should add it to the cache, see load_patched_rom.
+        self.patched_rom_key: str | None = None
+
+        self.ssb_files: dict[str, Ssb] = {}
+        self.str_files: dict[Pmd2Language, Str] = {}
+        self.pools: Pools | None = None
+        self.item_universe: ItemUniverse | None = None
+        self.script_op_index: ScriptOpIndex | None = None
+
+        self._sprite_collab: SpriteCollabClient | None = None
+        # Credits for all portraits requested (and found) during the randomization. Key is full form name.
+        self.portrait_credits: dict[tuple[str, str], tuple[list[Credit], list[MonsterHistory]]] = {}
+        # Credits for all sprites requested (and found) during the randomization. Key is full form name.
+        self.sprite_credits: dict[tuple[str, str], tuple[list[Credit], list[MonsterHistory]]] = {}
+
+    def sprite_collab(self) -> SpriteCollabClient:
+        """The SpriteCollab client of this run, created on first use."""
+        if self._sprite_collab is None:
+            from skytemple_files.common.spritecollab.client import SpriteCollabClient
+
+            self._sprite_collab = SpriteCollabClient(cache_size=5_000, use_ssl=platform.system() != "Windows")
+        return self._sprite_collab
+
+    @contextmanager
+    def activate(self) -> Iterator[RandomizerContext]:
+        """Makes this the current context of the calling thread (and the asyncio tasks it starts)."""
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+
+    @contextmanager
+    def file_handlers(self) -> Iterator[None]:
+        """
+        Switches skytemple_files to the file handler implementations and MD properties of this run.
+        skytemple_files only has one set of file handlers and MD properties for the entire process: Runs that use
+        the same ones run at the same time, a run using others waits until those are done.
+        """
+        global _file_handlers, _file_handlers_users, _file_handlers_restore
+        file_handlers = (self.implementation_type, frozenset(self.file_handler_choices.items()), self.md_properties)
+        with _file_handlers_changed:
+            _file_handlers_changed.wait_for(lambda: _file_handlers_users == 0 or _file_handlers == file_handlers)
+            if _file_handlers_users == 0:
+                change_implementation_type(self.implementation_type)
+                restore_choices = apply_file_handler_choices(self.file_handler_choices)
+                restore_md_properties = _apply_md_properties(self.md_properties)
+
+                def restore():
+                    restore_choices()
+                    restore_md_properties()
+
+                _file_handlers_restore = restore
+                _file_handlers = file_handlers
+            _file_handlers_users += 1
+        try:
+            yield
+        finally:
+            with _file_handlers_changed:
+                _file_handlers_users -= 1
+                if _file_handlers_users == 0 and _file_handlers_restore is not None:
+                    _file_handlers_restore()
+                    _file_handlers_restore = None
+                    _file_handlers = None
+                _file_handlers_changed.notify_all()
+
+
+def current_context() -> RandomizerContext:
+    """The context of the randomization running in this thread or asyncio task."""
+    global _fallback
+    try:
+        return _current.get()
+    except LookupError:
+        if _fallback is None:
+            _fallback = RandomizerContext()
+        return _fallback
+
+
+def _apply_md_properties(md_properties: tuple[int, int]) -> Callable[[], None]:
+    """Sets the MD properties, returns a function that restores the previous ones."""
+    properties = FileType.MD.properties()
+    previous = (properties.num_entities, properties.max_possible)
+    properties.num_entities, properties.max_possible = md_properties
+
+    def restore():
+        properties.num_entities, properties.max_possible = previous
+
+    return restore
+
+
+def _fun_allowed_by_env() -> bool:
+    if "SKYTEMPLE_FUN" in os.environ:
+        return bool(int(os.environ["SKYTEMPLE_FUN"]))
+    # It was fun (ha!) but the joke is over. Re-enable when we have a new joke. But also maybe like allow
+    # the user to still bypass fun from the UI.
+    return False
+    # now = datetime.now()
+    # return now.month == 4 and now.day == 1
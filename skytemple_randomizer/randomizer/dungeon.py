@@ -59,12 +59,13 @@ from skytemple_files.dungeon_data.mappa_g_bin.mappa_converter import (
 )
 from skytemple_files.hardcoded.dungeons import HardcodedDungeons, DungeonDefinition
 
-from skytemple_randomizer.config import RandomizerConfig, DungeonModeConfig
+from skytemple_randomizer.config import RandomizerConfig, DungeonModeConfig, DungeonLayoutGeneration
 from skytemple_randomizer.frontend.abstract import AbstractFrontend
 from skytemple_randomizer.randomizer.abstract import AbstractRandomizer
+from skytemple_randomizer.randomizer.context import RandomizerContext
 from skytemple_randomizer.randomizer.common.items import randomize_items
 from skytemple_randomizer.randomizer.common.weights import random_weights
-from skytemple_randomizer.randomizer.util.util import get_allowed_md_ids
+from skytemple_randomizer.randomizer.util.util import get_pools
 from skytemple_randomizer.status import Status
 
 ALLOWED_TILESET_IDS = [
@@ -199,7 +200,6 @@ KECLEON_MD_INDEX = u16(383)
 MONSTER_LEVEL_VARIANCE = 3
 
 SKY_PEAK_MAPPA_IDX = 72
-SHAYMIN_IDS = [534, 535]
 
 MAX_TRAP_LISTS = 100
 MAX_ITEM_LISTS = 150
@@ -231,8 +231,9 @@ class DungeonRandomizer(AbstractRandomizer):
         rng: Random,
         seed: str,
         frontend: AbstractFrontend,
+        context: RandomizerContext | None = None,
     ):
-        super().__init__(config, rom, static_data, rng, seed, frontend)
+        super().__init__(config, rom, static_data, rng, seed, frontend, context)
 
         self.dungeons = HardcodedDungeons.get_dungeon_list(
             get_binary_from_rom(self.rom, self.static_data.bin_sections.arm9),
@@ -299,9 +300,17 @@ class DungeonRandomizer(AbstractRandomizer):
                 or not self.config["dungeons"]["settings"][dungeon_id]["randomize"]
             ):
                 continue
+            bulk_layouts = None
+            if (
+                self.config["dungeons"]["layouts"]
+                and self.config["dungeons"]["layout_generation"] != DungeonLayoutGeneration.CLASSIC
+            ):
+                bulk_layouts = self._randomize_layouts_bulk(floor_list, floor_list_index, dungeon_id)
             for i_floor, floor in enumerate(floor_list):
                 if self._can_be_randomized(floor):
-                    if self.config["dungeons"]["layouts"]:
+                    if bulk_layouts is not None:
+                        floor.layout = bulk_layouts[i_floor]
+                    elif self.config["dungeons"]["layouts"]:
                         floor.layout = self._randomize_layout(floor.layout, dungeon_id)
                     if self.config["dungeons"]["pokemon"]:
                         floor.monsters = self._randomize_monsters(
@@ -397,13 +406,25 @@ class DungeonRandomizer(AbstractRandomizer):
             iq_booster_boost=i16(self.rng.choice((0, 1))),
         )
 
+    def _randomize_layouts_bulk(
+        self, floor_list: Sequence[MappaFloorProtocol], floor_list_index: int, dungeon_id: int
+    ) -> dict[int, MappaFloorLayoutProtocol]:
+        """Generates the layouts of all floors of the floor list that can be randomized at once."""
+        try:
+            from skytemple_randomizer.randomizer.common import layouts
+        except ImportError as e:
+            raise ValueError("Bulk dungeon layout generation requires NumPy to be installed.") from e
+
+        indices = [i for i, floor in enumerate(floor_list) if self._can_be_randomized(floor)]
+        gen = layouts.layout_generator(self.seed, floor_list_index, self.config["dungeons"]["layout_generation"])
+        new_layouts = layouts.generate_floor_layouts(
+            gen, self.config, dungeon_id, [floor_list[i].layout for i in indices]
+        )
+        return dict(zip(indices, new_layouts))
+
     def _randomize_monsters(self, min_level, max_level, allow_shaymin=True):
         monsters = []
-        allowed = get_allowed_md_ids(self.rng, self.config)
-        if not allow_shaymin:
-            for idx in SHAYMIN_IDS:
-                if idx in allowed:
-                    allowed.remove(u16(idx))
+        allowed = get_pools(self.config).md_ids(self.rng, allow_shaymin=allow_shaymin)
         md_ids = sorted(
             {
                 self.rng.choice(allowed)
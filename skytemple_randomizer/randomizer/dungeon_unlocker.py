@@ -16,6 +16,7 @@
 #
 #  You should have received a copy of the GNU General Public License
 #  along with SkyTemple.  If not, see <https://www.gnu.org/licenses/>.
+import json
 
 from explorerscript.source_map import SourceMap
 from explorerscript.ssb_converting.compiler.label_finalizer import LabelFinalizer
@@ -35,11 +36,15 @@ from skytemple_files.common.types.file_types import FileType
 from skytemple_files.script.ssb.model import Ssb, SkyTempleSsbOperation
 from skytemple_files.script.ssb.script_compiler import ScriptCompiler
 from skytemple_randomizer.randomizer.abstract import AbstractRandomizer
+from skytemple_randomizer.randomizer.util.disk_cache import cache_key, cache_read, cache_write, package_version
 from skytemple_randomizer.randomizer.util.util import get_script, clear_script_cache_for
 from skytemple_randomizer.status import Status
 from skytemple_files.common.i18n_util import _
 
 
+UNIONALL = "SCRIPT/COMMON/unionall.ssb"
+
+
 class DungeonUnlocker(AbstractRandomizer):
     def step_count(self) -> int:
         return 1
@@ -47,40 +52,63 @@ class DungeonUnlocker(AbstractRandomizer):
     def run(self, status: Status):
         status.step(_("Unlocking dungeons..."))
 
+        ssb: Ssb = get_script(UNIONALL, self.rom, static_data=self.static_data)
+        unlocked = sorted(
+            dungeon_id for dungeon_id, dungeon in self.config["dungeons"]["settings"].items() if dungeon["unlock"]
+        )
+        # The script may already contain replaced strings of earlier steps, so those are part of the key.
+        compiled_key = cache_key(
+            package_version("skytemple-files"),
+            package_version("explorerscript"),
+            self.static_data.game_edition,
+            self.rom.getFileByName(UNIONALL),
+            json.dumps([ssb.constants, ssb.strings], sort_keys=True),
+            ",".join(str(x) for x in unlocked),
+        )
+
+        data = cache_read("unionall", compiled_key)
+        if data is None:
+            data = FileType.SSB.serialize(self._compile(ssb, unlocked), static_data=self.static_data)
+            cache_write("unionall", compiled_key, data)
+
+        self.rom.setFileByName(UNIONALL, data)
+        clear_script_cache_for(UNIONALL)
+
+        status.done()
+
+    def _compile(self, ssb: Ssb, unlocked: list[int]) -> Ssb:
         new_ops: list[SsbOperation] = []
         coro_id = self.static_data.script_data.common_routine_info__by_name["EVENT_DIVIDE"].id
         ops = self.static_data.script_data.op_codes__by_name
 
         # DECOMPILE
-        ssb: Ssb = get_script("SCRIPT/COMMON/unionall.ssb", self.rom, static_data=self.static_data)
         routine_ops = list(OpsLabelJumpToResolver(ssb.get_filled_routine_ops()))
 
         # CREATE NEW OPS
         off = Counter()
         off.count = -10000
-        for dungeon_id, dungeon in self.config["dungeons"]["settings"].items():
-            if dungeon["unlock"]:
-                if len(new_ops) < 1:
-                    new_ops.append(
-                        SkyTempleSsbOperation(
-                            off(),
-                            ops["debug_Print"][0],
-                            [SsbOpParamConstString("SkyTemple Randomizer: Dungeon Unlock...")],
-                        )
+        for dungeon_id in unlocked:
+            if len(new_ops) < 1:
+                new_ops.append(
+                    SkyTempleSsbOperation(
+                        off(),
+                        ops["debug_Print"][0],
+                        [SsbOpParamConstString("SkyTemple Randomizer: Dungeon Unlock...")],
                     )
-                label_closed = SsbLabel(9000 + dungeon_id, coro_id)
-                label_request = SsbLabel(9200 + dungeon_id, coro_id)
-                label_else = SsbLabel(9400 + dungeon_id, coro_id)
-                new_ops.append(SkyTempleSsbOperation(off(), ops["SwitchDungeonMode"][0], [dungeon_id]))
-                new_ops.append(SsbLabelJump(SkyTempleSsbOperation(off(), ops["Case"][0], [0]), label_closed))
-                new_ops.append(SsbLabelJump(SkyTempleSsbOperation(off(), ops["Case"][0], [2]), label_request))
-                new_ops.append(SsbLabelJump(SkyTempleSsbOperation(off(), ops["Jump"][0], []), label_else))
-                new_ops.append(label_closed)
-                new_ops.append(SkyTempleSsbOperation(off(), ops["flag_SetDungeonMode"][0], [dungeon_id, 1]))
-                new_ops.append(SsbLabelJump(SkyTempleSsbOperation(off(), ops["Jump"][0], []), label_else))
-                new_ops.append(label_request)
-                new_ops.append(SkyTempleSsbOperation(off(), ops["flag_SetDungeonMode"][0], [dungeon_id, 3]))
-                new_ops.append(label_else)
+                )
+            label_closed = SsbLabel(9000 + dungeon_id, coro_id)
+            label_request = SsbLabel(9200 + dungeon_id, coro_id)
+            label_else = SsbLabel(9400 + dungeon_id, coro_id)
+            new_ops.append(SkyTempleSsbOperation(off(), ops["SwitchDungeonMode"][0], [dungeon_id]))
+            new_ops.append(SsbLabelJump(SkyTempleSsbOperation(off(), ops["Case"][0], [0]), label_closed))
+            new_ops.append(SsbLabelJump(SkyTempleSsbOperation(off(), ops["Case"][0], [2]), label_request))
+            new_ops.append(SsbLabelJump(SkyTempleSsbOperation(off(), ops["Jump"][0], []), label_else))
+            new_ops.append(label_closed)
+            new_ops.append(SkyTempleSsbOperation(off(), ops["flag_SetDungeonMode"][0], [dungeon_id, 1]))
+            new_ops.append(SsbLabelJump(SkyTempleSsbOperation(off(), ops["Jump"][0], []), label_else))
+            new_ops.append(label_request)
+            new_ops.append(SkyTempleSsbOperation(off(), ops["flag_SetDungeonMode"][0], [dungeon_id, 3]))
+            new_ops.append(label_else)
 
         routine_ops[coro_id] = new_ops + routine_ops[coro_id]
         # COMPILE
@@ -92,11 +120,4 @@ class DungeonUnlocker(AbstractRandomizer):
             [x.name for x in self.static_data.script_data.common_routine_info__by_id.values()],
             SourceMap.create_empty(),
         )
-
-        self.rom.setFileByName(
-            "SCRIPT/COMMON/unionall.ssb",
-            FileType.SSB.serialize(new_ssb, static_data=self.static_data),
-        )
-        clear_script_cache_for("SCRIPT/COMMON/unionall.ssb")
-
-        status.done()
+        return new_ssb
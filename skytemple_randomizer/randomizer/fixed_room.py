@@ -43,6 +43,7 @@ from skytemple_files.hardcoded.dungeons import HardcodedDungeons
 from skytemple_randomizer.config import RandomizerConfig
 from skytemple_randomizer.frontend.abstract import AbstractFrontend
 from skytemple_randomizer.randomizer.abstract import AbstractRandomizer
+from skytemple_randomizer.randomizer.context import RandomizerContext
 from skytemple_randomizer.status import Status
 
 BOSS_ROOMS = range(1, 81)
@@ -61,8 +62,9 @@ class FixedRoomRandomizer(AbstractRandomizer):
         rng: Random,
         seed: str,
         frontend: AbstractFrontend,
+        context: RandomizerContext | None = None,
     ):
-        super().__init__(config, rom, static_data, rng, seed, frontend)
+        super().__init__(config, rom, static_data, rng, seed, frontend, context)
 
         self.dungeons = HardcodedDungeons.get_dungeon_list(
             get_binary_from_rom(self.rom, self.static_data.bin_sections.arm9),
@@ -17,19 +17,28 @@
 from random import Random
 
 from skytemple_files.common.i18n_util import _
-from skytemple_files.script.ssb.model import Ssb
 
 from skytemple_randomizer.frontend.abstract import AbstractFrontend
 from skytemple_randomizer.randomizer.abstract import AbstractRandomizer
-from skytemple_randomizer.randomizer.util.util import get_script
+from skytemple_randomizer.randomizer.context import RandomizerContext
+from skytemple_randomizer.randomizer.util.util import get_script_op_index
 from skytemple_randomizer.status import Status
 
 SCRIPT_NAME = "SCRIPT/D14P12A/m14a0103.ssb"
 
 
 class FixQuicksandPit(AbstractRandomizer):
-    def __init__(self, config, rom, static_data, rng: Random, seed, frontend: AbstractFrontend):
-        super().__init__(config, rom, static_data, rng, seed, frontend)
+    def __init__(
+        self,
+        config,
+        rom,
+        static_data,
+        rng: Random,
+        seed,
+        frontend: AbstractFrontend,
+        context: RandomizerContext | None = None,
+    ):
+        super().__init__(config, rom, static_data, rng, seed, frontend, context)
         self.bgs = [b for b in self.static_data.script_data.bgms if b.loops]
 
     def step_count(self) -> int:
@@ -38,13 +47,9 @@ class FixQuicksandPit(AbstractRandomizer):
     def run(self, status: Status):
         status.step(_("Fixing Quicksand Pit..."))
         try:
-            ssb: Ssb = get_script(SCRIPT_NAME, self.rom, self.static_data)
-
-            for rtn in ssb.routine_ops:
-                for op in rtn:
-                    op_c = self.static_data.script_data.op_codes__by_name[op.op_code.name][0]
-                    if op_c.name == "WaitAnimation":
-                        op.op_code = self.static_data.script_data.op_codes__by_name["Null"][0]
+            index = get_script_op_index(self.rom, self.static_data)
+            for _name, _ssb, op in list(index.ops("WaitAnimation", self.rom, self.static_data, scripts=(SCRIPT_NAME,))):
+                op.op_code = self.static_data.script_data.op_codes__by_name["Null"][0]
         except Exception:
             # We ignore errors, it's possible ROM Hacks removed this script
             raise  # todo!
@@ -17,7 +17,6 @@
 
 from skytemple_files.common.i18n_util import _
 from skytemple_files.list.items.handler import ItemListHandler
-from skytemple_files.patch.patches import Patcher
 
 from skytemple_randomizer.randomizer.abstract import AbstractRandomizer
 from skytemple_randomizer.randomizer.common.items import randomize_items
@@ -35,11 +34,7 @@ class GlobalItemsRandomizer(AbstractRandomizer):
             return
 
         status.step(_("Apply patches..."))
-        patcher = Patcher(self.rom, self.static_data)
-        if not patcher.is_applied("ActorAndLevelLoader"):
-            patcher.apply("ActorAndLevelLoader")
-        if not patcher.is_applied("ExtractHardcodedItemLists"):
-            patcher.apply("ExtractHardcodedItemLists")
+        self.patcher.require("ActorAndLevelLoader", "ExtractHardcodedItemLists")
 
         status.step(_("Randomizing global item lists..."))
         for i in range(0, ITEM_LIST_COUNT):
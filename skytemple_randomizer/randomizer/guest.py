@@ -20,7 +20,6 @@ from skytemple_files.common.util import get_binary_from_rom, set_binary_in_rom
 from skytemple_files.data.md.protocol import MdProtocol
 from skytemple_files.hardcoded.guest_pokemon import GuestPokemonList
 from skytemple_files.list.actor.model import ActorListBin
-from skytemple_files.patch.patches import Patcher
 
 from skytemple_randomizer.config import MovesetConfig
 from skytemple_randomizer.randomizer.abstract import AbstractRandomizer
@@ -56,9 +55,7 @@ class GuestRandomizer(AbstractRandomizer):
 
     def run(self, status: Status):
         status.step(_("Apply 'EditGuestPokemon' patch..."))
-        patcher = Patcher(self.rom, self.static_data)
-        if not patcher.is_applied("EditGuestPokemon"):
-            patcher.apply("EditGuestPokemon")
+        self.patcher.require("EditGuestPokemon")
         arm9 = bytearray(get_binary_from_rom(self.rom, self.static_data.bin_sections.arm9))
         guests = GuestPokemonList.read(arm9, self.static_data)
 
@@ -18,7 +18,6 @@ from range_typed_integers import u8, i32, i16
 from skytemple_files.common.util import get_binary_from_rom, set_binary_in_rom
 from skytemple_files.hardcoded.iq import HardcodedIq, IqGroupsSkills
 from skytemple_files.hardcoded.tactics import HardcodedTactics
-from skytemple_files.patch.patches import Patcher
 from skytemple_randomizer.randomizer.abstract import AbstractRandomizer
 from skytemple_randomizer.status import Status
 from skytemple_files.common.i18n_util import _
@@ -38,11 +37,9 @@ class IqTacticsRandomizer(AbstractRandomizer):
         return i
 
     def run(self, status: Status):
-        patcher = Patcher(self.rom, self.static_data)
-        additional_types_patch_applied = patcher.is_applied("AddTypes")
+        additional_types_patch_applied = self.patcher.is_applied("AddTypes")
         if self.config["iq"]["randomize_iq_groups"]:
-            if not patcher.is_applied("CompressIQData"):
-                patcher.apply("CompressIQData")
+            self.patcher.require("CompressIQData")
         ov10 = get_binary_from_rom(self.rom, self.static_data.bin_sections.overlay10)
         ov29 = get_binary_from_rom(self.rom, self.static_data.bin_sections.overlay29)
         arm9 = bytearray(get_binary_from_rom(self.rom, self.static_data.bin_sections.arm9))
@@ -98,8 +95,7 @@ class IqTacticsRandomizer(AbstractRandomizer):
 
         if self.config["iq"]["randomize_iq_groups"]:
             status.step(_("Randomizing IQ groups..."))
-            if not patcher.is_applied("CompressIQData"):
-                patcher.apply("CompressIQData")
+            self.patcher.require("CompressIQData")
             iq_groups = IqGroupsSkills.read_compressed(arm9, self.static_data)
 
             iq_skills = HardcodedIq.get_iq_skills(arm9, self.static_data)
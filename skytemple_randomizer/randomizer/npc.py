@@ -22,7 +22,6 @@ from skytemple_files.common.types.file_types import FileType
 from skytemple_files.common.util import get_files_from_rom_with_extension
 from skytemple_files.data.md.protocol import Gender
 from skytemple_files.list.actor.model import ActorListBin
-from skytemple_files.patch.patches import Patcher
 
 from skytemple_randomizer.randomizer.abstract import AbstractRandomizer
 from skytemple_randomizer.randomizer.util.util import (
@@ -53,9 +52,7 @@ class NpcRandomizer(AbstractRandomizer):
         pokemon_string_data = self.static_data.string_index_data.string_blocks["Pokemon Names"]
 
         status.step(_("Apply 'ActorAndLevelLoader' patch..."))
-        patcher = Patcher(self.rom, self.static_data)
-        if not patcher.is_applied("ActorAndLevelLoader"):
-            patcher.apply("ActorAndLevelLoader")
+        self.patcher.require("ActorAndLevelLoader")
 
         status.step(_("Randomizing NPC actor list..."))
         mapped_actors = self._randomize_actors()
@@ -18,24 +18,30 @@ from random import Random
 
 from range_typed_integers import u8
 from skytemple_files.common.i18n_util import _
-from skytemple_files.common.util import (
-    get_files_from_rom_with_extension,
-    get_binary_from_rom,
-    set_binary_in_rom,
-)
+from skytemple_files.common.util import get_binary_from_rom, set_binary_in_rom
 from skytemple_files.hardcoded.main_menu_music import HardcodedMainMenuMusic
-from skytemple_files.script.ssb.model import Ssb
 
 from skytemple_randomizer.frontend.abstract import AbstractFrontend
 from skytemple_randomizer.randomizer.abstract import AbstractRandomizer
-from skytemple_randomizer.randomizer.util.util import get_script, SKIP_JP_INVALID_SSB
+from skytemple_randomizer.randomizer.context import RandomizerContext
+from skytemple_randomizer.randomizer.util.util import get_script_op_index
 from skytemple_randomizer.status import Status
 
 
 class OverworldMusicRandomizer(AbstractRandomizer):
-    def __init__(self, config, rom, static_data, rng: Random, seed, frontend: AbstractFrontend):
-        super().__init__(config, rom, static_data, rng, seed, frontend)
-        self.bgs = [u8(b.id) for b in self.static_data.script_data.bgms if b.loops]
+    def __init__(
+        self,
+        config,
+        rom,
+        static_data,
+        rng: Random,
+        seed,
+        frontend: AbstractFrontend,
+        context: RandomizerContext | None = None,
+    ):
+        super().__init__(config, rom, static_data, rng, seed, frontend, context)
+        self.bgs = tuple(u8(b.id) for b in self.static_data.script_data.bgms if b.loops)
+        self.looping_bgs = frozenset(self.bgs)
 
     def step_count(self) -> int:
         i = 0
@@ -60,26 +66,20 @@ class OverworldMusicRandomizer(AbstractRandomizer):
 
         status.step(_("Randomizing Overworld Music..."))
 
-        for script_name in get_files_from_rom_with_extension(self.rom, "ssb"):
-            if script_name in SKIP_JP_INVALID_SSB:
-                continue
-            ssb: Ssb = get_script(script_name, self.rom, self.static_data)
-
-            for rtn in ssb.routine_ops:
-                for op in rtn:
-                    op_c = self.static_data.script_data.op_codes__by_name[op.op_code.name][0]
-                    for i, param_spec in enumerate(op_c.arguments):
-                        if param_spec.type == "Bgm":
-                            # Only randomize real music (looping tracks)
-                            if any(b == op.params[i] for b in self.bgs):
-                                op.params[i] = self._get_random_music_id()
-                    # We don't really support this, so replace it with Null.
-                    if op_c.name == "WaitBgmSignal":
-                        op.op_code = self.static_data.script_data.op_codes__by_name["Null"][0]
-                    # Replace with a generic Wait, maintaining the parameter count as opposed to Null.
-                    elif op_c.name == "WaitBgm" or op_c.name == "WaitBgm2":
-                        op.op_code = self.static_data.script_data.op_codes__by_name["Wait"][0]
-                        op.params = [60]
+        index = get_script_op_index(self.rom, self.static_data)
+        for _name, _ssb, op, i in index.params("Bgm", self.rom, self.static_data):
+            # Only randomize real music (looping tracks)
+            if op.params[i] in self.looping_bgs:
+                op.params[i] = self._get_random_music_id()
+        op_codes = self.static_data.script_data.op_codes__by_name
+        # We don't really support this, so replace it with Null.
+        for _name, _ssb, op in list(index.ops("WaitBgmSignal", self.rom, self.static_data)):
+            op.op_code = op_codes["Null"][0]
+        # Replace with a generic Wait, maintaining the parameter count as opposed to Null.
+        for name in ("WaitBgm", "WaitBgm2"):
+            for _name, _ssb, op in list(index.ops(name, self.rom, self.static_data)):
+                op.op_code = op_codes["Wait"][0]
+                op.params = [60]
         status.done()
 
     def _get_random_music_id(self):
@@ -14,16 +14,30 @@
 #
 #  You should have received a copy of the GNU General Public License
 #  along with SkyTemple.  If not, see <https://www.gnu.org/licenses/>.
+import json
 from time import sleep
 
+from ndspy.rom import NintendoDSRom
 from skytemple_files.common.i18n_util import _
-from skytemple_files.common.types.file_types import FileType
-from skytemple_files.patch.patches import Patcher
 
-from skytemple_randomizer.config import QuizMode
+from skytemple_randomizer.config import QuizMode, RandomizerConfig
 from skytemple_randomizer.randomizer.abstract import AbstractRandomizer
+from skytemple_randomizer.randomizer.context import RandomizerContext
+from skytemple_randomizer.randomizer.util.disk_cache import (
+    cache_key,
+    cache_file,
+    cache_write_with,
+    get_cache_dir,
+    package_version,
+)
+from skytemple_randomizer.rom_io import load_rom, rom_fingerprint, save_rom_to_file
 from skytemple_randomizer.status import Status
 
+# Patches that are skipped if they are not implemented for the ROM's region.
+OPTIONAL_PATCHES = {"FixEvolutionGlitch"}
+# Maximum size of all cached patched ROMs in bytes, the least recently used ones are removed first.
+PATCHED_ROMS_CACHE_SIZE = 256 * 1024 * 1024
+
 
 class PatchApplier(AbstractRandomizer):
     def step_count(self) -> int:
@@ -45,90 +59,105 @@ class PatchApplier(AbstractRandomizer):
         return i
 
     def run(self, status: Status):
-        patcher = Patcher(self.rom, self.static_data)
-
-        status.step(_("Apply base patches by psy_commando and Frostbyte..."))
-        sleep(5)  # gotta give some spotlight to them.
-        if not patcher.is_applied("ActorAndLevelLoader"):
-            patcher.apply("ActorAndLevelLoader")
-        if not patcher.is_applied("ProvideATUPXSupport"):
-            patcher.apply("ProvideATUPXSupport")
-        if not patcher.is_applied("ExtraSpace"):
-            patcher.apply("ExtraSpace")
-        if not patcher.is_applied("AntiSoftlock"):
-            patcher.apply("AntiSoftlock")
-        # FixEvolutionGlitch shenanigans
-        cannot_apply_fixevo = True
-        try:
-            cannot_apply_fixevo = patcher.is_applied("FixEvolutionGlitch")
-        except NotImplementedError:
-            pass
-        if not cannot_apply_fixevo:
-            patcher.apply("FixEvolutionGlitch")
-
-        if self.config["improvements"]["patch_moveshortcuts"]:
-            status.step(_("Apply 'MoveShortcuts' patch..."))
-            if not patcher.is_applied("MoveShortcuts"):
-                patcher.apply("MoveShortcuts")
+        for i, (message, patch_names) in enumerate(_patches(self.config)):
+            if message is not None:
+                status.step(message)
+            if i == 0:
+                sleep(5)  # gotta give some spotlight to them.
+            # Nothing is left to apply if the ROM was loaded from the cache, see load_patched_rom.
+            for patch_name in patch_names:
+                try:
+                    if self.patcher.is_applied(patch_name):
+                        continue
+                except NotImplementedError:
+                    # FixEvolutionGlitch shenanigans
+                    if patch_name in OPTIONAL_PATCHES:
+                        continue
+                    raise
+                self.patcher.apply(patch_name)
+
+        key = self.context.patched_rom_key
+        if key is not None:
+            self.context.patched_rom_key = None
+            cache_write_with(
+                "patched_roms",
+                key,
+                lambda path: save_rom_to_file(self.rom, path),
+                PATCHED_ROMS_CACHE_SIZE,
+            )
 
-        if self.config["improvements"]["patch_unuseddungeonchance"]:
-            status.step(_("Apply 'UnusedDungeonChance' patch..."))
-            if not patcher.is_applied("UnusedDungeonChance"):
-                patcher.apply("UnusedDungeonChance")
-
-        if self.config["improvements"]["patch_totalteamcontrol"]:
-            status.step(_("Apply 'Complete Team Control' patches..."))
-            if not patcher.is_applied("CompleteTeamControl"):
-                patcher.apply("CompleteTeamControl")
-            if not patcher.is_applied("FarOffPalOverdrive"):
-                patcher.apply("FarOffPalOverdrive")
-            if not patcher.is_applied("PartnersTriggerHiddenTraps"):
-                patcher.apply("PartnersTriggerHiddenTraps")
-            if not patcher.is_applied("ReduceJumpcutPauseTime"):
-                patcher.apply("ReduceJumpcutPauseTime")
-
-        if not patcher.is_applied("NoWeatherStop"):
-            patcher.apply("NoWeatherStop")
-
-        if not patcher.is_applied("RemoveBodySizeCheck"):
-            patcher.apply("RemoveBodySizeCheck")
-
-        if self.config["quiz"]["mode"] != QuizMode.TEST:
-            status.step(_("Apply personality test patches..."))
-            if not patcher.is_applied("ChooseStarter"):
-                patcher.apply("ChooseStarter")
-            if self.config["quiz"]["mode"] == QuizMode.ASK:
-                if not patcher.is_applied("SkipQuiz"):
-                    patcher.apply("SkipQuiz")
+        status.done()
 
-        if self.config["improvements"]["patch_fixmemorysoftlock"]:
-            status.step(_("Apply 'FixMemorySoftlock' patch..."))
-            if not patcher.is_applied("FixMemorySoftlock"):
-                patcher.apply("FixMemorySoftlock")
 
-        if self.config["improvements"]["patch_sametypepartner"]:
-            status.step(_("Apply 'SameTypePartner' patch..."))
-            if not patcher.is_applied("SameTypePartner"):
-                patcher.apply("SameTypePartner")
-
-        if self.config["improvements"]["patch_disarm_monster_houses"]:
-            status.step(_("Apply 'DisarmOneRoomMonsterHouses' patch..."))
-            if not patcher.is_applied("DisarmOneRoomMonsterHouses"):
-                patcher.apply("DisarmOneRoomMonsterHouses")
-
-        # Change MD properties if ExpandPokeList patch is applied
-        md_properties = FileType.MD.properties()
-        expand_poke_applied = False
+def _patches(config: RandomizerConfig) -> list[tuple[str | None, list[str]]]:
+    """
+    The patches to apply, in order, grouped by the status message to show.
+    The patched ROM only depends on the input ROM and this list, see load_patched_rom.
+    """
+    patches: list[tuple[str | None, list[str]]] = [
+        (
+            _("Apply base patches by psy_commando and Frostbyte..."),
+            ["ActorAndLevelLoader", "ProvideATUPXSupport", "ExtraSpace", "AntiSoftlock", "FixEvolutionGlitch"],
+        )
+    ]
+
+    if config["improvements"]["patch_moveshortcuts"]:
+        patches.append((_("Apply 'MoveShortcuts' patch..."), ["MoveShortcuts"]))
+
+    if config["improvements"]["patch_unuseddungeonchance"]:
+        patches.append((_("Apply 'UnusedDungeonChance' patch..."), ["UnusedDungeonChance"]))
+
+    if config["improvements"]["patch_totalteamcontrol"]:
+        patches.append(
+            (
+                _("Apply 'Complete Team Control' patches..."),
+                [
+                    "CompleteTeamControl",
+                    "FarOffPalOverdrive",
+                    "PartnersTriggerHiddenTraps",
+                    "ReduceJumpcutPauseTime",
+                ],
+            )
+        )
+
+    patches.append((None, ["NoWeatherStop", "RemoveBodySizeCheck"]))
+
+    if config["quiz"]["mode"] != QuizMode.TEST:
+        quiz_patches = ["ChooseStarter"]
+        if config["quiz"]["mode"] == QuizMode.ASK:
+            quiz_patches.append("SkipQuiz")
+        patches.append((_("Apply personality test patches..."), quiz_patches))
+
+    if config["improvements"]["patch_fixmemorysoftlock"]:
+        patches.append((_("Apply 'FixMemorySoftlock' patch..."), ["FixMemorySoftlock"]))
+
+    if config["improvements"]["patch_sametypepartner"]:
+        patches.append((_("Apply 'SameTypePartner' patch..."), ["SameTypePartner"]))
+
+    if config["improvements"]["patch_disarm_monster_houses"]:
+        patches.append((_("Apply 'DisarmOneRoomMonsterHouses' patch..."), ["DisarmOneRoomMonsterHouses"]))
+
+    return patches
+
+
+def load_patched_rom(config: RandomizerConfig, rom: NintendoDSRom, context: RandomizerContext) -> NintendoDSRom | None:
+    """
+    Returns the input ROM with the patches of the PatchApplier applied from the cache, as a new ROM. None if it is not
+    cached; then the PatchApplier of the run of context adds it to the cache.
+    """
+    if get_cache_dir() is None:
+        return None
+    key = cache_key(
+        package_version("skytemple-files"),
+        rom_fingerprint(rom),
+        json.dumps([patch_names for __, patch_names in _patches(config)]),
+    )
+    path = cache_file("patched_roms", key)
+    if path is not None:
         try:
-            expand_poke_applied = patcher.is_applied("ExpandPokeList")
-        except NotImplementedError:
+            return load_rom(path)
+        except OSError:
+            # Removed by another run in the meantime.
             pass
-
-        if expand_poke_applied:
-            md_properties.num_entities = 2048
-            md_properties.max_possible = 2048
-        else:
-            md_properties.num_entities = 600
-            md_properties.max_possible = 554
-
-        status.done()
+    context.patched_rom_key = key
+    return None
@@ -47,14 +47,13 @@ from skytemple_files.hardcoded.personality_test_starters import (
     HardcodedPersonalityTestStarters,
 )
 from skytemple_files.list.actor.model import ActorListBin
-from skytemple_files.patch.patches import Patcher
 
 from skytemple_randomizer.config import RandomizerConfig
 from skytemple_randomizer.frontend.abstract import AbstractFrontend, PortraitDebugLine
 from skytemple_randomizer.randomizer.abstract import AbstractRandomizer
+from skytemple_randomizer.randomizer.context import RandomizerContext
 from skytemple_randomizer.randomizer.special import fun
 from skytemple_randomizer.spritecollab import (
-    sprite_collab,
     get_details_and_portraits,
     get_sprites,
 )
@@ -74,8 +73,9 @@ class PortraitDownloader(AbstractRandomizer):
         rng: Random,
         seed: str,
         frontend: AbstractFrontend,
+        context: RandomizerContext | None = None,
     ):
-        super().__init__(config, rom, static_data, rng, seed, frontend)
+        super().__init__(config, rom, static_data, rng, seed, frontend, context)
 
         self.monster_bin = FileType.BIN_PACK.deserialize(rom.getFileByName(MONSTER_BIN))
         self.monster_ground_bin = FileType.BIN_PACK.deserialize(rom.getFileByName(GROUND_BIN))
@@ -88,7 +88,7 @@ class PortraitDownloader(AbstractRandomizer):
 
     def step_count(self) -> int:
         if self.config["improvements"]["download_portraits"]:
-            if fun.is_fun_allowed():
+            if self.context.fun_allowed:
                 return 1
             try:
                 actor_list: ActorListBin = FileType.SIR0.unwrap_obj(
@@ -111,17 +111,14 @@ class PortraitDownloader(AbstractRandomizer):
             return status.done()
         self.frontend.idle_add(self.frontend.portrait_debug__clear)
 
-        patcher = Patcher(self.rom, self.static_data)
         self.is_expand_poke_list_applied = False
         try:
-            self.is_expand_poke_list_applied = patcher.is_applied("ExpandPokeList")
+            self.is_expand_poke_list_applied = self.patcher.is_applied("ExpandPokeList")
         except NotImplementedError:
             pass
 
         status.step(_("Apply 'ActorAndLevelLoader' patch..."))
-        patcher = Patcher(self.rom, self.static_data)
-        if not patcher.is_applied("ActorAndLevelLoader"):
-            patcher.apply("ActorAndLevelLoader")
+        self.patcher.require("ActorAndLevelLoader")
 
         overlay13 = get_binary_from_rom(self.rom, self.static_data.bin_sections.overlay13)
         actor_list: ActorListBin = FileType.SIR0.unwrap_obj(
@@ -135,7 +132,7 @@ class PortraitDownloader(AbstractRandomizer):
         sprconf = FileType.SPRCONF.load(self.rom)
 
         status.step(_("Downloading portraits and sprites... {}/{}").format(self.current, self.total))
-        if fun.is_fun_allowed():
+        if self.context.fun_allowed:
             fun.replace_portraits(self.rom, self.static_data)
             return status.done()
 
@@ -184,7 +181,7 @@ class PortraitDownloader(AbstractRandomizer):
             i = 0
 
             for chunk in chunks(task_params, 30):
-                async with sprite_collab() as sc:
+                async with self.context.sprite_collab() as sc:
                     tasks: list[Coroutine] = []
                     for task_param_kwargs in chunk:
                         tasks.append(self._import_portrait(sc, **task_param_kwargs))
@@ -18,7 +18,6 @@ from skytemple_files.common.types.file_types import FileType
 from skytemple_files.common.util import get_binary_from_rom, set_binary_in_rom
 from skytemple_files.hardcoded.recruitment_tables import HardcodedRecruitmentTables
 from skytemple_files.list.actor.model import ActorListBin
-from skytemple_files.patch.patches import Patcher
 from skytemple_randomizer.randomizer.abstract import AbstractRandomizer
 from skytemple_randomizer.status import Status
 from skytemple_files.common.i18n_util import _
@@ -80,9 +79,7 @@ class RecruitmentTableRandomizer(AbstractRandomizer):
             return status.done()
 
         status.step(_("Apply 'ActorAndLevelLoader' patch..."))
-        patcher = Patcher(self.rom, self.static_data)
-        if not patcher.is_applied("ActorAndLevelLoader"):
-            patcher.apply("ActorAndLevelLoader")
+        self.patcher.require("ActorAndLevelLoader")
 
         status.step(_("Updating special recruitment table..."))
 
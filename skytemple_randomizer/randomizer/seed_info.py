@@ -32,7 +32,6 @@ from skytemple_files.common.spritecollab.schema import (
 from skytemple_files.common.string_codec import can_be_encoded
 from skytemple_files.common.types.file_types import FileType
 from skytemple_files.common.util import create_file_in_rom
-from skytemple_files.patch.patches import Patcher
 from skytemple_files.script.ssa_sse_sss.actor import SsaActor
 from skytemple_files.script.ssa_sse_sss.model import Ssa
 from skytemple_files.script.ssa_sse_sss.position import SsaPosition
@@ -46,7 +45,6 @@ from skytemple_randomizer.config import (
 from skytemple_randomizer.randomizer.abstract import AbstractRandomizer
 from skytemple_randomizer.randomizer.special import fun
 from skytemple_randomizer.randomizer.util.util import get_all_string_files, strlossy
-from skytemple_randomizer.spritecollab import portrait_credits, sprite_credits
 from skytemple_randomizer.status import Status
 from skytemple_files.common.i18n_util import _
 
@@ -330,7 +328,7 @@ def 0 {{
 macro artists() {{
     @l_artists;
     switch ( message_SwitchMenu(0, 1) ) {{
-        {self._artist_credits(portrait_credits())}
+        {self._artist_credits(self.context.portrait_credits)}
         case menu("Goodbye!"):
         default:
             break;
@@ -362,7 +360,7 @@ macro licenses() {{
         except FileExistsError:
             self.rom.setFileByName(script_fn, script_sera)
 
-        if not fun.is_fun_allowed():
+        if not self.context.fun_allowed:
             exps = f"""
 def 0 {{
     with (actor ACTOR_TALK_MAIN) {{
@@ -399,7 +397,7 @@ def 0 {{
 macro artists() {{
     @l_artists;
     switch ( message_SwitchMenu(0, 1) ) {{
-        {self._artist_credits(sprite_credits())}
+        {self._artist_credits(self.context.sprite_credits)}
         case menu("Goodbye!"):
         default:
             break;
@@ -570,7 +568,7 @@ macro patches() {{
         self,
         credits: Mapping[tuple[str, str], tuple[Sequence[Credit], Sequence[MonsterHistory]]],
     ):
-        if fun.is_fun_allowed():
+        if self.context.fun_allowed:
             return fun.get_artist_credits(self.rom, self.static_data)
 
         out_credits = ""
@@ -646,9 +644,9 @@ macro patches() {{
 
     def _patch_credits(self):
         credits = ""
-        for patch in Patcher(self.rom, self.static_data).list():
+        for patch in self.patcher.list():
             try:
-                if patch.is_applied(self.rom, self.static_data):
+                if self.patcher.is_applied(patch.name):
                     desc = patch.description.replace("\n", "\\n")
                     credits += f"""
         case menu("{patch.name}"):
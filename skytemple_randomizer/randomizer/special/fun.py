@@ -31,6 +31,7 @@ from skytemple_files.graphics.kao.protocol import KaoProtocol
 
 from skytemple_randomizer.data_dir import data_dir
 from skytemple_randomizer.randomizer.abstract import AbstractRandomizer
+from skytemple_randomizer.randomizer.context import current_context
 from skytemple_randomizer.randomizer.seed_info import escape
 from skytemple_randomizer.randomizer.util.util import (
     clone_missing_portraits,
@@ -161,13 +162,8 @@ FunPortraitLike = Union[CustomFunPortrait, FunPortrait]
 
 
 def is_fun_allowed():
-    if "SKYTEMPLE_FUN" in os.environ:
-        return bool(int(os.environ["SKYTEMPLE_FUN"]))
-    # It was fun (ha!) but the joke is over. Re-enable when we have a new joke. But also maybe like allow
-    # the user to still bypass fun from the UI.
-    return False
-    # now = datetime.now()
-    # return now.month == 4 and now.day == 1
+    """Whether fun is allowed in the current randomization run, see RandomizerContext."""
+    return current_context().fun_allowed
 
 
 def _get_fun_portraits() -> Sequence[FunPortraitLike]:
@@ -253,12 +249,12 @@ def get_artist_credits(rom: NintendoDSRom, static_data: Pmd2Data):
 
 class SpecialFunRandomizer(AbstractRandomizer):
     def step_count(self) -> int:
-        if is_fun_allowed():
+        if self.context.fun_allowed:
             return 1
         return 0
 
     def run(self, status: Status):
-        if not is_fun_allowed():
+        if not self.context.fun_allowed:
             return status.done()
 
         status.step(_("Finishing up..."))
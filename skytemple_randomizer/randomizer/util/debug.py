@@ -14,96 +14,376 @@
 #
 #  You should have received a copy of the GNU General Public License
 #  along with SkyTemple.  If not, see <https://www.gnu.org/licenses/>.
-import inspect
+"""
+Tracing of all calls to the randomizer's RNG, to find out why the same seed and settings lead to different ROMs.
+
+Enabled by setting the environment variable SKYTEMPLE_RANDOMIZER_DEBUG_DIR_RNG to the directory to write the traces
+to. SKYTEMPLE_RANDOMIZER_DEBUG_RNG_STAGES optionally limits the tracing to a comma separated list of stages (the class
+names of the randomizers, eg. "DungeonRandomizer,MonsterRandomizer").
+
+The calls are recorded into a preallocated buffer that is only written out at the end of each stage (or when full),
+so tracing is cheap enough to leave on. A trace file is a magic followed by blocks of (kind: u8, length: u32) and
+their payload:
+
+- BLOCK_META: JSON object with the seed and version.
+- BLOCK_STAGE: UTF-8 name of the stage the following records belong to.
+- BLOCK_SITES: JSON list of [site id, "file:line:function"] for call sites first seen since the last block.
+- BLOCK_RECORDS: RECORD structs of (site id, method id, hash of the arguments, hash of the result).
+"""
+
+from __future__ import annotations
+
+import json
 import os
+import struct
 import sys
+import zlib
 from random import Random
+from collections.abc import Iterator
+from typing import Any, BinaryIO, NamedTuple
+
+from skytemple_randomizer.config import version
+
+TRACE_MAGIC = b"STRNGTR\x01"
+TRACE_EXTENSION = ".rngtrace"
+BLOCK = struct.Struct("<BI")
+BLOCK_META = 0
+BLOCK_STAGE = 1
+BLOCK_SITES = 2
+BLOCK_RECORDS = 3
+RECORD = struct.Struct("<IBQQ")
+# Size of the record buffer. If a stage makes more calls, the buffer is written out early.
+BUFFER_RECORDS = 64 * 1024
+# The traced methods, their index is the method id in the records. Only append to this.
+METHODS = (
+    "random",
+    "uniform",
+    "triangular",
+    "randint",
+    "randrange",
+    "randbytes",
+    "choice",
+    "choices",
+    "sample",
+    "shuffle",
+    "normalvariate",
+    "gauss",
+    "lognormvariate",
+    "expovariate",
+    "vonmisesvariate",
+    "gammavariate",
+    "betavariate",
+    "paretovariate",
+    "weibullvariate",
+)
+_METHOD_IDS = {name: i for i, name in enumerate(METHODS)}
+_SHUFFLE = _METHOD_IDS["shuffle"]
 
 _DEBUG_FILE_PATH = os.environ.get("SKYTEMPLE_RANDOMIZER_DEBUG_DIR_RNG", "/tmp/rng_debug")
 _COUNTER = 0
+_MASK = (1 << 64) - 1
+_FNV_OFFSET = 0xCBF29CE484222325
+_FNV_PRIME = 0x100000001B3
+_DOUBLE = struct.Struct("<d")
+_QWORD = struct.Struct("<Q")
+
+
+def create_rng(seed: int | str) -> Random:
+    """Returns the RNG for a randomization, a TracingRandom if tracing is enabled."""
+    if "SKYTEMPLE_RANDOMIZER_DEBUG_DIR_RNG" in os.environ:
+        stages = os.environ.get("SKYTEMPLE_RANDOMIZER_DEBUG_RNG_STAGES")
+        return TracingRandom(seed, None if not stages else set(s.strip() for s in stages.split(",")))
+    return Random(seed)
 
 
-class DebugRandom(Random):
-    def __init__(self, x=None):
+class TracingRandom(Random):
+    """
+    A Random that records its calls, see the module docstring. Call begin_stage before each stage and close at
+    the end, the RandomizerThread does this.
+    """
+
+    def __init__(self, x=None, stages: set[str] | None = None):
         global _COUNTER
         super().__init__(x)
         os.makedirs(_DEBUG_FILE_PATH, exist_ok=True)
-        self.file = open(os.path.join(_DEBUG_FILE_PATH, f"{x}-{_COUNTER}.txt"), "w")
+        self.file: BinaryIO = open(
+            os.path.join(_DEBUG_FILE_PATH, f"{x}-{os.getpid()}-{_COUNTER}{TRACE_EXTENSION}"), "wb"
+        )
         _COUNTER += 1
+        self.stages = stages
+        # Whether calls are recorded: False for stages that are not traced and during the traced call, so that methods
+        # calling other methods internally (eg. randint calls randrange) are only recorded once.
+        self._active = stages is None
+        self._buffer = bytearray(RECORD.size * BUFFER_RECORDS)
+        self._offset = 0
+        # Call sites are interned by the id of their code object and the line. The code objects are kept alive, so
+        # their ids are not reused.
+        self._sites: dict[tuple[int, int], int] = {}
+        self._site_codes: list[Any] = []
+        self._new_sites: list[tuple[int, str]] = []
 
-    def _debug(self, meth_name, meth, *args, **kwargs):
-        retval = meth(*args, **kwargs)
-        stack = inspect.currentframe()
-        frame = stack.f_back.f_back  # type: ignore
-        f_code = frame.f_code  # type: ignore
-        print(
-            f"{f_code.co_filename}:{frame.f_lineno}:: {meth_name}(*{args=}, **{kwargs=}) -> {retval}",  # type: ignore
-            file=self.file,
-        )
-        return retval
+        self.file.write(TRACE_MAGIC)
+        self._write_block(BLOCK_META, json.dumps({"seed": str(x), "version": version()}).encode("utf-8"))
 
-    def weibullvariate(self, alpha, beta):
-        return self._debug("weibullvariate", super().weibullvariate, alpha, beta)
+    def begin_stage(self, name: str):
+        self.flush()
+        self._write_block(BLOCK_STAGE, name.encode("utf-8"))
+        self._active = self.stages is None or name in self.stages
 
-    def paretovariate(self, alpha):
-        return self._debug("paretovariate", super().paretovariate, alpha)
+    def flush(self):
+        if self.file.closed:
+            return
+        if len(self._new_sites) > 0:
+            self._write_block(BLOCK_SITES, json.dumps(self._new_sites).encode("utf-8"))
+            self._new_sites = []
+        if self._offset > 0:
+            self._write_block(BLOCK_RECORDS, memoryview(self._buffer)[: self._offset])
+            self._offset = 0
+        self.file.flush()
 
-    def vonmisesvariate(self, mu, kappa):
-        return self._debug("vonmisesvariate", super().vonmisesvariate, mu, kappa)
+    def close(self):
+        self.flush()
+        self.file.close()
 
-    def lognormvariate(self, mu, sigma):
-        return self._debug("lognormvariate", super().lognormvariate, mu, sigma)
+    def _write_block(self, kind: int, payload: bytes | memoryview):
+        self.file.write(BLOCK.pack(kind, len(payload)))
+        self.file.write(payload)
 
-    def normalvariate(self, mu=0.0, sigma=1.0):
-        return self._debug("normalvariate", super().normalvariate, mu, sigma)
+    def _trace(self, method: int, fn, *args, **kwargs):
+        self._active = False
+        try:
+            result = fn(self, *args, **kwargs)
+        finally:
+            self._active = True
 
-    def gauss(self, mu=0.0, sigma=1.0):
-        return self._debug("gauss", super().gauss, mu, sigma)
+        frame = sys._getframe(2)
+        code = frame.f_code
+        site_key = (id(code), frame.f_lineno)
+        site = self._sites.get(site_key)
+        if site is None:
+            site = len(self._sites)
+            self._sites[site_key] = site
+            self._site_codes.append(code)
+            self._new_sites.append((site, f"{code.co_filename}:{frame.f_lineno}:{code.co_name}"))
 
-    def gammavariate(self, alpha, beta):
-        return self._debug("gammavariate", super().gammavariate, alpha, beta)
+        args_hash = _FNV_OFFSET
+        for arg in args:
+            args_hash = ((args_hash ^ _fingerprint(arg, False)) * _FNV_PRIME) & _MASK
+        for arg in kwargs.values():
+            args_hash = ((args_hash ^ _fingerprint(arg, False)) * _FNV_PRIME) & _MASK
+        # shuffle works in-place, its result is the shuffled sequence.
+        result_hash = _fingerprint(args[0] if method == _SHUFFLE else result, True)
 
-    def expovariate(self, lambd=1.0):
-        return self._debug("expovariate", super().expovariate, lambd)
+        if self._offset >= len(self._buffer):
+            self.flush()
+        RECORD.pack_into(self._buffer, self._offset, site, method, args_hash, result_hash)
+        self._offset += RECORD.size
+        return result
 
-    def betavariate(self, alpha, beta):
-        return self._debug("betavariate", super().betavariate, alpha, beta)
+    def random(self):
+        if self._active:
+            return self._trace(0, Random.random)
+        return Random.random(self)
 
-    def triangular(self, low=0.0, high=1.0, mode=None):
-        return self._debug("triangular", super().triangular, low, high, mode)
+    def getrandbits(self, k):
+        # Not traced, but it must be overridden together with random, otherwise Random switches to a different
+        # algorithm for randrange & co. and the traced randomization would differ from the regular one.
+        return Random.getrandbits(self, k)
 
     def uniform(self, a, b):
-        return self._debug("uniform", super().uniform, a, b)
+        if self._active:
+            return self._trace(1, Random.uniform, a, b)
+        return Random.uniform(self, a, b)
+
+    def triangular(self, low=0.0, high=1.0, mode=None):
+        if self._active:
+            return self._trace(2, Random.triangular, low, high, mode)
+        return Random.triangular(self, low, high, mode)
+
+    def randint(self, a, b):
+        if self._active:
+            return self._trace(3, Random.randint, a, b)
+        return Random.randint(self, a, b)
+
+    def randrange(self, start, stop=None, step=1):
+        if self._active:
+            return self._trace(4, Random.randrange, start, stop, step)
+        return Random.randrange(self, start, stop, step)
+
+    def randbytes(self, n):
+        if self._active:
+            return self._trace(5, Random.randbytes, n)
+        return Random.randbytes(self, n)
+
+    def choice(self, seq):
+        if self._active:
+            return self._trace(6, Random.choice, seq)
+        return Random.choice(self, seq)
+
+    def choices(self, population, weights=None, *, cum_weights=None, k=1):
+        if self._active:
+            return self._trace(7, Random.choices, population, weights, cum_weights=cum_weights, k=k)
+        return Random.choices(self, population, weights, cum_weights=cum_weights, k=k)
 
     def sample(self, population, k, *, counts=None):
-        return self._debug("sample", super().sample, population, k, counts=counts)
+        if self._active:
+            return self._trace(8, Random.sample, population, k, counts=counts)
+        return Random.sample(self, population, k, counts=counts)
 
     if sys.version_info >= (3, 11):
 
         def shuffle(self, x) -> None:
-            self._debug("shuffle", super().shuffle, x)
+            if self._active:
+                self._trace(9, Random.shuffle, x)
+            else:
+                Random.shuffle(self, x)
     else:
 
         def shuffle(self, x, random=None) -> None:
-            self._debug("shuffle", super().shuffle, x, random)
+            if self._active:
+                self._trace(9, Random.shuffle, x, random)
+            else:
+                Random.shuffle(self, x, random)
 
-    def choices(self, population, weights=None, *, cum_weights=None, k=1):
-        return self._debug("choices", super().choices, population, weights, cum_weights=cum_weights, k=k)
+    def normalvariate(self, mu=0.0, sigma=1.0):
+        if self._active:
+            return self._trace(10, Random.normalvariate, mu, sigma)
+        return Random.normalvariate(self, mu, sigma)
 
-    def choice(self, seq):
-        return self._debug("choice", super().choice, seq)
+    def gauss(self, mu=0.0, sigma=1.0):
+        if self._active:
+            return self._trace(11, Random.gauss, mu, sigma)
+        return Random.gauss(self, mu, sigma)
 
-    def randbytes(self, n):
-        return self._debug("randbytes", super().randbytes, n)
+    def lognormvariate(self, mu, sigma):
+        if self._active:
+            return self._trace(12, Random.lognormvariate, mu, sigma)
+        return Random.lognormvariate(self, mu, sigma)
 
-    def randint(self, a, b):
-        return self._debug("randint", super().randint, a, b)
+    def expovariate(self, lambd=1.0):
+        if self._active:
+            return self._trace(13, Random.expovariate, lambd)
+        return Random.expovariate(self, lambd)
 
-    def randrange(self, start, stop=None, step=1):
-        return self._debug("randrange", super().randrange, start, stop, step)
+    def vonmisesvariate(self, mu, kappa):
+        if self._active:
+            return self._trace(14, Random.vonmisesvariate, mu, kappa)
+        return Random.vonmisesvariate(self, mu, kappa)
+
+    def gammavariate(self, alpha, beta):
+        if self._active:
+            return self._trace(15, Random.gammavariate, alpha, beta)
+        return Random.gammavariate(self, alpha, beta)
+
+    def betavariate(self, alpha, beta):
+        if self._active:
+            return self._trace(16, Random.betavariate, alpha, beta)
+        return Random.betavariate(self, alpha, beta)
+
+    def paretovariate(self, alpha):
+        if self._active:
+            return self._trace(17, Random.paretovariate, alpha)
+        return Random.paretovariate(self, alpha)
+
+    def weibullvariate(self, alpha, beta):
+        if self._active:
+            return self._trace(18, Random.weibullvariate, alpha, beta)
+        return Random.weibullvariate(self, alpha, beta)
 
     def __del__(self):
         try:
-            self.file.close()
+            self.close()
         except Exception:
             pass
+
+
+class RngTraceRecord(NamedTuple):
+    site: str
+    method: str
+    args_hash: int
+    result_hash: int
+
+
+class RngTraceStage(NamedTuple):
+    name: str
+    calls: int
+    # Offset and length of the BLOCK_RECORDS payloads of the stage in the file.
+    blocks: list[tuple[int, int]]
+
+
+class RngTraceIndex(NamedTuple):
+    meta: dict[str, Any]
+    sites: dict[int, str]
+    stages: list[RngTraceStage]
+
+
+def index_rng_trace(f: BinaryIO) -> RngTraceIndex:
+    """
+    Reads the metadata, call sites and stages of a trace written by TracingRandom, without reading the records.
+    Raises ValueError if the file is not a trace.
+    """
+    f.seek(0)
+    if f.read(len(TRACE_MAGIC)) != TRACE_MAGIC:
+        raise ValueError(f"{f.name} is not an RNG trace.")
+    meta: dict[str, Any] = {}
+    sites: dict[int, str] = {}
+    # Records before the first stage have the stage "".
+    stages = [RngTraceStage("", 0, [])]
+    while True:
+        header = f.read(BLOCK.size)
+        # A trace of a crashed process may end with a partial block, which is ignored.
+        if len(header) < BLOCK.size:
+            break
+        kind, length = BLOCK.unpack(header)
+        if kind == BLOCK_RECORDS:
+            offset = f.tell()
+            if f.seek(length, os.SEEK_CUR) > os.fstat(f.fileno()).st_size:
+                break
+            stage = stages[-1]
+            stage.blocks.append((offset, length))
+            stages[-1] = stage._replace(calls=stage.calls + length // RECORD.size)
+            continue
+        payload = f.read(length)
+        if len(payload) < length:
+            break
+        if kind == BLOCK_META:
+            meta = json.loads(payload)
+        elif kind == BLOCK_STAGE:
+            stages.append(RngTraceStage(payload.decode("utf-8"), 0, []))
+        elif kind == BLOCK_SITES:
+            sites.update((site, location) for site, location in json.loads(payload))
+    if stages[0].calls == 0:
+        del stages[0]
+    return RngTraceIndex(meta, sites, stages)
+
+
+def iter_rng_trace_blocks(f: BinaryIO, stage: RngTraceStage) -> Iterator[bytes]:
+    """The raw BLOCK_RECORDS payloads of the stage, one block at a time. Decode them with RECORD.iter_unpack."""
+    for offset, length in stage.blocks:
+        f.seek(offset)
+        yield f.read(length)
+
+
+def _fingerprint(value: Any, deep: bool) -> int:
+    """
+    A hash of the value that is stable between processes (unlike hash()). Sequences are only hashed element-wise
+    if deep, otherwise (eg. for choice's argument) only their length counts, to keep the tracing cheap.
+    """
+    if value is None:
+        return 0
+    if isinstance(value, int):
+        return value & _MASK
+    if isinstance(value, float):
+        return _QWORD.unpack(_DOUBLE.pack(value))[0]
+    if isinstance(value, str):
+        return zlib.crc32(value.encode("utf-8", "surrogatepass"))
+    if isinstance(value, (bytes, bytearray)):
+        return zlib.crc32(value)
+    if isinstance(value, (list, tuple, range)):
+        h = (_FNV_OFFSET ^ len(value)) * _FNV_PRIME & _MASK
+        if deep:
+            for element in value:
+                h = ((h ^ _fingerprint(element, False)) * _FNV_PRIME) & _MASK
+        return h
+    # Other objects (eg. entries of ROM tables) only by their type, their repr may contain memory addresses.
+    return zlib.crc32(type(value).__qualname__.encode("utf-8"))
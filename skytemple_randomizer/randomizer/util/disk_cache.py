@@ -0,0 +1,169 @@
+#  Copyright 2020-2025 SkyTemple Contributors
+#
+#  This file is part of SkyTemple.
+#
+#  SkyTemple is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  SkyTemple is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with SkyTemple.  If not, see <https://www.gnu.org/licenses/>.
+from __future__ import annotations
+
+import hashlib
+import importlib.metadata as importlib_metadata
+import os
+import platform
+import tempfile
+from collections.abc import Callable
+
+# Set to an empty string to disable the on-disk cache.
+CACHE_DIR_ENV = "SKYTEMPLE_RANDOMIZER_CACHE_DIR"
+
+
+def get_cache_dir() -> str | None:
+    """
+    Returns the directory the randomizer caches derived data in, or None if the on-disk cache is disabled.
+    Everything in there can safely be deleted at any time.
+    """
+    if CACHE_DIR_ENV in os.environ:
+        return os.environ[CACHE_DIR_ENV] or None
+    system = platform.system()
+    if system == "Windows":
+        base = os.environ.get("LOCALAPPDATA", os.path.expanduser("~"))
+    elif system == "Darwin":
+        base = os.path.join(os.path.expanduser("~"), "Library", "Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache"))
+    return os.path.join(base, "skytemple-randomizer")
+
+
+def package_version(distribution: str) -> str:
+    """Version of an installed package, to include in cache keys of data derived by that package."""
+    try:
+        return importlib_metadata.version(distribution)
+    except importlib_metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def cache_key(*parts: str | bytes) -> str:
+    """Builds a cache key out of the given parts. The parts are length-prefixed, so they can't run into each other."""
+    h = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode("utf-8")
+        h.update(len(part).to_bytes(8, "little"))
+        h.update(part)
+    return h.hexdigest()
+
+
+def _cache_path(namespace: str, key: str) -> str | None:
+    cache_dir = get_cache_dir()
+    if cache_dir is None:
+        return None
+    return os.path.join(cache_dir, namespace, key)
+
+
+def cache_read(namespace: str, key: str) -> bytes | None:
+    """Returns the cached data for the key, or None if there is none (or the cache is unreadable)."""
+    path = _cache_path(namespace, key)
+    if path is None:
+        return None
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    _touch(path)
+    return data
+
+
+def cache_file(namespace: str, key: str) -> str | None:
+    """Returns the path of the cache entry for the key, or None if there is none."""
+    path = _cache_path(namespace, key)
+    if path is None or not os.path.isfile(path):
+        return None
+    _touch(path)
+    return path
+
+
+def cache_write(namespace: str, key: str, data: bytes, max_size: int | None = None):
+    """
+    Stores the data for the key. The file is replaced atomically, so concurrent runs never see partial entries.
+    If max_size is set, the least recently used entries of the namespace are removed afterwards until it is at most
+    max_size bytes large (the new entry is always kept).
+    Errors are ignored, the cache is only an optimization.
+    """
+
+    def write(path: str):
+        with open(path, "wb") as f:
+            f.write(data)
+
+    cache_write_with(namespace, key, write, max_size)
+
+
+def cache_write_with(namespace: str, key: str, write: Callable[[str], None], max_size: int | None = None):
+    """
+    Like cache_write, but the entry is written by calling write with the path of a temporary file in the cache
+    directory, so large entries don't have to be built in memory first. write may replace that file.
+    """
+    path = _cache_path(namespace, key)
+    if path is None:
+        return
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        os.close(fd)
+        try:
+            write(tmp_path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+    except OSError:
+        return
+    if max_size is not None:
+        _prune(os.path.dirname(path), max_size, path)
+
+
+def _touch(path: str):
+    # The modification time of the entries is their last use, see _prune.
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def _prune(directory: str, max_size: int, keep: str):
+    entries = []
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                # Skip the new entry and the temporary files of entries that are still being written.
+                if entry.name.startswith(".") or entry.path == keep:
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        size = os.path.getsize(keep)
+    except OSError:
+        return
+    for __, entry_size, entry_path in sorted(entries, reverse=True):
+        size += entry_size
+        if size > max_size:
+            # Entries still in use may not be removable (eg. mapped files on Windows), they are removed later.
+            try:
+                os.remove(entry_path)
+            except OSError:
+                pass
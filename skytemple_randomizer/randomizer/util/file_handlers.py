@@ -0,0 +1,242 @@
+#  Copyright 2020-2025 SkyTemple Contributors
+#
+#  This file is part of SkyTemple.
+#
+#  SkyTemple is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  SkyTemple is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with SkyTemple.  If not, see <https://www.gnu.org/licenses/>.
+"""Per file type selection of the native or Python file handler implementations of skytemple_files."""
+
+from __future__ import annotations
+
+import json
+import logging
+import platform
+import time
+from collections.abc import Callable
+from typing import Any
+
+from ndspy.rom import NintendoDSRom
+from skytemple_files.common.impl_cfg import (
+    change_implementation_type,
+    get_implementation_type,
+    ImplementationType,
+)
+from skytemple_files.common.ppmdu_config.data import Pmd2Data
+from skytemple_files.common.types.file_types import FileType
+
+from skytemple_randomizer.randomizer.util.disk_cache import cache_key, cache_read, cache_write, package_version
+
+CALIBRATION_VERSION = 2
+# How often each benchmark is repeated, the fastest repetition counts.
+CALIBRATION_REPEATS = 3
+# The number of PKDPX containers from MONSTER/monster.bin to benchmark with.
+PKDPX_SAMPLES = 16
+# The class methods of the calibrated file handlers that return the classes (or state) of the selected
+# implementation. They are overridden to return those of the chosen implementation, see apply_file_handler_choices.
+# The models of a file type and its parts have to come from the same implementation.
+HANDLER_CLASS_METHODS: dict[str, tuple[str, ...]] = {
+    "MD": ("get_model_cls", "get_writer_cls", "get_entry_model_cls", "properties"),
+    "KAO": ("get_model_cls", "get_writer_cls", "get_image_model_cls", "properties"),
+    "MAPPA_BIN": (
+        "get_model_cls",
+        "get_floor_model",
+        "get_floor_layout_model",
+        "get_monster_model",
+        "get_item_list_model",
+        "get_trap_list_model",
+        "get_terrain_settings_model",
+    ),
+    "PKDPX": ("get_model_cls", "get_writer_cls"),
+}
+# The methods of the handlers that load each implementation for the class methods above that have them.
+HANDLER_LOADERS = {
+    "get_model_cls": "load_{}_model",
+    "get_writer_cls": "load_{}_writer",
+}
+logger = logging.getLogger(__name__)
+
+
+def _benchmark_md(rom: NintendoDSRom, static_data: Pmd2Data) -> Callable[[], Any]:
+    data = rom.getFileByName("BALANCE/monster.md")
+    return lambda: FileType.MD.serialize(FileType.MD.deserialize(data))
+
+
+def _benchmark_kao(rom: NintendoDSRom, static_data: Pmd2Data) -> Callable[[], Any]:
+    data = rom.getFileByName("FONT/kaomado.kao")
+    return lambda: FileType.KAO.serialize(FileType.KAO.deserialize(data))
+
+
+def _benchmark_mappa_bin(rom: NintendoDSRom, static_data: Pmd2Data) -> Callable[[], Any]:
+    data = rom.getFileByName("BALANCE/mappa_s.bin")
+    return lambda: FileType.MAPPA_BIN.serialize(FileType.MAPPA_BIN.deserialize(data))
+
+
+def _benchmark_pkdpx(rom: NintendoDSRom, static_data: Pmd2Data) -> Callable[[], Any]:
+    bin_pack = FileType.BIN_PACK.deserialize(rom.getFileByName("MONSTER/monster.bin"))
+    datas = [bytes(bin_pack[i]) for i in range(len(bin_pack)) if len(bin_pack[i]) > 0][:PKDPX_SAMPLES]
+
+    def benchmark():
+        for data in datas:
+            decompressed = FileType.PKDPX.deserialize(data).decompress()
+            FileType.PKDPX.serialize(FileType.PKDPX.compress(decompressed))
+
+    return benchmark
+
+
+# The file types that are calibrated (names of FileType attributes) and how to benchmark them. Only file types
+# that have a native implementation, see HANDLER_CLASS_METHODS.
+CALIBRATED_FILE_TYPES: dict[str, Callable[[NintendoDSRom, Pmd2Data], Callable[[], Any]]] = {
+    "MD": _benchmark_md,
+    "KAO": _benchmark_kao,
+    "MAPPA_BIN": _benchmark_mappa_bin,
+    "PKDPX": _benchmark_pkdpx,
+}
+
+
+class FileHandlerCalibration:
+    """
+    The fastest file handler implementation for each calibrated file type, as measured by calibrate_file_handlers.
+    timings contains the measured time in seconds for each file type and implementation, None if the implementation
+    is not available.
+    """
+
+    def __init__(
+        self,
+        choices: dict[str, ImplementationType],
+        timings: dict[str, dict[str, float | None]],
+    ):
+        self.choices = choices
+        self.timings = timings
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> FileHandlerCalibration:
+        return cls(
+            {name: ImplementationType[impl] for name, impl in data["choices"].items()},
+            data["timings"],
+        )
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "choices": {name: impl.name for name, impl in self.choices.items()},
+            "timings": self.timings,
+        }
+
+
+def _calibration_key() -> str:
+    # The results depend on the machine and the versions of the file handlers, not on the ROM.
+    return cache_key(
+        str(CALIBRATION_VERSION),
+        package_version("skytemple-files"),
+        package_version("skytemple-rust"),
+        platform.python_implementation(),
+        platform.python_version(),
+        platform.machine(),
+    )
+
+
+def calibrate_file_handlers(rom: NintendoDSRom, static_data: Pmd2Data) -> FileHandlerCalibration:
+    """
+    Benchmarks the native and Python implementation of each file type in CALIBRATED_FILE_TYPES with the files of the
+    ROM, saves the fastest choices so future runs use them, and returns them.
+    Switches the process-wide implementation type while it runs, so it must not run during a randomization.
+    """
+    previous = get_implementation_type()
+    choices: dict[str, ImplementationType] = {}
+    timings: dict[str, dict[str, float | None]] = {}
+    try:
+        for name, benchmark_factory in CALIBRATED_FILE_TYPES.items():
+            timings[name] = {}
+            for impl in (ImplementationType.PYTHON, ImplementationType.NATIVE):
+                change_implementation_type(impl)
+                try:
+                    benchmark = benchmark_factory(rom, static_data)
+                    # Warm up, this also loads the implementation.
+                    benchmark()
+                    best = None
+                    for __ in range(CALIBRATION_REPEATS):
+                        start = time.perf_counter()
+                        benchmark()
+                        elapsed = time.perf_counter() - start
+                        best = elapsed if best is None else min(best, elapsed)
+                except Exception as error:
+                    logger.warning("%s file handler for %s is not available.", impl.name, name, exc_info=error)
+                    best = None
+                timings[name][impl.name] = best
+            available = [(t, ImplementationType[impl]) for impl, t in timings[name].items() if t is not None]
+            if len(available) > 0:
+                choices[name] = min(available, key=lambda x: x[0])[1]
+    finally:
+        change_implementation_type(previous)
+
+    calibration = FileHandlerCalibration(choices, timings)
+    cache_write("file_handlers", _calibration_key(), json.dumps(calibration.to_json()).encode("utf-8"))
+    return calibration
+
+
+def load_file_handler_calibration() -> FileHandlerCalibration | None:
+    """The saved calibration of this machine, None if calibrate_file_handlers wasn't run yet."""
+    data = cache_read("file_handlers", _calibration_key())
+    if data is None:
+        return None
+    try:
+        return FileHandlerCalibration.from_json(json.loads(data))
+    except (ValueError, KeyError):
+        return None
+
+
+def apply_file_handler_choices(choices: dict[str, ImplementationType]) -> Callable[[], None]:
+    """
+    Makes the handlers of the given file types use the chosen implementation, regardless of the process-wide
+    implementation type. If a native implementation is not available, the Python implementation is used.
+    Returns a function that undoes this.
+    """
+    current = get_implementation_type()
+    selected: dict[Any, dict[str, Any]] = {}
+    try:
+        for name, impl in choices.items():
+            handler = getattr(FileType, name)
+            try:
+                selected[handler] = _handler_classes(name, handler, impl)
+            except ImportError:
+                logger.warning("Native file handler for %s is not available, using the Python implementation.", name)
+                selected[handler] = _handler_classes(name, handler, ImplementationType.PYTHON)
+    finally:
+        change_implementation_type(current)
+
+    originals: list[tuple[Any, str, Any]] = []
+    for handler, classes in selected.items():
+        for method, value in classes.items():
+            originals.append((handler, method, handler.__dict__.get(method)))
+            setattr(handler, method, classmethod(lambda __, value=value: value))
+
+    def restore():
+        for handler, method, original in reversed(originals):
+            if original is None:
+                delattr(handler, method)
+            else:
+                setattr(handler, method, original)
+
+    return restore
+
+
+def _handler_classes(name: str, handler: Any, impl: ImplementationType) -> dict[str, Any]:
+    change_implementation_type(impl)
+    classes = {}
+    for method in HANDLER_CLASS_METHODS[name]:
+        if not hasattr(handler, method):
+            raise AttributeError(f"The file handler of {name} has no method {method}.")
+        if method in HANDLER_LOADERS:
+            classes[method] = getattr(handler, HANDLER_LOADERS[method].format(impl.name.lower()))()
+        else:
+            classes[method] = getattr(handler, method)()
+    return classes
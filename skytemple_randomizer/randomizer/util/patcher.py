@@ -0,0 +1,70 @@
+#  Copyright 2020-2025 SkyTemple Contributors
+#
+#  This file is part of SkyTemple.
+#
+#  SkyTemple is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  SkyTemple is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with SkyTemple.  If not, see <https://www.gnu.org/licenses/>.
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+from ndspy.rom import NintendoDSRom
+from skytemple_files.common.ppmdu_config.data import Pmd2Data
+from skytemple_files.patch.patches import Patcher
+
+
+class RunPatcher:
+    """
+    Patcher shared by all randomizers of a run. The patch catalogue is only loaded once and the applied state
+    of each patch is only inspected once, after that it's tracked here.
+    If the ROM is changed behind the back of this patcher, call invalidate.
+    """
+
+    def __init__(self, rom: NintendoDSRom, static_data: Pmd2Data):
+        self.rom = rom
+        self.static_data = static_data
+        self._patcher: Patcher | None = None
+        self._applied: dict[str, bool] = {}
+        # The patches applied during this run, in order.
+        self.applied_by_run: list[str] = []
+
+    @property
+    def patcher(self) -> Patcher:
+        if self._patcher is None:
+            self._patcher = Patcher(self.rom, self.static_data)
+        return self._patcher
+
+    def is_applied(self, name: str) -> bool:
+        """Raises NotImplementedError if the patch doesn't support the ROM, just like Patcher.is_applied."""
+        if name not in self._applied:
+            self._applied[name] = self.patcher.is_applied(name)
+        return self._applied[name]
+
+    def apply(self, name: str):
+        self.patcher.apply(name)
+        self._applied[name] = True
+        self.applied_by_run.append(name)
+
+    def require(self, *names: str):
+        """Applies all of the given patches that are not applied yet, in order."""
+        for name in names:
+            if not self.is_applied(name):
+                self.apply(name)
+
+    def list(self) -> Iterable:
+        return self.patcher.list()
+
+    def invalidate(self):
+        """Forgets everything known about the ROM, e.g. after it was replaced."""
+        self._patcher = None
+        self._applied = {}
@@ -0,0 +1,304 @@
+#  Copyright 2020-2025 SkyTemple Contributors
+#
+#  This file is part of SkyTemple.
+#
+#  SkyTemple is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  SkyTemple is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with SkyTemple.  If not, see <https://www.gnu.org/licenses/>.
+"""
+Compares two RNG traces written by TracingRandom (see debug.py), to find out where the randomization of two runs with
+the same seed starts to differ. The traces are streamed, only one block of records of each is in memory at a time.
+"""
+
+from __future__ import annotations
+
+import re
+from collections import Counter, deque
+from collections.abc import Iterator
+from difflib import SequenceMatcher
+from typing import Any
+
+from skytemple_randomizer.randomizer.util.debug import (
+    METHODS,
+    RECORD,
+    RngTraceIndex,
+    RngTraceRecord,
+    RngTraceStage,
+    index_rng_trace,
+    iter_rng_trace_blocks,
+)
+
+# Number of calls shown before and after the first divergence.
+CONTEXT_CALLS = 5
+_SITE_PATH_PREFIX = re.compile(r"^.*[/\\](?=skytemple_randomizer[/\\])")
+
+
+class RngDivergence:
+    """
+    The first call that differs between the traces. before are the last calls that were the same in both, a and b the
+    calls in each trace starting at the divergence (empty if the stage ended there).
+    """
+
+    def __init__(
+        self,
+        stage: str,
+        call: int,
+        before: list[RngTraceRecord],
+        a: list[RngTraceRecord],
+        b: list[RngTraceRecord],
+    ):
+        self.stage = stage
+        self.call = call
+        self.before = before
+        self.a = a
+        self.b = b
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "stage": self.stage,
+            "call": self.call,
+            "before": [_record_to_json(r) for r in self.before],
+            "a": [_record_to_json(r) for r in self.a],
+            "b": [_record_to_json(r) for r in self.b],
+        }
+
+
+class RngStageDiff:
+    """
+    Comparison of a stage in both traces. first_difference is the index of the first call that differs, None if the
+    stage is the same. extra and missing count the calls per (call site, method) that trace b has more or fewer of.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        calls_a: int,
+        calls_b: int,
+        first_difference: int | None,
+        extra: Counter[tuple[str, str]],
+        missing: Counter[tuple[str, str]],
+    ):
+        self.name = name
+        self.calls_a = calls_a
+        self.calls_b = calls_b
+        self.first_difference = first_difference
+        self.extra = extra
+        self.missing = missing
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "stage": self.name,
+            "calls_a": self.calls_a,
+            "calls_b": self.calls_b,
+            "first_difference": self.first_difference,
+            "extra": _counter_to_json(self.extra),
+            "missing": _counter_to_json(self.missing),
+        }
+
+
+class RngDiff:
+    def __init__(
+        self,
+        meta_a: dict[str, Any],
+        meta_b: dict[str, Any],
+        divergence: RngDivergence | None,
+        stages: list[RngStageDiff],
+    ):
+        self.meta_a = meta_a
+        self.meta_b = meta_b
+        self.divergence = divergence
+        self.stages = stages
+
+    @property
+    def identical(self) -> bool:
+        return self.divergence is None
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "identical": self.identical,
+            "a": self.meta_a,
+            "b": self.meta_b,
+            "divergence": None if self.divergence is None else self.divergence.to_json(),
+            "stages": [stage.to_json() for stage in self.stages],
+        }
+
+
+def diff_rng_traces(path_a: str, path_b: str, ignore_lines: bool = False) -> RngDiff:
+    """
+    Compares the traces stage by stage. Stages are matched by name, so stages only one of the versions has are
+    reported as a whole. Call sites are compared relative to the package directory, and, if ignore_lines, without
+    their line number, so traces of different versions can be compared.
+    """
+    with open(path_a, "rb") as fa, open(path_b, "rb") as fb:
+        index_a = index_rng_trace(fa)
+        index_b = index_rng_trace(fb)
+        sites_a = {site: normalize_site(location, ignore_lines) for site, location in index_a.sites.items()}
+        sites_b = {site: normalize_site(location, ignore_lines) for site, location in index_b.sites.items()}
+        # If the site ids mean the same in both, equal blocks of records can be skipped without decoding them.
+        sites_compatible = all(sites_b[site] == location for site, location in sites_a.items() if site in sites_b)
+
+        divergence: RngDivergence | None = None
+        stages: list[RngStageDiff] = []
+        for stage_a, stage_b in _match_stages(index_a, index_b):
+            stage = stage_a if stage_a is not None else stage_b
+            assert stage is not None
+            stage_diff, stage_divergence = _diff_stage(
+                iter_rng_trace_blocks(fa, stage_a) if stage_a is not None else iter(()),
+                iter_rng_trace_blocks(fb, stage_b) if stage_b is not None else iter(()),
+                sites_a,
+                sites_b,
+                sites_compatible,
+                stage.name,
+                divergence is None,
+            )
+            stages.append(stage_diff)
+            if divergence is None:
+                divergence = stage_divergence
+
+    return RngDiff(index_a.meta, index_b.meta, divergence, stages)
+
+
+def normalize_site(location: str, ignore_lines: bool) -> str:
+    """Makes a call site "file:line:function" independent of the installation directory and optionally the line."""
+    location = _SITE_PATH_PREFIX.sub("", location).replace("\\", "/")
+    if ignore_lines:
+        path, __, function = location.rpartition(":")
+        return f"{path.rpartition(':')[0]}:{function}"
+    return location
+
+
+def _match_stages(
+    index_a: RngTraceIndex, index_b: RngTraceIndex
+) -> Iterator[tuple[RngTraceStage | None, RngTraceStage | None]]:
+    names_a = [stage.name for stage in index_a.stages]
+    names_b = [stage.name for stage in index_b.stages]
+    matcher = SequenceMatcher(None, names_a, names_b, autojunk=False)
+    for tag, a_start, a_end, b_start, b_end in matcher.get_opcodes():
+        if tag == "equal":
+            yield from zip(index_a.stages[a_start:a_end], index_b.stages[b_start:b_end])
+        else:
+            for stage in index_a.stages[a_start:a_end]:
+                yield stage, None
+            for stage in index_b.stages[b_start:b_end]:
+                yield None, stage
+
+
+def _diff_stage(
+    blocks_a: Iterator[bytes],
+    blocks_b: Iterator[bytes],
+    sites_a: dict[int, str],
+    sites_b: dict[int, str],
+    sites_compatible: bool,
+    name: str,
+    with_context: bool,
+) -> tuple[RngStageDiff, RngDivergence | None]:
+    calls_a = calls_b = 0
+    counts_a: Counter[tuple[str, str]] = Counter()
+    counts_b: Counter[tuple[str, str]] = Counter()
+    first_difference: int | None = None
+    before: deque[RngTraceRecord] = deque(maxlen=CONTEXT_CALLS)
+    after_a: list[RngTraceRecord] = []
+    after_b: list[RngTraceRecord] = []
+
+    for window_a, window_b in _windows(blocks_a, blocks_b):
+        collecting = (
+            with_context
+            and first_difference is not None
+            and (len(after_a) < CONTEXT_CALLS or len(after_b) < CONTEXT_CALLS)
+        )
+        if sites_compatible and not collecting and len(window_a) == len(window_b) and window_a == window_b:
+            # Equal calls cancel out in the counts, only the context is needed.
+            calls = len(window_a) // RECORD.size
+            calls_a += calls
+            calls_b += calls
+            if first_difference is None and with_context:
+                before.extend(_decode(window_a[-CONTEXT_CALLS * RECORD.size :], sites_a))
+            continue
+        records_a = _decode(window_a, sites_a)
+        records_b = _decode(window_b, sites_b)
+        offset = 0
+        if first_difference is None:
+            for record_a, record_b in zip(records_a, records_b):
+                if record_a != record_b:
+                    break
+                offset += 1
+            if offset < len(records_a) or offset < len(records_b):
+                first_difference = calls_a + offset
+            if with_context:
+                before.extend(records_a[max(0, offset - CONTEXT_CALLS) : offset])
+        if first_difference is not None and with_context:
+            after_a.extend(records_a[offset : offset + CONTEXT_CALLS - len(after_a)])
+            after_b.extend(records_b[offset : offset + CONTEXT_CALLS - len(after_b)])
+        counts_a.update((r.site, r.method) for r in records_a)
+        counts_b.update((r.site, r.method) for r in records_b)
+        calls_a += len(records_a)
+        calls_b += len(records_b)
+
+    divergence = None
+    if first_difference is not None and with_context:
+        divergence = RngDivergence(name, first_difference, list(before), after_a, after_b)
+    return (
+        RngStageDiff(name, calls_a, calls_b, first_difference, counts_b - counts_a, counts_a - counts_b),
+        divergence,
+    )
+
+
+def _windows(blocks_a: Iterator[bytes], blocks_b: Iterator[bytes]) -> Iterator[tuple[memoryview, memoryview]]:
+    """
+    Pairs of equally long parts of both record streams, independent of how they were split into blocks. When one
+    stream ends, the rest of the other is paired with empty parts.
+    """
+    empty = memoryview(b"")
+    buffer_a = buffer_b = empty
+    while True:
+        if len(buffer_a) == 0:
+            buffer_a = memoryview(next(blocks_a, b""))
+        if len(buffer_b) == 0:
+            buffer_b = memoryview(next(blocks_b, b""))
+        if len(buffer_a) == 0 or len(buffer_b) == 0:
+            break
+        size = min(len(buffer_a), len(buffer_b))
+        yield buffer_a[:size], buffer_b[:size]
+        buffer_a, buffer_b = buffer_a[size:], buffer_b[size:]
+    if len(buffer_a) > 0:
+        yield buffer_a, empty
+    for block in blocks_a:
+        yield memoryview(block), empty
+    if len(buffer_b) > 0:
+        yield empty, buffer_b
+    for block in blocks_b:
+        yield empty, memoryview(block)
+
+
+def _decode(data: memoryview, sites: dict[int, str]) -> list[RngTraceRecord]:
+    return [
+        RngTraceRecord(
+            sites.get(site, f"<unknown site {site}>"),
+            METHODS[method] if method < len(METHODS) else f"<unknown method {method}>",
+            args_hash,
+            result_hash,
+        )
+        for site, method, args_hash, result_hash in RECORD.iter_unpack(data)
+    ]
+
+
+def _record_to_json(record: RngTraceRecord) -> dict[str, Any]:
+    return {
+        "site": record.site,
+        "method": record.method,
+        "args_hash": f"{record.args_hash:016x}",
+        "result_hash": f"{record.result_hash:016x}",
+    }
+
+
+def _counter_to_json(counter: Counter[tuple[str, str]]) -> list[dict[str, Any]]:
+    return [{"site": site, "method": method, "count": count} for (site, method), count in counter.most_common()]
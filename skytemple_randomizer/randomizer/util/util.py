@@ -16,8 +16,10 @@
 #  along with SkyTemple.  If not, see <https://www.gnu.org/licenses/>.
 from __future__ import annotations
 
-from collections.abc import Iterable
+import json
+from collections.abc import Iterable, Iterator, Sequence
 from enum import Enum, auto
+from typing import Any
 from random import Random
 
 from ndspy.rom import NintendoDSRom
@@ -31,6 +33,8 @@ from skytemple_files.graphics.kao import SUBENTRIES
 from skytemple_files.script.ssb.model import Ssb
 
 from skytemple_randomizer.config import RandomizerConfig
+from skytemple_randomizer.randomizer.context import current_context
+from skytemple_randomizer.randomizer.util.disk_cache import cache_key, cache_read, cache_write, package_version
 
 DAMAGING_MOVES = {
     1,
@@ -470,6 +474,8 @@ STAB_DICT = {
     PokeType.POISON: {147, 198, 200, 279, 280, 283, 332, 459, 485, 495},
 }
 
+SHAYMIN_IDS = (534, 535)
+
 # These files only exist in the JP ROM and are broken:
 SKIP_JP_INVALID_SSB = [
     "SCRIPT/D42P21A/enter23.ssb",
@@ -485,12 +491,9 @@ SKIP_JP_INVALID_SSB = [
     "SCRIPT/D73P11A/us2305.ssb",
 ]
 
-_str_file_cache: dict[Pmd2Language, Str] = {}
-
 
 def clear_strings_cache():
-    global _str_file_cache
-    _str_file_cache = {}
+    current_context().str_files.clear()
 
 
 def get_main_string_file(rom: NintendoDSRom, static_data: Pmd2Data) -> tuple[Pmd2Language, Str]:
@@ -511,12 +514,13 @@ def get_all_string_files(rom: NintendoDSRom, static_data: Pmd2Data) -> Iterable[
 
 
 def get_lang_string_file(rom: NintendoDSRom, static_data: Pmd2Data, lang: Pmd2Language) -> Str:
-    if _str_file_cache.get(lang) is None:
-        _str_file_cache[lang] = FileType.STR.deserialize(
+    str_files = current_context().str_files
+    if str_files.get(lang) is None:
+        str_files[lang] = FileType.STR.deserialize(
             rom.getFileByName(f"MESSAGE/{lang.filename}"),
             string_encoding=static_data.string_encoding,
         )
-    return _str_file_cache[lang]
+    return str_files[lang]
 
 
 def clone_missing_portraits(kao, index: int, *, force=False):
@@ -543,42 +547,103 @@ class MoveRoster(Enum):
     STAB = auto()
 
 
-def get_allowed_md_ids(rng: Random, conf: RandomizerConfig, with_plus_600=False, *, roster=Roster.DUNGEON) -> list[u16]:
-    from skytemple_randomizer.randomizer.special import fun
+class Pools:
+    """
+    The monster, move and item rosters for one randomization run, compiled from the config once.
+    Every roster is an immutable tuple in the same order the old ad-hoc ``list(set(...))`` construction produced,
+    so sampling from it with ``rng.choice`` consumes the RNG exactly the same way and seeds stay valid.
+    """
 
+    def __init__(self, conf: RandomizerConfig):
+        self.conf = conf
+        monsters = conf["pokemon"]["monsters_enabled"]
+        starters = conf["pokemon"]["starters_enabled"]
+        self._md_ids = tuple(_md_id_set(monsters, False))
+        self._md_ids_600 = tuple(_md_id_set(monsters, True))
+        self._md_ids_no_shaymin = tuple(x for x in self._md_ids if x not in SHAYMIN_IDS)
+        self._md_ids_600_no_shaymin = tuple(x for x in self._md_ids_600 if x not in SHAYMIN_IDS)
+        self._md_starter_ids = tuple(_md_id_set(starters, False))
+        self._md_starter_ids_600 = tuple(_md_id_set(starters, True))
+
+        moves: set[u16] = set(conf["pokemon"]["moves_enabled"])
+        self.move_ids: tuple[u16, ...] = tuple(moves)
+        self.damaging_move_ids: tuple[u16, ...] = tuple(moves.intersection(DAMAGING_MOVES))
+        self._stab_move_ids: dict[PokeType, tuple[u16, ...]] = {}
+        for poke_type, stab_moves in STAB_DICT.items():
+            stab = tuple(moves.intersection(stab_moves))
+            self._stab_move_ids[poke_type] = stab if len(stab) > 0 else self.damaging_move_ids
+
+        self.item_ids: tuple[int, ...] = tuple(conf["dungeons"]["items_enabled"])
+        self.item_id_set: frozenset[int] = frozenset(self.item_ids)
+
+    def md_ids(self, rng: Random, with_plus_600=False, *, roster=Roster.DUNGEON, allow_shaymin=True) -> Sequence[u16]:
+        from skytemple_randomizer.randomizer.special import fun
+
+        if fun.is_fun_allowed():
+            # Fun mode draws from the RNG to build the roster, so it can not be precompiled.
+            ents = fun.get_allowed_md_ids(
+                rng, _md_id_set(self.conf["pokemon"]["monsters_enabled"], with_plus_600), roster
+            )
+            if not allow_shaymin:
+                ents = [x for x in ents if x not in SHAYMIN_IDS]
+            return ents
+        if with_plus_600:
+            return self._md_ids_600 if allow_shaymin else self._md_ids_600_no_shaymin
+        return self._md_ids if allow_shaymin else self._md_ids_no_shaymin
+
+    def md_starter_ids(self, rng: Random, with_plus_600=False, *, roster=Roster.STARTERS) -> Sequence[u16]:
+        from skytemple_randomizer.randomizer.special import fun
+
+        if fun.is_fun_allowed():
+            return fun.get_allowed_md_ids(
+                rng, _md_id_set(self.conf["pokemon"]["starters_enabled"], with_plus_600), roster
+            )
+        return self._md_starter_ids_600 if with_plus_600 else self._md_starter_ids
+
+    def stab_move_ids(self, stab_type: PokeType | None) -> tuple[u16, ...]:
+        if stab_type not in self._stab_move_ids:
+            return self.damaging_move_ids
+        return self._stab_move_ids[stab_type]  # type: ignore
+
+
+def _md_id_set(md_ids: Iterable[u16], with_plus_600: bool) -> set[u16]:
     num_entities = FileType.MD.properties().num_entities
-    ents = set(conf["pokemon"]["monsters_enabled"])
+    ents = set(md_ids)
     if with_plus_600:
         to_add = set()
         for ent in ents:
             if ent + num_entities <= 1154:
                 to_add.add(u16(ent + num_entities))
         ents.update(to_add)
-    if fun.is_fun_allowed():
-        return fun.get_allowed_md_ids(rng, ents, roster)
-    return list(ents)
+    return ents
+
+
+def clear_pools_cache():
+    current_context().pools = None
+
+
+def get_pools(conf: RandomizerConfig) -> Pools:
+    """Returns the compiled pools for conf. They are built on first use and kept until clear_pools_cache."""
+    context = current_context()
+    if context.pools is None or context.pools.conf is not conf:
+        context.pools = Pools(conf)
+    return context.pools
+
+
+def get_allowed_md_ids(
+    rng: Random, conf: RandomizerConfig, with_plus_600=False, *, roster=Roster.DUNGEON
+) -> Sequence[u16]:
+    return get_pools(conf).md_ids(rng, with_plus_600, roster=roster)
 
 
 def get_allowed_md_starter_ids(
     rng: Random, conf: RandomizerConfig, with_plus_600=False, *, roster=Roster.STARTERS
-) -> list[u16]:
-    from skytemple_randomizer.randomizer.special import fun
-
-    num_entities = FileType.MD.properties().num_entities
-    ents = set(conf["pokemon"]["starters_enabled"])
-    if with_plus_600:
-        to_add = set()
-        for ent in ents:
-            if ent + num_entities <= 1154:
-                to_add.add(u16(ent + num_entities))
-        ents.update(to_add)
-    if fun.is_fun_allowed():
-        return fun.get_allowed_md_ids(rng, ents, roster)
-    return list(ents)
+) -> Sequence[u16]:
+    return get_pools(conf).md_starter_ids(rng, with_plus_600, roster=roster)
 
 
-def get_allowed_item_ids(conf: RandomizerConfig) -> list[int]:
-    return conf["dungeons"]["items_enabled"]
+def get_allowed_item_ids(conf: RandomizerConfig) -> Sequence[int]:
+    return get_pools(conf).item_ids
 
 
 def assert_not_empty(lst):
@@ -589,19 +654,14 @@ def assert_not_empty(lst):
 
 def get_allowed_move_ids(
     conf: RandomizerConfig, roster=MoveRoster.DEFAULT, stab_type: PokeType | None = None
-) -> list[u16]:
-    base: set[u16] = set(conf["pokemon"]["moves_enabled"])
+) -> Sequence[u16]:
+    pools = get_pools(conf)
     if roster == MoveRoster.DEFAULT:
-        return list(base)
+        return pools.move_ids
     elif roster == MoveRoster.DAMAGING:
-        return list(base.intersection(DAMAGING_MOVES))
+        return pools.damaging_move_ids
     # elif roster == MoveRoster.STAB:
-    if stab_type not in STAB_DICT:
-        return list(base.intersection(DAMAGING_MOVES))
-    lst = list(base.intersection(STAB_DICT[stab_type]))
-    if len(lst) < 1:
-        return list(base.intersection(DAMAGING_MOVES))
-    return lst
+    return pools.stab_move_ids(stab_type)
 
 
 def get_pokemon_name(rom: NintendoDSRom, static_data: Pmd2Data, md_id: int, lang: Pmd2Language):
@@ -649,31 +709,200 @@ def replace_text_script(
                 ]
 
 
-_ssb_file_cache: dict[str, Ssb] = {}
-
-
 def clear_script_cache():
-    global _ssb_file_cache
-    _ssb_file_cache = {}
+    context = current_context()
+    context.ssb_files.clear()
+    context.script_op_index = None
 
 
 def clear_script_cache_for(file_path):
-    global _ssb_file_cache
-    del _ssb_file_cache[file_path]
+    context = current_context()
+    del context.ssb_files[file_path]
+    if context.script_op_index is not None:
+        context.script_op_index.invalidate(file_path)
 
 
 def get_script(file_path, rom, static_data):
-    global _ssb_file_cache
-    if file_path not in _ssb_file_cache:
-        _ssb_file_cache[file_path] = FileType.SSB.deserialize(rom.getFileByName(file_path), static_data)
-    return _ssb_file_cache[file_path]
+    ssb_files = current_context().ssb_files
+    if file_path not in ssb_files:
+        ssb_files[file_path] = FileType.SSB.deserialize(rom.getFileByName(file_path), static_data)
+    return ssb_files[file_path]
 
 
 def save_scripts(rom, static_data):
-    for file_path, script in _ssb_file_cache.items():
+    for file_path, script in current_context().ssb_files.items():
         rom.setFileByName(file_path, FileType.SSB.serialize(script, static_data))
 
 
+# Operations and parameter types that the script op index records sites for.
+INDEXED_OP_NAMES = frozenset({"WaitBgmSignal", "WaitBgm", "WaitBgm2", "WaitAnimation", "back_SetBanner2"})
+INDEXED_PARAM_TYPES = frozenset({"Bgm"})
+SCRIPT_OP_INDEX_VERSION = 1
+# (ops by name -> [(routine, op)], params by type -> [(routine, op, param)])
+_ScriptSites = tuple[dict[str, list[tuple[int, int]]], dict[str, list[tuple[int, int, int]]]]
+
+
+class ScriptOpIndex:
+    """
+    Sites of interesting operations and parameters in all scripts of the ROM, so that randomizers that only touch
+    a few operations don't have to walk every operation of every script.
+    Scripts are scanned on first use. Scripts not loaded in this run yet are scanned from the ROM without adding
+    them to the script cache, so they are not saved again by save_scripts. Only sites scanned from the unchanged
+    ROM files are stored in the on-disk cache, since the key is made from those.
+    Sites that were rewritten to a different operation since the scan are skipped when iterating.
+    """
+
+    def __init__(self, scripts: dict[str, _ScriptSites | None], key: str | None = None):
+        # Script name -> sites. None if the script was not scanned yet or changed and needs to be scanned again.
+        self.scripts = scripts
+        self.key = key
+        self._param_types: dict[str, tuple[tuple[int, str], ...]] = {}
+        # Scripts whose sites describe the ROM files the key was made from.
+        self._unchanged: set[str] = set()
+        self._changed: set[str] = set()
+        self._dirty = False
+
+    @classmethod
+    def build(cls, rom: NintendoDSRom, static_data: Pmd2Data) -> ScriptOpIndex:
+        script_names = [x for x in get_files_from_rom_with_extension(rom, "ssb") if x not in SKIP_JP_INVALID_SSB]
+        key_parts: list[str | bytes] = [
+            str(SCRIPT_OP_INDEX_VERSION),
+            package_version("skytemple-files"),
+            static_data.game_edition,
+            ",".join(sorted(INDEXED_OP_NAMES)),
+            ",".join(sorted(INDEXED_PARAM_TYPES)),
+        ]
+        for script_name in script_names:
+            key_parts.append(script_name)
+            key_parts.append(rom.getFileByName(script_name))
+        key = cache_key(*key_parts)
+        index = cls(dict.fromkeys(script_names), key)
+
+        cached = cache_read("script_op_index", key)
+        if cached is not None:
+            try:
+                index._load_json(cached)
+            except (ValueError, TypeError, KeyError):
+                pass
+        # Scripts loaded by earlier stages may already differ from the ROM files.
+        for script_name in current_context().ssb_files:
+            index.invalidate(script_name)
+        return index
+
+    def _load_json(self, data: bytes):
+        for script_name, ops, params in json.loads(data):
+            if script_name in self.scripts:
+                self.scripts[script_name] = (
+                    {name: [(r, o) for r, o in sites] for name, sites in ops.items()},
+                    {typ: [(r, o, p) for r, o, p in sites] for typ, sites in params.items()},
+                )
+                self._unchanged.add(script_name)
+
+    def to_json(self) -> bytes:
+        return json.dumps(
+            [
+                [script_name, *sites]
+                for script_name, sites in self.scripts.items()
+                if sites is not None and script_name in self._unchanged
+            ],
+            separators=(",", ":"),
+        ).encode("utf-8")
+
+    def save(self):
+        """Stores the sites scanned from unchanged ROM files in the on-disk cache, if there are new ones."""
+        if self._dirty and self.key is not None:
+            cache_write("script_op_index", self.key, self.to_json())
+            self._dirty = False
+
+    def invalidate(self, script_name: str):
+        """Marks a script as changed. It is scanned again the next time its sites are requested."""
+        if script_name in self.scripts:
+            self.scripts[script_name] = None
+            self._unchanged.discard(script_name)
+            self._changed.add(script_name)
+
+    def ops(
+        self, name: str, rom: NintendoDSRom, static_data: Pmd2Data, scripts: Iterable[str] | None = None
+    ) -> Iterator[tuple[str, Ssb, Any]]:
+        """
+        Yields (script name, script, operation) for all operations with the given name,
+        in script, routine and operation order. If scripts is given, only those scripts are searched, in that order.
+        """
+        assert name in INDEXED_OP_NAMES
+        for script_name in self.scripts.keys() if scripts is None else scripts:
+            op_sites = self._sites(script_name, rom, static_data)[0].get(name)
+            if not op_sites:
+                continue
+            ssb = get_script(script_name, rom, static_data)
+            for r, o in op_sites:
+                op = ssb.routine_ops[r][o]
+                if op.op_code.name == name:
+                    yield script_name, ssb, op
+        self.save()
+
+    def params(
+        self, typ: str, rom: NintendoDSRom, static_data: Pmd2Data, scripts: Iterable[str] | None = None
+    ) -> Iterator[tuple[str, Ssb, Any, int]]:
+        """
+        Yields (script name, script, operation, parameter index) for all operation parameters of the given type,
+        in script, routine, operation and parameter order.
+        """
+        assert typ in INDEXED_PARAM_TYPES
+        for script_name in self.scripts.keys() if scripts is None else scripts:
+            param_sites = self._sites(script_name, rom, static_data)[1].get(typ)
+            if not param_sites:
+                continue
+            ssb = get_script(script_name, rom, static_data)
+            for r, o, p in param_sites:
+                op = ssb.routine_ops[r][o]
+                if (p, typ) in self._indexed_params(op.op_code.name, static_data):
+                    yield script_name, ssb, op, p
+        self.save()
+
+    def _sites(self, script_name: str, rom: NintendoDSRom, static_data: Pmd2Data) -> _ScriptSites:
+        sites = self.scripts[script_name]
+        if sites is None:
+            ssb_files = current_context().ssb_files
+            if script_name in ssb_files:
+                sites = self._scan(ssb_files[script_name], static_data)
+            else:
+                sites = self._scan(FileType.SSB.deserialize(rom.getFileByName(script_name), static_data), static_data)
+                if script_name not in self._changed:
+                    self._unchanged.add(script_name)
+                    self._dirty = True
+            self.scripts[script_name] = sites
+        return sites
+
+    def _scan(self, ssb: Ssb, static_data: Pmd2Data) -> _ScriptSites:
+        op_sites: dict[str, list[tuple[int, int]]] = {}
+        param_sites: dict[str, list[tuple[int, int, int]]] = {}
+        for r, rtn in enumerate(ssb.routine_ops):
+            for o, op in enumerate(rtn):
+                name = op.op_code.name
+                if name in INDEXED_OP_NAMES:
+                    op_sites.setdefault(name, []).append((r, o))
+                for p, typ in self._indexed_params(name, static_data):
+                    if p < len(op.params):
+                        param_sites.setdefault(typ, []).append((r, o, p))
+        return op_sites, param_sites
+
+    def _indexed_params(self, op_name: str, static_data: Pmd2Data) -> tuple[tuple[int, str], ...]:
+        if op_name not in self._param_types:
+            op_c = static_data.script_data.op_codes__by_name[op_name][0]
+            self._param_types[op_name] = tuple(
+                (i, spec.type) for i, spec in enumerate(op_c.arguments) if spec.type in INDEXED_PARAM_TYPES
+            )
+        return self._param_types[op_name]
+
+
+def get_script_op_index(rom: NintendoDSRom, static_data: Pmd2Data) -> ScriptOpIndex:
+    """Returns the script op index of the current run. Built on first use, see ScriptOpIndex."""
+    context = current_context()
+    if context.script_op_index is None:
+        context.script_op_index = ScriptOpIndex.build(rom, static_data)
+    return context.script_op_index
+
+
 def ranks(sample):
     """
     Return the ranks of each element in an integer sample.
@@ -24,10 +24,6 @@ from threading import Thread, Lock
 
 from ndspy.rom import NintendoDSRom
 from skytemple_files.common.i18n_util import _
-from skytemple_files.common.impl_cfg import (
-    change_implementation_type,
-    ImplementationType,
-)
 from skytemple_files.common.util import get_ppmdu_config_for_rom
 
 from skytemple_randomizer.config import RandomizerConfig
@@ -36,6 +32,7 @@ from skytemple_randomizer.randomizer.abstract import AbstractRandomizer
 from skytemple_randomizer.randomizer.blind_items_moves import BlindItemsMovesRandomizer
 from skytemple_randomizer.randomizer.boss import BossRandomizer
 from skytemple_randomizer.randomizer.chapter import ChapterRandomizer
+from skytemple_randomizer.randomizer.context import MD_PROPERTIES_EXPAND_POKE_LIST, RandomizerContext
 from skytemple_randomizer.randomizer.dungeon import DungeonRandomizer
 from skytemple_randomizer.randomizer.dungeon_unlocker import DungeonUnlocker
 from skytemple_randomizer.randomizer.explorer_ranks import ExplorerRanksRandomizer
@@ -50,7 +47,7 @@ from skytemple_randomizer.randomizer.monster import MonsterRandomizer
 from skytemple_randomizer.randomizer.moveset import MovesetRandomizer
 from skytemple_randomizer.randomizer.npc import NpcRandomizer
 from skytemple_randomizer.randomizer.overworld_music import OverworldMusicRandomizer
-from skytemple_randomizer.randomizer.patch_applier import PatchApplier
+from skytemple_randomizer.randomizer.patch_applier import PatchApplier, load_patched_rom
 from skytemple_randomizer.randomizer.portrait_downloader import PortraitDownloader
 from skytemple_randomizer.randomizer.quiz import QuizRandomizer
 from skytemple_randomizer.randomizer.recruitment_table import RecruitmentTableRandomizer
@@ -60,12 +57,12 @@ from skytemple_randomizer.randomizer.special_pc import SpecialPcRandomizer
 from skytemple_randomizer.randomizer.starter import StarterRandomizer
 from skytemple_randomizer.randomizer.text_main import TextMainRandomizer
 from skytemple_randomizer.randomizer.text_script import TextScriptRandomizer
-from skytemple_randomizer.randomizer.util.util import (
-    save_scripts,
-    clear_script_cache,
-    clear_strings_cache,
-)
+from skytemple_randomizer.randomizer.util.debug import TracingRandom
+from skytemple_randomizer.randomizer.util.patcher import RunPatcher
+from skytemple_randomizer.randomizer.util.util import save_scripts
+from skytemple_randomizer.rom_io import copy_rom
 from skytemple_randomizer.status import Status
+from skytemple_randomizer.step_timings import ProgressEstimator, StepKey, StepTimings
 
 RANDOMIZERS = [
     PatchApplier,
@@ -113,57 +110,96 @@ class RandomizerThread(Thread):
         Inits the thread. If it's started() access to rom and config MUST NOT be done until is_done().
         is_done is also signaled by the status object's done() event.
         The max number of steps can be retrieved with the attribute 'total_steps'.
+        The attribute 'progress' estimates the progress based on how long the steps took in previous runs.
         If there's an error, this is marked as done and the error attribute contains the exception.
         """
         super().__init__()
         self.status = status
-        # Make sure we open a copy of the ROM, this makes absolutely sure we don't change the input ROM, in case
-        # we re-run randomization in the app's lifetime!
-        self.rom = NintendoDSRom(rom.save(updateDeviceCapacity=True))
         self.rng = rng
         self.config = config
         self.lock = Lock()
         self.done = False
-
-        # Configure file handler implementation
-        impl_type = ImplementationType.PYTHON
-        if config["starters_npcs"]["native_file_handlers"]:
-            impl_type = ImplementationType.NATIVE
-        change_implementation_type(impl_type)
+        # All state of this run, so that multiple runs don't interfere with each other.
+        self.context = RandomizerContext(config)
+        # Make sure we open a copy of the ROM, this makes absolutely sure we don't change the input ROM, in case
+        # we re-run randomization in the app's lifetime! If the ROM with the patches of the PatchApplier applied is
+        # cached, start from that instead.
+        patched_rom = load_patched_rom(config, rom, self.context)
+        self.rom = patched_rom if patched_rom is not None else copy_rom(rom)
 
         self.static_data = get_ppmdu_config_for_rom(self.rom)
+        self.patcher = RunPatcher(self.rom, self.static_data)
+        try:
+            if self.patcher.is_applied("ExpandPokeList"):
+                self.context.md_properties = MD_PROPERTIES_EXPAND_POKE_LIST
+        except NotImplementedError:
+            pass
         self.randomizers: list[AbstractRandomizer] = []
-        for cls in RANDOMIZERS:
-            self.randomizers.append(cls(config, self.rom, self.static_data, self.rng, seed, frontend))  # type: ignore
+        # Some randomizers already read files when they are created, they need the file handlers of this run too.
+        with self.context.activate(), self.context.file_handlers():
+            for cls in RANDOMIZERS:
+                randomizer = cls(config, self.rom, self.static_data, self.rng, seed, frontend, self.context)  # type: ignore
+                randomizer.patcher = self.patcher
+                self.randomizers.append(randomizer)
 
-        self.total_steps = sum(x.step_count() for x in self.randomizers) + 1
+            self.total_steps = sum(x.step_count() for x in self.randomizers) + 1
+            plan = [
+                StepKey(type(randomizer).__name__, randomizer.step_count(), i)
+                for randomizer in self.randomizers
+                for i in range(randomizer.step_count())
+            ]
+            plan.append(StepKey("save_scripts", 1, 0))
+        self.progress = ProgressEstimator(plan, StepTimings.load())
         self.error = None
         self.thread_id: int | None = None
 
     def run(self):
         logger.info("Randomizer thread started.")
-        clear_script_cache()
-        clear_strings_cache()
         self.thread_id = threading.get_ident()
+        with self.context.activate(), self.context.file_handlers():
+            self._run()
+        if isinstance(self.rng, TracingRandom):
+            self.rng.close()
+
+        with self.lock:
+            self.done = True
+        # Not while holding the lock, this waits for the subscribers, which may call is_done.
+        self.status.done()
+
+    def _run(self):
         try:
             for randomizer in self.randomizers:
-                local_status_steps_left = randomizer.step_count()
+                stage = type(randomizer).__name__
+                stage_steps = randomizer.step_count()
+                local_status_steps_left = stage_steps
                 local_status = Status()
 
                 def local_status_fn(__, descr):
                     nonlocal local_status_steps_left
                     if descr != Status.DONE_SPECIAL_STR:
+                        # Steps signaled beyond the planned ones count towards the last planned step.
+                        self.progress.on_step(
+                            StepKey(stage, stage_steps, stage_steps - max(local_status_steps_left, 1))
+                        )
                         if local_status_steps_left > 0:
                             local_status_steps_left -= 1
                         self.status.step(descr)
                     else:
                         for i in range(local_status_steps_left):
+                            self.progress.on_step(
+                                StepKey(stage, stage_steps, stage_steps - local_status_steps_left + i)
+                            )
                             self.status.step(_("Randomizing..."))
 
                 local_status.subscribe(local_status_fn)
+                if isinstance(self.rng, TracingRandom):
+                    self.rng.begin_stage(type(randomizer).__name__)
                 randomizer.run(local_status)
+            self.progress.on_step(StepKey("save_scripts", 1, 0))
             self.status.step(_("Saving scripts..."))
             save_scripts(self.rom, self.static_data)
+            # Only complete runs are representative of how long the steps take.
+            self.progress.save_timings()
         except (SystemExit, KeyboardInterrupt):
             logger.info("Randomizer was asked to exit.")
             self.error = sys.exc_info()  # type: ignore
@@ -171,10 +207,6 @@ class RandomizerThread(Thread):
             logger.error("Exception during randomization.", exc_info=error)
             self.error = sys.exc_info()  # type: ignore
 
-        with self.lock:
-            self.done = True
-            self.status.done()
-
     def is_done(self) -> bool:
         with self.lock:
             return self.done
@@ -0,0 +1,505 @@
+#  Copyright 2020-2025 SkyTemple Contributors
+#
+#  This file is part of SkyTemple.
+#
+#  SkyTemple is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  SkyTemple is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with SkyTemple.  If not, see <https://www.gnu.org/licenses/>.
+"""Memory efficient loading and saving of ROMs."""
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import math
+import mmap
+import os
+import struct
+import tempfile
+from collections.abc import Iterator
+from typing import Any
+
+from ndspy import fnt as fnt_lib
+from ndspy.rom import NintendoDSRom
+
+# The largest icon banner (DSi).
+_MAX_ICON_BANNER_LENGTH = 0x23C0
+_ARM9_POST_DATA_MAGIC = b"\x21\x06\xc0\xde"
+# Size of the chunks files are copied in, if they can not be copied by the OS directly.
+_COPY_CHUNK_SIZE = 1024 * 1024
+
+
+class _MappedFile:
+    """Placeholder for a file that was not read from the memory-mapped ROM yet."""
+
+    __slots__ = ["start", "end"]
+
+    def __init__(self, start: int, end: int):
+        self.start = start
+        self.end = end
+
+
+class _Source:
+    """The ROM file a LazyNintendoDSRom was loaded from."""
+
+    __slots__ = ["path", "identity"]
+
+    def __init__(self, path: str, identity: tuple[int, ...]):
+        self.path = path
+        self.identity = identity
+
+    @classmethod
+    def of(cls, path: str, fd: int) -> _Source:
+        return cls(os.path.abspath(path), _identity(os.fstat(fd)))
+
+    def open(self) -> int | None:
+        """Opens the file for reading. None if it can not be opened or was changed since the ROM was loaded."""
+        try:
+            fd = os.open(self.path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+        except OSError:
+            return None
+        if _identity(os.fstat(fd)) != self.identity:
+            os.close(fd)
+            return None
+        return fd
+
+
+class _MappedFiles(list):
+    """
+    The files of a LazyNintendoDSRom. Files are read from the memory-mapped ROM on first access
+    and behave like the files of a regular NintendoDSRom after that.
+    """
+
+    def __init__(self, mapped: mmap.mmap, items: list[Any], source: _Source | None = None):
+        super().__init__(items)
+        self.mapped = mapped
+        # The file that is mapped, used to copy files that were not read yet directly from it when saving.
+        self.source = source
+        # Set when the list itself is changed. Files that were read can also be changed in place, see is_modified.
+        self.modified = False
+        # Where the files that were read came from in the mapped ROM.
+        self.origins: dict[int, _MappedFile] = {}
+        # If false, files that were not read yet are returned without keeping them in memory.
+        self.keep = True
+
+    def _load(self, index: int) -> Any:
+        if index < 0:
+            index += len(self)
+        item = super().__getitem__(index)
+        if isinstance(item, _MappedFile):
+            origin = item
+            item = bytearray(self.mapped[origin.start : origin.end])
+            if self.keep:
+                super().__setitem__(index, item)
+                self.origins[index] = origin
+        return item
+
+    def is_modified(self) -> bool:
+        """Whether the files may differ from the mapped ROM, including files that were changed in place."""
+        if self.modified:
+            return True
+        view = memoryview(self.mapped)
+        try:
+            for index, origin in self.origins.items():
+                if view[origin.start : origin.end] != super().__getitem__(index):
+                    return True
+        finally:
+            view.release()
+        return False
+
+    def __getitem__(self, index):  # type: ignore
+        if isinstance(index, slice):
+            return [self._load(i) for i in range(*index.indices(len(self)))]
+        return self._load(index)
+
+    def __iter__(self) -> Iterator[Any]:
+        for i in range(len(self)):
+            yield self._load(i)
+
+    def __setitem__(self, index, value):  # type: ignore
+        self.modified = True
+        super().__setitem__(index, value)
+
+    def __delitem__(self, index):  # type: ignore
+        self.modified = True
+        super().__delitem__(index)
+
+    def append(self, value):
+        self.modified = True
+        super().append(value)
+
+    def insert(self, index, value):  # type: ignore
+        self.modified = True
+        super().insert(index, value)
+
+    def extend(self, values):
+        self.modified = True
+        super().extend(values)
+
+    def pop(self, index=-1):  # type: ignore
+        value = self._load(index)
+        self.modified = True
+        super().pop(index)
+        return value
+
+    def remove(self, value):
+        self.modified = True
+        super().remove(value)
+
+    def raw(self) -> list[Any]:
+        """The files without reading any, files that were not read yet are _MappedFile."""
+        return list(super().__iter__())
+
+
+class LazyNintendoDSRom(NintendoDSRom):
+    """
+    A NintendoDSRom backed by a memory-mapped ROM file. Only the header, the ARM binaries and the tables are read when
+    loading, files are read on first access.
+    The ROM file must not be changed, truncated or replaced as long as the ROM (or a copy of it) exists: On POSIX
+    systems, accessing parts of a truncated mapped file kills the process with SIGBUS. On Windows the file is locked
+    and can not be changed or deleted until then.
+    """
+
+    def __init__(self, mapped: mmap.mmap, source: _Source | None = None):
+        # ndspy reads everything up front, so only give it the part of the ROM before the files.
+        # The files it reads from that are replaced below.
+        super().__init__(mapped[: _metadata_end(mapped)])
+        self._mapped = mapped
+        self.rsaSignature = _rsa_signature(mapped)
+        fat_offset, fat_size = struct.unpack_from("<II", mapped, 0x48)
+        fat = mapped[fat_offset : fat_offset + fat_size - fat_size % 8]
+        self.files = _MappedFiles(
+            mapped, [_MappedFile(start, end) for start, end in struct.iter_unpack("<II", fat)], source
+        )
+        self._loaded_state = self._state()
+
+    @classmethod
+    def fromFile(cls, filePath) -> LazyNintendoDSRom:
+        with open(filePath, "rb") as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), _Source.of(filePath, f.fileno()))
+
+    def save(self, *, updateDeviceCapacity: bool = False) -> bytes:
+        # Don't keep files that are only read to be saved.
+        files = self.files
+        if isinstance(files, _MappedFiles):
+            files.keep = False
+        try:
+            return super().save(updateDeviceCapacity=updateDeviceCapacity)
+        finally:
+            if isinstance(files, _MappedFiles):
+                files.keep = True
+
+    def copy(self) -> LazyNintendoDSRom:
+        """A copy of the ROM. Shares the memory-mapped ROM file, but none of the data read from it."""
+        new = LazyNintendoDSRom.__new__(LazyNintendoDSRom)
+        for key, value in vars(self).items():
+            if key not in ("files", "_mapped"):
+                setattr(new, key, copy.deepcopy(value))
+        new._mapped = self._mapped
+        raw_files = self.files.raw() if isinstance(self.files, _MappedFiles) else list(self.files)
+        source = self.files.source if isinstance(self.files, _MappedFiles) else None
+        new.files = _MappedFiles(
+            self._mapped, [x if isinstance(x, _MappedFile) else bytearray(x) for x in raw_files], source
+        )
+        new.files.modified = not isinstance(self.files, _MappedFiles) or self.files.modified
+        if isinstance(self.files, _MappedFiles):
+            new.files.origins = dict(self.files.origins)
+        return new
+
+    def is_modified(self) -> bool:
+        """Whether the ROM may differ from the ROM file it was loaded from."""
+        if not isinstance(self.files, _MappedFiles) or self.files.is_modified():
+            return True
+        return self._state() != self._loaded_state
+
+    def source_hash(self) -> bytes:
+        """SHA-256 hash of the ROM file."""
+        return hashlib.sha256(self._mapped).digest()
+
+    def _state(self) -> dict[str, Any]:
+        state = {k: v for k, v in vars(self).items() if k not in ("files", "_mapped", "_loaded_state", "filenames")}
+        state["filenames"] = fnt_lib.save(self.filenames)
+        return copy.deepcopy(state)
+
+
+def _identity(stat: os.stat_result) -> tuple[int, ...]:
+    return stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+def _metadata_end(mapped: mmap.mmap) -> int:
+    """End of the last part of the ROM that ndspy reads when loading, apart from the files and the RSA signature."""
+    end = 0x1004
+    arm9_offset, arm9_size = struct.unpack_from("<I8xI", mapped, 0x20)
+    post_data_offset = arm9_offset + arm9_size
+    while mapped[post_data_offset : post_data_offset + 4] == _ARM9_POST_DATA_MAGIC:
+        post_data_offset += 12
+    end = max(end, post_data_offset + 4)
+    arm7_offset, arm7_size = struct.unpack_from("<I8xI", mapped, 0x30)
+    end = max(end, arm7_offset + arm7_size)
+    # FNT, FAT and overlay tables
+    for header_offset in (0x40, 0x48, 0x50, 0x58):
+        offset, size = struct.unpack_from("<II", mapped, header_offset)
+        end = max(end, offset + size)
+    (icon_banner_offset,) = struct.unpack_from("<I", mapped, 0x68)
+    if icon_banner_offset:
+        end = max(end, icon_banner_offset + _MAX_ICON_BANNER_LENGTH)
+    debug_rom_offset, debug_rom_size = struct.unpack_from("<II", mapped, 0x160)
+    if debug_rom_offset:
+        end = max(end, debug_rom_offset + debug_rom_size)
+    return min(end, len(mapped))
+
+
+def _rsa_signature(mapped: mmap.mmap) -> bytearray:
+    """Reads the RSA signature like ndspy does."""
+    signature_offset = 0
+    if len(mapped) >= 0x1004:
+        (signature_offset,) = struct.unpack_from("<I", mapped, 0x1000)
+    (rom_size,) = struct.unpack_from("<I", mapped, 0x80)
+    if not signature_offset and len(mapped) > rom_size:
+        signature_offset = rom_size
+    if not signature_offset:
+        return bytearray()
+    return bytearray(mapped[signature_offset : min(len(mapped), signature_offset + 0x88)])
+
+
+def load_rom(path: str) -> NintendoDSRom:
+    """
+    Loads the ROM at path. Files are only read when accessed, see LazyNintendoDSRom. The file at path must not be
+    changed while the ROM is in use.
+    """
+    return LazyNintendoDSRom.fromFile(path)
+
+
+def copy_rom(rom: NintendoDSRom) -> NintendoDSRom:
+    """Returns an independent copy of the ROM."""
+    if isinstance(rom, LazyNintendoDSRom):
+        return rom.copy()
+    return NintendoDSRom(rom.save(updateDeviceCapacity=True))
+
+
+def rom_fingerprint(rom: NintendoDSRom) -> bytes:
+    """SHA-256 hash identifying the contents of the ROM. Avoids reading unchanged lazily loaded ROMs entirely."""
+    if isinstance(rom, LazyNintendoDSRom) and not rom.is_modified():
+        return rom.source_hash()
+    return hashlib.sha256(rom.save(updateDeviceCapacity=True)).digest()
+
+
+def save_rom_to_file(rom: NintendoDSRom, path: str, *, update_device_capacity: bool = True):
+    """
+    Saves the ROM to path, like rom.saveToFile. The layout is the same as ndspy's, but it is computed up front and the
+    files are written to the output file one after another instead of building the complete ROM in memory first.
+    Files of a LazyNintendoDSRom that were not read are copied from the input ROM file directly.
+    """
+    layout = _RomLayout(rom, update_device_capacity)
+    # Write to a temporary file first, the output may be the input ROM file that files are still read from.
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".rom-", suffix=".tmp")
+    source_fd = layout.source.open() if layout.source is not None else None
+    try:
+        with open(fd, "wb", buffering=0) as f:
+            for data in layout.parts:
+                if isinstance(data, _MappedFile):
+                    assert layout.mapped is not None
+                    _copy_file(source_fd, f, layout.mapped, data)
+                else:
+                    f.write(data)
+        # mkstemp only makes the file accessible to the user, use the permissions saveToFile would.
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp_path, 0o666 & ~umask)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    finally:
+        if source_fd is not None:
+            os.close(source_fd)
+
+
+def iter_rom(rom: NintendoDSRom, *, update_device_capacity: bool = True) -> tuple[int, Iterator[bytes]]:
+    """
+    Returns the size of the saved ROM and an iterator over its data, in order. Like save_rom_to_file, the complete ROM
+    is never built in memory. The ROM must not be changed until the iterator is exhausted.
+    """
+    layout = _RomLayout(rom, update_device_capacity)
+
+    def chunks() -> Iterator[bytes]:
+        for data in layout.parts:
+            if isinstance(data, _MappedFile):
+                assert layout.mapped is not None
+                for chunk_start in range(data.start, data.end, _COPY_CHUNK_SIZE):
+                    yield layout.mapped[chunk_start : min(data.end, chunk_start + _COPY_CHUNK_SIZE)]
+            else:
+                yield bytes(data)
+
+    return layout.size, chunks()
+
+
+class _RomLayout:
+    """
+    The parts of a saved ROM, in order, starting with the header. This mirrors NintendoDSRom.save.
+    Files of a LazyNintendoDSRom that were not read are _MappedFile placeholders.
+    """
+
+    def __init__(self, rom: NintendoDSRom, update_device_capacity: bool):
+        files = rom.files.raw() if isinstance(rom.files, _MappedFiles) else list(rom.files)
+        self.source = rom.files.source if isinstance(rom.files, _MappedFiles) else None
+        self.mapped = rom.files.mapped if isinstance(rom.files, _MappedFiles) else None
+        fnt = fnt_lib.save(rom.filenames)
+        # ndspy sets these attributes when loading, but its type stubs lack them.
+        pad200: bytes = rom.pad200  # type: ignore
+        arm7_overlay_table: bytes = rom.arm7OverlayTable  # type: ignore
+        debug_rom: bytes = rom.debugRom  # type: ignore
+        sorted_file_ids: list[int] = rom.sortedFileIds  # type: ignore
+        rsa_signature: bytes = rom.rsaSignature  # type: ignore
+
+        parts: list[Any] = []
+        offset = 0x200
+        file_offsets: dict[int, int] = {}
+
+        def add(data: Any) -> int:
+            nonlocal offset
+            start = offset
+            parts.append(data)
+            offset += _length(data)
+            return start
+
+        def align(alignment: int, fill: bytes = b"\xff"):
+            if offset % alignment:
+                add(fill * (-offset % alignment))
+
+        add(pad200)
+        align(0x4000, b"\0")
+        arm9_index = len(parts)
+        arm9_offset = add(rom.arm9)
+        add(rom.arm9PostData)
+        align(0x200)
+        arm9_ovt_offset = 0
+        if rom.arm9OverlayTable:
+            arm9_ovt_offset = add(rom.arm9OverlayTable)
+            align(0x200)
+        for i in range(0, len(rom.arm9OverlayTable), 32):
+            (file_id,) = struct.unpack_from("<I", rom.arm9OverlayTable, i + 0x18)
+            file_offsets[file_id] = add(files[file_id])
+            align(0x200)
+        arm7_offset = add(rom.arm7)
+        align(0x200)
+        arm7_ovt_offset = 0
+        if arm7_overlay_table:
+            arm7_ovt_offset = add(arm7_overlay_table)
+            align(0x200)
+        for i in range(0, len(arm7_overlay_table), 32):
+            (file_id,) = struct.unpack_from("<I", arm7_overlay_table, i + 0x18)
+            file_offsets[file_id] = add(files[file_id])
+            align(0x200)
+        fnt_offset = add(fnt)
+        align(0x200)
+        fat = bytearray(8 * len(files))
+        fat_offset = add(fat)
+        align(0x200)
+        icon_banner_offset = 0
+        if rom.iconBanner:
+            icon_banner_offset = add(rom.iconBanner)
+            align(0x200)
+        debug_rom_offset = 0
+        if debug_rom:
+            debug_rom_offset = add(debug_rom)
+            align(0x200)
+        for file_id in [*sorted_file_ids, *range(len(files))]:
+            if file_id not in file_offsets and file_id < len(files):
+                align(0x200)
+                file_offsets[file_id] = add(files[file_id])
+        for i, file in enumerate(files):
+            struct.pack_into("<II", fat, 8 * i, file_offsets[i], file_offsets[i] + _length(file))
+        align(0x20, b"\0")
+        rsa_signature_offset = add(rsa_signature)
+
+        if update_device_capacity:
+            rom.deviceCapacity = math.ceil(math.log2(offset)) - 17
+        header = _header(
+            rom,
+            arm9=arm9_offset,
+            arm7=arm7_offset,
+            fnt=fnt_offset,
+            fat=fat_offset,
+            arm9_ovt=arm9_ovt_offset,
+            arm7_ovt=arm7_ovt_offset,
+            icon_banner=icon_banner_offset,
+            rsa_signature=rsa_signature_offset,
+            debug_rom=debug_rom_offset,
+        )
+        # Everything before the ARM9 binary (at 0x4000 or later) is small, keep it in one part.
+        start = bytearray(header)
+        for data in parts[:arm9_index]:
+            start += data
+        # For compatibility with NSMBe, like ndspy
+        struct.pack_into("<I", start, 0x1000, rsa_signature_offset)
+        self.parts: list[Any] = [start, *parts[arm9_index:]]
+        self.size = offset
+
+
+def _length(data: Any) -> int:
+    if isinstance(data, _MappedFile):
+        return data.end - data.start
+    return len(data)
+
+
+def _header(rom: NintendoDSRom, **offsets: int) -> bytes:
+    """The header of the ROM, with the given offsets of its parts."""
+    # Let ndspy pack all other values, from a copy of the ROM without any files.
+    empty = copy.copy(rom)
+    empty.files = [b""] * len(rom.files)
+    header = bytearray(NintendoDSRom.save(empty)[:0x200])
+    struct.pack_into("<I", header, 0x20, offsets["arm9"])
+    struct.pack_into("<I", header, 0x30, offsets["arm7"])
+    struct.pack_into("<I", header, 0x40, offsets["fnt"])
+    struct.pack_into("<I", header, 0x48, offsets["fat"])
+    struct.pack_into("<I", header, 0x50, offsets["arm9_ovt"])
+    struct.pack_into("<I", header, 0x58, offsets["arm7_ovt"])
+    struct.pack_into("<I", header, 0x68, offsets["icon_banner"])
+    struct.pack_into("<I", header, 0x80, offsets["rsa_signature"])
+    struct.pack_into("<I", header, 0x160, offsets["debug_rom"])
+    struct.pack_into("<H", header, 0x15E, _crc16(header[:0x15E]))
+    return bytes(header)
+
+
+def _crc16(data: bytes | bytearray) -> int:
+    """CRC-16/MODBUS, used for the header checksum."""
+    crc = 0xFFFF
+    for byte in data:
+        crc ^= byte
+        for __ in range(8):
+            crc = (crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
+    return crc
+
+
+def _copy_file(source_fd: int | None, f, mapped: mmap.mmap, file: _MappedFile):
+    """Copies a file that was not read yet from the input ROM file to f, without reading it into memory if possible."""
+    start = file.start
+    if source_fd is not None:
+        try:
+            while start < file.end:
+                if hasattr(os, "copy_file_range"):
+                    copied = os.copy_file_range(source_fd, f.fileno(), file.end - start, start)
+                else:
+                    copied = os.sendfile(f.fileno(), source_fd, start, file.end - start)
+                if copied <= 0:
+                    break
+                start += copied
+        except (OSError, AttributeError):
+            # Not supported for these files or on this platform; copy the rest below.
+            pass
+    for chunk_start in range(start, file.end, _COPY_CHUNK_SIZE):
+        f.write(mapped[chunk_start : min(file.end, chunk_start + _COPY_CHUNK_SIZE)])
@@ -0,0 +1,149 @@
+#  Copyright 2020-2025 SkyTemple Contributors
+#
+#  This file is part of SkyTemple.
+#
+#  SkyTemple is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  SkyTemple is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with SkyTemple.  If not, see <https://www.gnu.org/licenses/>.
+"""
+Compact patches between an input ROM and a randomized ROM.
+
+A patch describes the output ROM image as a sequence of copies out of the input ROM image and literal data.
+Copies are found at the granularity of the ROM's files and ARM binaries, so unchanged files cost a few bytes,
+no matter where the randomized ROM placed them. The whole patch is LZMA compressed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import lzma
+import struct
+from collections.abc import Iterator
+
+PATCH_EXTENSION = ".strpatch"
+MAGIC = b"STRP"
+VERSION = 1
+
+_HEADER = struct.Struct("<I32sI32s")
+_OP_COPY = b"C"
+_OP_LITERAL = b"L"
+_OP_END = b"E"
+_COPY = struct.Struct("<II")
+_LITERAL = struct.Struct("<I")
+# Copies shorter than this are stored as literals instead.
+_MIN_COPY_SIZE = 32
+
+
+class RomPatchError(ValueError):
+    pass
+
+
+def _regions(rom: bytes) -> Iterator[tuple[int, int]]:
+    """(offset, size) of the ARM binaries and of all files in the FAT of the NDS ROM image."""
+    try:
+        arm9_offset, arm9_size = struct.unpack_from("<I8xI", rom, 0x20)
+        arm7_offset, arm7_size = struct.unpack_from("<I8xI", rom, 0x30)
+        fat_offset, fat_size = struct.unpack_from("<II", rom, 0x48)
+        yield arm9_offset, arm9_size
+        yield arm7_offset, arm7_size
+        for start, end in struct.iter_unpack("<II", rom[fat_offset : fat_offset + fat_size - fat_size % 8]):
+            if end > start:
+                yield start, end - start
+    except struct.error as e:
+        raise RomPatchError("Not a valid ROM file.") from e
+
+
+def create_rom_patch(source: bytes, target: bytes) -> bytes:
+    """Creates a patch that turns the ROM image source into the ROM image target."""
+    source_regions: dict[bytes, int] = {}
+    for offset, size in _regions(source):
+        if size >= _MIN_COPY_SIZE and offset + size <= len(source):
+            source_regions.setdefault(hashlib.sha1(source[offset : offset + size]).digest(), offset)
+
+    ops = bytearray()
+    literal_start = 0
+    pending_copy: list[int] | None = None  # [source offset, size]
+
+    def flush_literal(end: int):
+        if end > literal_start:
+            flush_copy()
+            ops.extend(_OP_LITERAL + _LITERAL.pack(end - literal_start))
+            ops.extend(target[literal_start:end])
+
+    def flush_copy():
+        nonlocal pending_copy
+        if pending_copy is not None:
+            ops.extend(_OP_COPY + _COPY.pack(*pending_copy))
+            pending_copy = None
+
+    for offset, size in sorted(_regions(target)):
+        if offset < literal_start or size < _MIN_COPY_SIZE or offset + size > len(target):
+            continue
+        data = target[offset : offset + size]
+        source_offset = source_regions.get(hashlib.sha1(data).digest())
+        if source_offset is None or source[source_offset : source_offset + size] != data:
+            continue
+        flush_literal(offset)
+        if pending_copy is not None and pending_copy[0] + pending_copy[1] == source_offset:
+            pending_copy[1] += size
+        else:
+            flush_copy()
+            pending_copy = [source_offset, size]
+        literal_start = offset + size
+    flush_literal(len(target))
+    flush_copy()
+    ops.extend(_OP_END)
+
+    header = _HEADER.pack(len(source), hashlib.sha256(source).digest(), len(target), hashlib.sha256(target).digest())
+    return MAGIC + bytes([VERSION]) + lzma.compress(header + ops)
+
+
+def apply_rom_patch(source: bytes, patch: bytes) -> bytes:
+    """Applies a patch created by create_rom_patch to the ROM image it was created for."""
+    if patch[:4] != MAGIC:
+        raise RomPatchError("Not a SkyTemple Randomizer patch.")
+    if len(patch) < 5 or patch[4] != VERSION:
+        raise RomPatchError("Unsupported patch version. The patch was made with a different Randomizer version.")
+    try:
+        body = lzma.decompress(patch[5:])
+    except lzma.LZMAError as e:
+        raise RomPatchError("The patch is corrupted.") from e
+
+    source_size, source_hash, target_size, target_hash = _HEADER.unpack_from(body)
+    if len(source) != source_size or hashlib.sha256(source).digest() != source_hash:
+        raise RomPatchError("The patch was not made for this ROM.")
+
+    target = bytearray()
+    pos = _HEADER.size
+    try:
+        while True:
+            op = body[pos : pos + 1]
+            pos += 1
+            if op == _OP_COPY:
+                source_offset, size = _COPY.unpack_from(body, pos)
+                pos += _COPY.size
+                target.extend(source[source_offset : source_offset + size])
+            elif op == _OP_LITERAL:
+                (size,) = _LITERAL.unpack_from(body, pos)
+                pos += _LITERAL.size
+                target.extend(body[pos : pos + size])
+                pos += size
+            elif op == _OP_END:
+                break
+            else:
+                raise RomPatchError("The patch is corrupted.")
+    except struct.error as e:
+        raise RomPatchError("The patch is corrupted.") from e
+
+    if len(target) != target_size or hashlib.sha256(target).digest() != target_hash:
+        raise RomPatchError("The patch is corrupted.")
+    return bytes(target)
@@ -1,8 +1,7 @@
-"""Global instance of the SpriteCollab client."""
+"""Access to the SpriteCollab client of the current randomization run."""
 
 from __future__ import annotations
 
-import platform
 from collections.abc import Sequence
 
 from skytemple_files.common.ppmdu_config.data import Pmd2Sprite
@@ -16,20 +15,12 @@ from skytemple_files.graphics.chara_wan.model import WanFile
 from skytemple_files.graphics.kao import SUBENTRIES
 from skytemple_files.graphics.kao.protocol import KaoImageProtocol
 
-_INSTANCE: SpriteCollabClient | None = None
-# A dict of credits for all portraits requested (and found) during the randomization
-# Key is full form name
-_COLLECTED_PORTRAITS: dict[tuple[str, str], tuple[list[Credit], list[MonsterHistory]]] = {}
-# A list of all sprites requested (and found) during the randomization
-# Key is full form name
-_COLLECTED_SPRITES: dict[tuple[str, str], tuple[list[Credit], list[MonsterHistory]]] = {}
+from skytemple_randomizer.randomizer.context import current_context
 
 
 def sprite_collab() -> SpriteCollabClient:
-    global _INSTANCE
-    if _INSTANCE is None:
-        _INSTANCE = SpriteCollabClient(cache_size=5_000, use_ssl=platform.system() != "Windows")
-    return _INSTANCE
+    """The SpriteCollab client of the current run, see RandomizerContext.sprite_collab."""
+    return current_context().sprite_collab()
 
 
 async def get_details_and_portraits(
@@ -64,7 +55,7 @@ async def get_details_and_portraits(
     details = await session.monster_form_details([x for x in valid_forms_to_try if x in involved_forms])
     #   - update credits
     for detail in details:
-        _COLLECTED_PORTRAITS[(detail.full_form_name, f"{detail.monster_id:04}")] = (
+        current_context().portrait_credits[(detail.full_form_name, f"{detail.monster_id:04}")] = (
             list(detail.portrait_credits),
             list(detail.portrait_history),
         )
@@ -98,7 +89,7 @@ async def get_sprites(
             details = await session.monster_form_details([form_path])
             #   - update credits
             for detail in details:
-                _COLLECTED_SPRITES[(detail.full_form_name, f"{detail.monster_id:04}")] = (
+                current_context().sprite_credits[(detail.full_form_name, f"{detail.monster_id:04}")] = (
                     list(detail.sprite_credits),
                     list(detail.sprite_history),
                 )
@@ -108,12 +99,12 @@ async def get_sprites(
 
 def portrait_credits() -> dict[tuple[str, str], tuple[list[Credit], list[MonsterHistory]]]:
     """Returns all portrait credits, sorted by key. Key is full form name, with monster name."""
-    return dict(_COLLECTED_PORTRAITS)
+    return dict(current_context().portrait_credits)
 
 
 def sprite_credits() -> dict[tuple[str, str], tuple[list[Credit], list[MonsterHistory]]]:
     """Returns all sprite credits, sorted by key. Key is full form name, with monster name."""
-    return dict(_COLLECTED_SPRITES)
+    return dict(current_context().sprite_credits)
 
 
 async def _filter_valid_forms(
@@ -14,7 +14,24 @@
 #
 #  You should have received a copy of the GNU General Public License
 #  along with SkyTemple.  If not, see <https://www.gnu.org/licenses/>.
-from threading import Lock
+from __future__ import annotations
+
+import logging
+import time
+from collections import deque
+from collections.abc import Callable
+from threading import Condition, Lock, Thread
+from typing import NamedTuple
+
+logger = logging.getLogger(__name__)
+
+
+class StatusEvent(NamedTuple):
+    """A status update, as delivered to subscribe_async subscribers."""
+
+    step: int
+    description: str
+    timestamp: float  # time.monotonic() when the step was signaled
 
 
 class Status:
@@ -26,18 +43,95 @@ class Status:
         self.counter = 0
         self.lock = Lock()
         self.subscribers = []
+        self.async_subscribers: list[AsyncStatusSubscriber] = []
 
     def step(self, descr: str):
         with self.lock:
             self.counter += 1
             for subscriber in self.subscribers:
                 subscriber(self.counter, descr)
+            event = StatusEvent(self.counter, descr, time.monotonic())
+            for async_subscriber in self.async_subscribers:
+                async_subscriber.publish(event)
 
     def done(self):
+        """
+        Signals the end. Waits until all subscribe_async subscribers got the final update, so nothing is delivered
+        after this returns.
+        """
         self.step(self.DONE_SPECIAL_STR)
         with self.lock:
             self.subscribers = []
+            async_subscribers = self.async_subscribers
+            self.async_subscribers = []
+        for async_subscriber in async_subscribers:
+            async_subscriber.close()
 
     def subscribe(self, subscribe_fn):
+        """Calls subscribe_fn(step, description) for every step, synchronously on the thread signaling the step."""
         with self.lock:
             self.subscribers.append(subscribe_fn)
+
+    def subscribe_async(
+        self, subscribe_fn: Callable[[StatusEvent], None], max_rate: float | None = None
+    ) -> AsyncStatusSubscriber:
+        """
+        Calls subscribe_fn with the StatusEvents on a separate thread, so that slow subscribers never block the
+        thread signaling the steps. If max_rate is set, subscribe_fn is called at most max_rate times per second;
+        steps in between are coalesced and only the latest one is delivered. The final DONE_SPECIAL_STR
+        step is always delivered.
+        """
+        subscriber = AsyncStatusSubscriber(subscribe_fn, max_rate)
+        with self.lock:
+            self.async_subscribers.append(subscriber)
+        return subscriber
+
+
+class AsyncStatusSubscriber:
+    """A subscriber of Status.subscribe_async, with its own delivery thread."""
+
+    def __init__(self, subscribe_fn: Callable[[StatusEvent], None], max_rate: float | None):
+        self._fn = subscribe_fn
+        self._interval = 1 / max_rate if max_rate else 0.0
+        # When throttled, only the latest event is kept.
+        self._events: deque[StatusEvent] = deque(maxlen=1 if self._interval else None)
+        self._closed = False
+        self._cond = Condition()
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def publish(self, event: StatusEvent):
+        with self._cond:
+            self._events.append(event)
+            self._cond.notify()
+
+    def close(self):
+        """Stops the delivery thread, after delivering the events still pending."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+
+    def _run(self):
+        last_delivery: float | None = None
+        while True:
+            with self._cond:
+                while len(self._events) < 1 and not self._closed:
+                    self._cond.wait()
+                if len(self._events) < 1:
+                    return
+                if last_delivery is not None and not self._closed:
+                    wait = last_delivery + self._interval - time.monotonic()
+                    if wait > 0:
+                        # More events may come in while waiting, they replace this one.
+                        self._cond.wait(wait)
+                        continue
+                events = list(self._events)
+                self._events.clear()
+            for event in events:
+                # Keep delivering, the subscriber may still handle later events (and the final one).
+                try:
+                    self._fn(event)
+                except Exception as error:
+                    logger.error("Error in a status subscriber.", exc_info=error)
+            last_delivery = time.monotonic()
@@ -0,0 +1,160 @@
+#  Copyright 2020-2025 SkyTemple Contributors
+#
+#  This file is part of SkyTemple.
+#
+#  SkyTemple is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  SkyTemple is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with SkyTemple.  If not, see <https://www.gnu.org/licenses/>.
+from __future__ import annotations
+
+import json
+import time
+from collections.abc import Sequence
+from threading import Lock
+from typing import NamedTuple
+
+from skytemple_randomizer.randomizer.util.disk_cache import cache_key, cache_read, cache_write
+
+# Bump when the meaning of the step keys changes, to discard old timings.
+STEP_TIMINGS_VERSION = 1
+# Weight of a new measurement in the moving average of a step's duration.
+STEP_TIMINGS_ALPHA = 0.3
+# Assumed duration in seconds of steps that were never timed.
+DEFAULT_STEP_DURATION = 0.5
+# Bounds of the factor by which this run is assumed to be faster or slower than the recorded timings.
+MIN_SPEED_FACTOR = 0.2
+MAX_SPEED_FACTOR = 5.0
+
+
+class StepKey(NamedTuple):
+    """
+    Identifies a step of a randomization: the stage (randomizer) it belongs to, the number of steps of that stage
+    (which depends on the features enabled in the config) and the index of the step within the stage.
+    """
+
+    stage: str
+    stage_steps: int
+    step: int
+
+    def __str__(self):
+        return f"{self.stage}/{self.stage_steps}/{self.step}"
+
+
+class StepTimings:
+    """Average durations of randomization steps in seconds, persisted in the on-disk cache."""
+
+    def __init__(self, durations: dict[str, float]):
+        self.durations = durations
+
+    @classmethod
+    def load(cls) -> StepTimings:
+        data = cache_read("step_timings", _step_timings_key())
+        if data is not None:
+            try:
+                durations = json.loads(data)
+                if isinstance(durations, dict):
+                    return cls({str(k): float(v) for k, v in durations.items()})
+            except (ValueError, TypeError):
+                pass
+        return cls({})
+
+    def save(self):
+        cache_write("step_timings", _step_timings_key(), json.dumps(self.durations).encode("utf-8"))
+
+    def expected(self, key: StepKey) -> float:
+        """Expected duration of the step. Falls back to the average step of its stage, then to a default."""
+        duration = self.durations.get(str(key))
+        if duration is not None:
+            return duration
+        prefix = f"{key.stage}/"
+        same_stage = [v for k, v in self.durations.items() if k.startswith(prefix)]
+        if len(same_stage) > 0:
+            return sum(same_stage) / len(same_stage)
+        return DEFAULT_STEP_DURATION
+
+    def record(self, key: StepKey, duration: float):
+        previous = self.durations.get(str(key))
+        if previous is None:
+            self.durations[str(key)] = duration
+        else:
+            self.durations[str(key)] = previous + STEP_TIMINGS_ALPHA * (duration - previous)
+
+
+class ProgressEstimate(NamedTuple):
+    fraction: float
+    eta: float | None  # remaining seconds, None if not known yet
+
+
+class ProgressEstimator:
+    """
+    Estimates the progress of a randomization run from the expected duration of its steps, instead of the number of
+    steps. Feed it the steps of each stage with on_step, which also times them for future runs.
+    """
+
+    def __init__(self, plan: Sequence[StepKey], timings: StepTimings):
+        self.plan = plan
+        self.timings = timings
+        self._expected = [timings.expected(key) for key in plan]
+        self._total_expected = sum(self._expected)
+        self._positions = {key: i for i, key in enumerate(plan)}
+        self._starts: list[float] = []
+        self._lock = Lock()
+
+    def on_step(self, key: StepKey, timestamp: float | None = None):
+        """
+        Marks the start of the step. Steps of the plan that were skipped start at the same time. Steps that are not
+        in the plan (eg. when a stage signals more steps than it planned) are ignored, they count towards the
+        step that is currently running.
+        """
+        position = self._positions.get(key)
+        if position is None:
+            return
+        with self._lock:
+            while len(self._starts) <= position:
+                self._starts.append(time.monotonic() if timestamp is None else timestamp)
+
+    def estimate(self, now: float | None = None) -> ProgressEstimate:
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            if len(self._starts) < 1 or self._total_expected <= 0:
+                return ProgressEstimate(0.0, None)
+            current = len(self._starts) - 1
+            elapsed = now - self._starts[0]
+            expected_done = sum(self._expected[:current])
+            speed = 1.0
+            if current > 0 and expected_done > 0:
+                # How much faster or slower than recorded this run went so far.
+                speed = (self._starts[current] - self._starts[0]) / expected_done
+                speed = min(max(speed, MIN_SPEED_FACTOR), MAX_SPEED_FACTOR)
+            remaining = max(self._expected[current] * speed - (now - self._starts[current]), 0.0)
+            remaining += sum(self._expected[current + 1 :]) * speed
+            # Without a finished step, the speed of this run is not known yet.
+            eta = remaining if current > 0 else None
+            fraction = elapsed / (elapsed + remaining) if elapsed + remaining > 0 else 1.0
+            return ProgressEstimate(fraction, eta)
+
+    def save_timings(self, end: float | None = None):
+        """Records the durations of the steps of this run (which ended at end) in the timings and saves them."""
+        if end is None:
+            end = time.monotonic()
+        with self._lock:
+            starts = self._starts + [end]
+        for key, start, next_start in zip(self.plan, starts, starts[1:]):
+            self.timings.record(key, next_start - start)
+        self.timings.save()
+
+
+def _step_timings_key() -> str:
+    from skytemple_randomizer.config import version
+
+    return cache_key(str(STEP_TIMINGS_VERSION), version())